@@ -0,0 +1,657 @@
+"""Headless HTTP scoring API (asyncio, stdlib only).
+
+Serves the same scoring logic as the dashboard to other systems:
+
+    GET  /health                      service status and data version
+    GET  /metrics                     Prometheus metrics (see metrics.py)
+    GET  /engines/{id}/health         one engine, with per-sensor details
+    POST /engines/health              {"engine_ids": [...], "details": false}
+    POST /windows/health              {"windows": [[[...16 features] x 50] ...]} or an .npy body
+    GET  /fleet/health?status=critical,warning
+    POST /cost/scenarios              {"engine_ids": [...]} (omit for the whole fleet)
+    POST /forecast                    {"engine_id": 12, "sensor": "sensor_21", "forecast_days": 10}
+
+Windows from concurrent requests are coalesced by a MicroBatcher into one
+model.predict call. Health endpoints answer in JSON, or as a structured
+NumPy array (.npy) with `?format=npy` or `Accept: application/x-npy`.
+
+Usage (from the repository root):
+    python api_server.py --port 8765
+    curl http://127.0.0.1:8765/engines/12/health
+    curl -X POST -d '{"engine_ids": [1, 2, 3]}' http://127.0.0.1:8765/engines/health
+    curl 'http://127.0.0.1:8765/fleet/health?format=npy' -o fleet.npy
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit, parse_qs
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+import numpy as np
+
+from preprocess import load_data, scale_data, load_model, dataset_version, compact_frame
+from sensor_config import SensorRegistry
+from feature.fleet_snapshot import STATUS_NAMES
+from feature.health_monitor import extract_fleet_windows, predict_rul, score_fleet_windows
+from feature.single_eng import snapshot_cost_values
+from feature.cost_optimizer import load_cost_model, build_scenario_matrix, predict_scenario_costs, SCENARIO_LABELS
+from feature.trend_forecast import train_predict_rnn
+from inference import quantize_model, PRECISIONS
+from chunked_data import ChunkedHistory, DEFAULT_MEMORY_MB
+from metrics import (REGISTRY, CONTENT_TYPE, PREDICTION_SECONDS, ENGINES_SCORED, QUEUE_DEPTH,
+                     API_REQUESTS, API_REQUEST_SECONDS, API_BATCH_ROWS, record_cache)
+
+NPY_CONTENT_TYPE = "application/x-npy"
+MAX_BODY_BYTES = 64 * 1024 * 1024
+# Each forecast trains an RNN on the model thread: keep a few, and bound the history it trains on
+FORECAST_CACHE_SIZE = 32
+MAX_HISTORY_DAYS = 1000
+FORECAST_WORKERS = 1
+# Engine IDs are int64 throughout
+ENGINE_ID_RANGE = (-2 ** 63, 2 ** 63 - 1)
+SCENARIO_NAMES = ["preventive", "current", "end_of_life", "emergency"]
+STATUS_CODES = {name.lower(): code for code, name in enumerate(STATUS_NAMES)}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+# Row layout of binary (.npy) health responses
+HEALTH_DTYPE = np.dtype([
+    ('engine_id', '<i8'), ('predicted_rul', '<i8'), ('actual_rul', '<i8'),
+    ('overall_health', '<f8'), ('status', 'i1'), ('rul_health', '<i8'), ('sensor_health', '<f8'),
+    ('critical_sensors', '<i8'), ('warning_sensors', '<i8'),
+])
+
+
+class ApiError(Exception):
+    """Error answered to the client as {"error": message}"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ------------------------------- Micro-batching -------------------------------
+
+class MicroBatcher:
+    """Coalesce concurrent predict requests into one model call.
+
+    Requests queue their windows; a worker task waits up to `max_delay`
+    seconds (or until `max_batch` windows are queued), runs a single
+    predict_rul over the concatenation on the model thread and hands each
+    request its slice of the result.
+    """
+
+    def __init__(self, model, executor, max_batch=512, max_delay=0.005):
+        self.model = model
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def predict(self, X):
+        """Rounded RUL predictions for windows shaped (n, seq_length, features)"""
+        if len(X) == 0:
+            return np.zeros(0, dtype=np.int64)
+        future = asyncio.get_running_loop().create_future()
+        QUEUE_DEPTH.labels("api_batch").inc(len(X))
+        await self._queue.put((X, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = loop.time() + self.max_delay
+        while rows < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch, rows
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch, rows = await self._collect()
+            try:
+                X = np.concatenate([x for x, _ in batch])
+                start = time.perf_counter()
+                predicted = await loop.run_in_executor(self.executor, predict_rul, self.model, X)
+                PREDICTION_SECONDS.labels("api").observe(time.perf_counter() - start)
+                ENGINES_SCORED.labels("api").inc(rows)
+                API_BATCH_ROWS.observe(rows)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                offset = 0
+                for x, future in batch:
+                    if not future.done():
+                        future.set_result(predicted[offset:offset + len(x)])
+                    offset += len(x)
+            finally:
+                QUEUE_DEPTH.labels("api_batch").dec(rows)
+
+
+# ------------------------------- Responses -------------------------------
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def json_response(payload, status=200):
+    return status, "application/json", json.dumps(payload, default=_json_default).encode("utf-8")
+
+
+def npy_response(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return 200, NPY_CONTENT_TYPE, buffer.getvalue()
+
+
+def health_rows(snapshot, rows, details=False):
+    """JSON-ready health records for the given snapshot row indices"""
+    records = []
+    for i in rows:
+        record = {
+            'engine_id': int(snapshot.engine_ids[i]),
+            'status': str(STATUS_NAMES[snapshot.status[i]]),
+            'overall_health': float(snapshot.overall_health[i]),
+            'predicted_rul': int(snapshot.pred_rul[i]),
+            'actual_rul': int(snapshot.actual_rul[i]) if snapshot.actual_rul[i] >= 0 else None,
+            'rul_health': int(snapshot.rul_health[i]),
+            'sensor_health': float(snapshot.sensor_health[i]),
+            'critical_sensors': int(snapshot.critical_sensors[i]),
+            'warning_sensors': int(snapshot.warning_sensors[i]),
+        }
+        if details:
+            health_details = snapshot.engine_health_details(i)
+            record['sensors'] = health_details['sensor_status_today']
+            record['critical_sensor_names'] = health_details['critical_sensors']
+            record['warning_sensor_names'] = health_details['warning_sensors']
+        records.append(record)
+    return records
+
+
+def health_array(snapshot, rows):
+    """Structured HEALTH_DTYPE array for the given snapshot row indices"""
+    rows = np.asarray(rows, dtype=np.int64)
+    array = np.empty(len(rows), dtype=HEALTH_DTYPE)
+    array['engine_id'] = snapshot.engine_ids[rows]
+    array['predicted_rul'] = snapshot.pred_rul[rows]
+    array['actual_rul'] = snapshot.actual_rul[rows]
+    array['overall_health'] = snapshot.overall_health[rows]
+    array['status'] = snapshot.status[rows]
+    array['rul_health'] = snapshot.rul_health[rows]
+    array['sensor_health'] = snapshot.sensor_health[rows]
+    array['critical_sensors'] = snapshot.critical_sensors[rows]
+    array['warning_sensors'] = snapshot.warning_sensors[rows]
+    return array
+
+
+class Request:
+    def __init__(self, method, target, headers, body):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path.rstrip("/") or "/"
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.headers = headers
+        self.body = body
+        self.params = {}
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            payload = json.loads(self.body)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ApiError(400, f"Invalid JSON body: {e}")
+        if not isinstance(payload, dict):
+            raise ApiError(400, "JSON body must be an object")
+        return payload
+
+    def wants_npy(self):
+        return (self.query.get("format") == "npy"
+                or NPY_CONTENT_TYPE in self.headers.get("accept", ""))
+
+
+# ------------------------------- Scoring service -------------------------------
+
+class ScoringService:
+    """Scoring state shared by all requests: model, test fleet windows and result caches"""
+
+    def __init__(self, model, test_df, processor, seq_length=50, cost_model_path="model/cost_model.pkl",
+                 max_batch=512, max_delay=0.005):
+        self.processor = processor
+        self.seq_length = seq_length
+        self.cost_model_path = cost_model_path
+        self.data_version = dataset_version(test_df)
+        self.test_df = test_df
+
+        # Windows are extracted once; requests only index into them
+        self.engine_ids, self.actual_rul, self.X, self.feature_cols = extract_fleet_windows(test_df, seq_length)
+
+        # Keras is driven from a single thread; the event loop never blocks on it
+        self.model_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model")
+        self.batcher = MicroBatcher(model, self.model_executor, max_batch, max_delay)
+        # Forecasts train an RNN for seconds: they get their own threads so batched scoring never waits on them
+        self.forecast_executor = ThreadPoolExecutor(max_workers=FORECAST_WORKERS, thread_name_prefix="forecast")
+        self.fleet_snapshot = None
+        self._fleet_lock = None
+        self.forecasts = OrderedDict()
+
+    def start(self):
+        self._fleet_lock = asyncio.Lock()
+        self.batcher.start()
+
+    async def score(self, engine_ids, X, actual_rul):
+        """Micro-batched prediction plus health scoring, as a FleetSnapshot"""
+        predicted = await self.batcher.predict(X)
+        return await asyncio.get_running_loop().run_in_executor(None, partial(
+            score_fleet_windows, engine_ids, X, predicted, actual_rul,
+            self.feature_cols, self.processor, self.seq_length
+        ))
+
+    async def fleet(self):
+        """Whole-fleet snapshot, scored on first use"""
+        async with self._fleet_lock:
+            record_cache("api_fleet", self.fleet_snapshot is not None)
+            if self.fleet_snapshot is None:
+                self.fleet_snapshot = await self.score(self.engine_ids, self.X, self.actual_rul)
+        return self.fleet_snapshot
+
+    async def engines(self, engine_ids):
+        """(snapshot, rows, missing) for the requested engine IDs, in request order"""
+        requested = np.asarray(engine_ids, dtype=np.int64)
+        idx = np.clip(np.searchsorted(self.engine_ids, requested), 0, max(len(self.engine_ids) - 1, 0))
+        found = (len(self.engine_ids) > 0) & (self.engine_ids[idx] == requested)
+        missing = requested[~found].tolist()
+
+        if self.fleet_snapshot is not None:
+            return self.fleet_snapshot, idx[found], missing
+
+        unique_idx, rows = np.unique(idx[found], return_inverse=True)
+        snapshot = await self.score(self.engine_ids[unique_idx], self.X[unique_idx], self.actual_rul[unique_idx])
+        return snapshot, rows, missing
+
+    def cost_model(self):
+        try:
+            return load_cost_model(self.cost_model_path)
+        except Exception as e:
+            raise ApiError(503, f"Cost model not available: {e}")
+
+
+# ------------------------------- Handlers -------------------------------
+
+def _is_engine_id(value):
+    return isinstance(value, int) and not isinstance(value, bool) and \
+        ENGINE_ID_RANGE[0] <= value <= ENGINE_ID_RANGE[1]
+
+
+def _engine_id_list(payload, key="engine_ids"):
+    engine_ids = payload.get(key)
+    if not isinstance(engine_ids, list) or not all(_is_engine_id(e) for e in engine_ids):
+        raise ApiError(400, f"'{key}' must be a list of integer (int64) engine IDs")
+    return engine_ids
+
+
+def _int_field(payload, key, default, low=1, high=None):
+    value = payload.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool) or value < low or (high is not None and value > high):
+        bounds = f"between {low} and {high}" if high is not None else f"of at least {low}"
+        raise ApiError(400, f"'{key}' must be an integer {bounds}")
+    return value
+
+
+def _health_response(request, snapshot, rows, extra=None, details=False):
+    if request.wants_npy():
+        return npy_response(health_array(snapshot, rows))
+    payload = {'data_version': request.service.data_version, 'engines': health_rows(snapshot, rows, details)}
+    payload.update(extra or {})
+    return json_response(payload)
+
+
+async def handle_status(request):
+    service = request.service
+    return json_response({
+        'status': 'ok',
+        'data_version': service.data_version,
+        'engines': len(service.engine_ids),
+        'seq_length': service.seq_length,
+        'features': service.feature_cols,
+        'fleet_scored': service.fleet_snapshot is not None,
+    })
+
+
+async def handle_metrics(request):
+    return 200, CONTENT_TYPE, REGISTRY.exposition().encode("utf-8")
+
+
+async def handle_engine(request):
+    engine_id = int(request.params['engine_id'])
+    if not _is_engine_id(engine_id):
+        raise ApiError(400, f"Engine ID {engine_id} is out of range")
+    snapshot, rows, missing = await request.service.engines([engine_id])
+    if missing:
+        raise ApiError(404, f"Engine {engine_id} not found or has fewer than {request.service.seq_length} cycles")
+    return _health_response(request, snapshot, rows, details=True)
+
+
+async def handle_engines(request):
+    payload = request.json()
+    engine_ids = _engine_id_list(payload)
+    snapshot, rows, missing = await request.service.engines(engine_ids)
+    return _health_response(request, snapshot, rows, {'missing': missing}, details=bool(payload.get('details')))
+
+
+async def handle_windows(request):
+    service = request.service
+    expected = (service.seq_length, len(service.feature_cols))
+    payload = {}
+    if request.headers.get("content-type", "").startswith(NPY_CONTENT_TYPE):
+        try:
+            X = np.load(io.BytesIO(request.body), allow_pickle=False)
+        except (ValueError, OSError) as e:
+            raise ApiError(400, f"Invalid .npy body: {e}")
+    else:
+        payload = request.json()
+        try:
+            X = np.asarray(payload.get('windows', []), dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise ApiError(400, f"'windows' must be a numeric array: {e}")
+
+    if X.ndim != 3 or X.shape[1:] != expected or not np.issubdtype(X.dtype, np.number):
+        raise ApiError(400, f"Windows must be shaped (n, {expected[0]}, {expected[1]}) in feature order "
+                            f"{service.feature_cols}, got {X.shape}")
+    # Raw windows are numbered 0..n-1 unless the caller names them
+    engine_ids = payload.get('engine_ids', list(range(len(X))))
+    if len(_engine_id_list({'engine_ids': engine_ids})) != len(X):
+        raise ApiError(400, "'engine_ids' must have one entry per window")
+
+    # No ground truth for raw windows: actual_rul is -1 (null in JSON)
+    snapshot = await service.score(np.asarray(engine_ids), X.astype(np.float64, copy=False),
+                                   np.full(len(X), -1, dtype=np.int64))
+    return _health_response(request, snapshot, np.arange(len(snapshot)), details=bool(payload.get('details')))
+
+
+async def handle_fleet(request):
+    snapshot = await request.service.fleet()
+    statuses = request.query.get("status")
+    if statuses:
+        try:
+            codes = [STATUS_CODES[s.strip().lower()] for s in statuses.split(",")]
+        except KeyError as e:
+            raise ApiError(400, f"Unknown status {e}; use good, warning or critical")
+        rows = np.flatnonzero(snapshot.mask(codes))
+    else:
+        rows = np.arange(len(snapshot))
+
+    counts = snapshot.status_counts()
+    summary = {'summary': {'engines': len(snapshot), 'good': counts[0], 'warning': counts[1], 'critical': counts[2]}}
+    return _health_response(request, snapshot, rows, summary)
+
+
+async def handle_cost(request):
+    service = request.service
+    payload = request.json()
+    cost_model = service.cost_model()
+
+    if 'engine_ids' in payload:
+        snapshot, rows, missing = await service.engines(_engine_id_list(payload))
+    else:
+        snapshot = await service.fleet()
+        rows, missing = np.arange(len(snapshot)), []
+
+    values = snapshot_cost_values(snapshot)
+    engine_values = {int(snapshot.engine_ids[i]): values[int(snapshot.engine_ids[i])] for i in rows}
+    if not engine_values:
+        return json_response({'engines': [], 'missing': missing})
+
+    scenarios = await asyncio.get_running_loop().run_in_executor(None, partial(
+        predict_scenario_costs, cost_model, build_scenario_matrix(engine_values), mode="api"
+    ))
+    base_costs = scenarios["predicted_cost"].values.reshape(-1, 4)
+    final_costs = scenarios["final_cost"].values.reshape(-1, 4)
+    best = final_costs.argmin(axis=1)
+
+    engines = []
+    for k, engine_id in enumerate(scenarios["engine_id"].values[::4]):
+        engines.append({
+            'engine_id': int(engine_id),
+            'predicted_rul': engine_values[int(engine_id)]['predicted_rul'],
+            'scenarios': [
+                {'scenario': SCENARIO_NAMES[s], 'label': SCENARIO_LABELS[s],
+                 'base_cost': base_costs[k, s], 'final_cost': final_costs[k, s]}
+                for s in range(4)
+            ],
+            'optimal_scenario': SCENARIO_NAMES[best[k]],
+            'potential_savings': final_costs[k].max() - final_costs[k].min(),
+        })
+    return json_response({'engines': engines, 'missing': missing})
+
+
+async def handle_forecast(request):
+    service = request.service
+    payload = request.json()
+    engine_id = payload.get('engine_id')
+    sensor = payload.get('sensor', 'sensor_21')
+    seq_len = service.seq_length
+
+    if not _is_engine_id(engine_id):
+        raise ApiError(400, "'engine_id' must be an integer (int64)")
+    if sensor not in service.processor.sensor_mapping:
+        raise ApiError(400, f"Unknown sensor {sensor!r}; use one of {list(service.processor.sensor_mapping)}")
+    history_days = _int_field(payload, 'history_days', 100)
+    forecast_days = _int_field(payload, 'forecast_days', 10, 1, 100)
+
+    engine_data = service.test_df[service.test_df['unit_number'] == engine_id]
+    if engine_data.empty:
+        raise ApiError(404, f"Engine {engine_id} not found")
+    # Requests asking for more history than is kept (or than the engine has) train on the same rows
+    history_days = min(history_days, MAX_HISTORY_DAYS, len(engine_data))
+    if history_days <= seq_len:
+        raise ApiError(400, f"Engine {engine_id} needs more than {seq_len} cycles of history to forecast")
+
+    key = (engine_id, sensor, history_days, seq_len, forecast_days)
+    forecast = service.forecasts.get(key)
+    record_cache("api_forecast", forecast is not None)
+    if forecast is None:
+        # Trained on the forecast threads, not the model thread batched scoring runs on
+        forecast = await asyncio.get_running_loop().run_in_executor(
+            service.forecast_executor,
+            partial(train_predict_rnn, engine_data.tail(history_days), sensor, seq_len, forecast_days)
+        )
+        service.forecasts[key] = forecast
+        while len(service.forecasts) > FORECAST_CACHE_SIZE:
+            service.forecasts.popitem(last=False)
+    else:
+        service.forecasts.move_to_end(key)
+
+    return json_response({
+        'engine_id': engine_id,
+        'sensor': sensor,
+        'sensor_name': service.processor.sensor_mapping[sensor],
+        'last_values': engine_data[sensor].values[-seq_len:],
+        'forecast': np.asarray(forecast),
+    })
+
+
+ROUTES = [
+    ("GET", re.compile(r"/health"), "health", handle_status),
+    ("GET", re.compile(r"/metrics"), "metrics", handle_metrics),
+    ("GET", re.compile(r"/engines/(?P<engine_id>\d+)/health"), "engine", handle_engine),
+    ("POST", re.compile(r"/engines/health"), "engines", handle_engines),
+    ("POST", re.compile(r"/windows/health"), "windows", handle_windows),
+    ("GET", re.compile(r"/fleet/health"), "fleet", handle_fleet),
+    ("POST", re.compile(r"/cost/scenarios"), "cost", handle_cost),
+    ("POST", re.compile(r"/forecast"), "forecast", handle_forecast),
+]
+
+
+# ------------------------------- HTTP server -------------------------------
+
+class ScoringServer:
+    """Minimal HTTP/1.1 server (keep-alive, Content-Length bodies) on asyncio streams"""
+
+    def __init__(self, service, host="127.0.0.1", port=8765):
+        self.service = service
+        self.host = host
+        self.port = port
+
+    async def dispatch(self, request):
+        allowed = False
+        for method, pattern, route, handler in ROUTES:
+            match = pattern.fullmatch(request.path)
+            if not match:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            request.params = match.groupdict()
+            request.service = self.service
+            start = time.perf_counter()
+            try:
+                status, content_type, body = await handler(request)
+            except ApiError as e:
+                status, content_type, body = json_response({'error': str(e)}, e.status)
+            except Exception as e:
+                status, content_type, body = json_response({'error': f"{type(e).__name__}: {e}"}, 500)
+            API_REQUEST_SECONDS.labels(route).observe(time.perf_counter() - start)
+            API_REQUESTS.labels(route, status).inc()
+            return status, content_type, body
+
+        if allowed:
+            return json_response({'error': f"{request.method} not allowed on {request.path}"}, 405)
+        return json_response({'error': f"No route for {request.path}"}, 404)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write(writer, *json_response({'error': "Malformed request line"}, 400), False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write(writer, *json_response({'error': "Invalid Content-Length"}, 400), False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, *json_response({'error': "Request body too large"}, 413), False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                response = await self.dispatch(Request(method.upper(), target, headers, body))
+                await self._write(writer, *response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer, status, content_type, body, keep_alive):
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, ready=None):
+        self.service.start()
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"Scoring API on http://{self.host}:{self.port} "
+              f"({len(self.service.engine_ids)} engines, data version {self.service.data_version})")
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+
+def build_service(model_path="model/model.h5", seq_length=50, precision=None, data_path=None,
+                  memory_limit_mb=DEFAULT_MEMORY_MB, history_rows=100, **kwargs):
+    """Load model and test data like app.py does; returns None if either is missing.
+
+    With `data_path`, the history is streamed out of core and only each
+    engine's last `history_rows` cycles (enough for forecasts) are kept.
+    """
+    model = quantize_model(load_model(model_path), precision)
+    if data_path:
+        history = ChunkedHistory.with_training_scaler(data_path, memory_limit_mb=memory_limit_mb)
+        test_df = history.tail(max(seq_length, history_rows))
+    else:
+        train_df, test_df = scale_data(*load_data())
+        test_df = compact_frame(test_df)
+    if model is None or test_df is None:
+        return None
+    processor = SensorRegistry()
+    return ScoringService(model, test_df, processor, seq_length, **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", default="model/model.h5")
+    parser.add_argument("--precision", choices=PRECISIONS, default=None,
+                        help="inference precision (default: $SMARTMACH_PRECISION, else float32)")
+    parser.add_argument("--cost-model", default="model/cost_model.pkl")
+    parser.add_argument("--data", default=None, help="stream this history CSV instead of data/test_data.csv")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB, help="memory ceiling when streaming --data")
+    parser.add_argument("--max-batch", type=int, default=512, help="windows per micro-batched model call")
+    parser.add_argument("--max-delay-ms", type=float, default=5.0, help="how long a batch waits for more requests")
+    args = parser.parse_args()
+
+    service = build_service(args.model, precision=args.precision, data_path=args.data, memory_limit_mb=args.memory_mb,
+                            cost_model_path=args.cost_model,
+                            max_batch=args.max_batch, max_delay=args.max_delay_ms / 1e3)
+    if service is None:
+        sys.exit(f"Could not load the model ({args.model}) or data/test_data.csv")
+    try:
+        asyncio.run(ScoringServer(service, args.host, args.port).serve())
+    except KeyboardInterrupt:
+        pass
@@ -1,231 +1,327 @@
 import streamlit as st
-from preprocess import load_data, scale_data, load_model
-from feature.all_eng import show_all_eng
+from preprocess import load_data, scale_data, load_model, dataset_version, compact_frame
+from feature.all_eng import show_all_eng, fleet_snapshot_key
 from feature.single_eng import show_single_eng
-from feature.cost_optimizer import cost_optimizer
+from feature.cost_optimizer import cost_optimizer, fleet_cost_optimizer
 from feature.trend_forecast import show_trend_forecasting
-from feature.single_eng import get_engine_health_values 
-
-# ✅ Configuration
-st.set_page_config(
-    page_title="SmartMach: AI-Powered Predictive Maintenance System",
-    page_icon="smartmach_logo.png",  # <-- your 64x64 PNG image (place it in the same folder)
-    layout="wide"
-)
-
-# ✅ Sidebar Branding
-st.sidebar.image("smartmach_logo.png", width=64)
-st.sidebar.title("🤖 SmartMach Dashboard")
-st.sidebar.caption("AI-Powered Predictive Maintenance System")
-st.sidebar.markdown("---")
-
-# ✅ Feature Selection
-selected_feat = st.sidebar.radio("Select Feature", [ "All Engine Conditions", "Specific Engine", "Cost Optimizer", "Root Cause Analysis", "Trend Forecasting" ])
-
-# -------------------------------Model & Dataset Loading-------------------------
-if 'model' not in st.session_state or 'test_df' not in st.session_state:
-    try:
-        with st.spinner("🔄 Loading AI model and data..."):
-            st.session_state.model = load_model("model/model.h5")
-            st.session_state.train_df, st.session_state.test_df = load_data()
-            st.session_state.train_df, st.session_state.test_df = scale_data(
-                st.session_state.train_df, st.session_state.test_df
-            )
-        st.sidebar.success("Model and data loaded successfully!")
-    except FileNotFoundError as e:
-        st.error(f"❌ File not found: {str(e)}")
-        st.info("Please check if these files exist:")
-        st.info("- model/model.h5")
-        st.info("- data/train_data.csv") 
-        st.info("- data/test_data.csv")
-        # Don't stop the app, allow other features to work
-        st.session_state.model = None
-        st.session_state.test_df = None
-    except Exception as e:
-        st.error(f"❌ Error loading model: {str(e)}")
-        st.session_state.model = None
-        st.session_state.test_df = None
-
-# After model loading in session_state
-if st.session_state.model is None:
-    st.sidebar.warning("🤖 AI Model: Demo Mode (Using simulated predictions)")
-    # You can add simulated predictions here
-else:
-    st.sidebar.success("🤖 AI Model: Loaded (TensorFlow Active)")
-
-# -----------------------------------------Sensor to Readable Name mapping------------
-sensor_thresholds = {
-    'sensor_2': (0.1, 0.9), 'sensor_3': (0.1, 0.8), 'sensor_4': (0.2, 0.7),
-    'sensor_6': (0.1, 0.85), 'sensor_7': (0.05, 0.8), 'sensor_8': (0.05, 0.8),
-    'sensor_9': (0.05, 0.8), 'sensor_11': (0.1, 0.9), 'sensor_12': (0.1, 0.85),
-    'sensor_13': (0.1, 0.9), 'sensor_14': (0.1, 0.9), 'sensor_15': (0.1, 0.9),
-    'sensor_17': (0.1, 0.85), 'sensor_20': (0.1, 0.9), 'sensor_21': (0.1, 0.9)
-}
-
-sensor_mapping = {
-    'sensor_2': 'Temperature', 'sensor_3': 'Pressure', 'sensor_4': 'RPM',
-    'sensor_6': 'Fuel Flow', 'sensor_7': 'Vibration X', 'sensor_8': 'Vibration Y',
-    'sensor_9': 'Vibration Z', 'sensor_11': 'Oil Temp', 'sensor_12': 'Oil Pressure',
-    'sensor_13': 'Exhaust Temp', 'sensor_14': 'Compressor Temp', 'sensor_15': 'Fan Speed',
-    'sensor_17': 'Throttle Position', 'sensor_20': 'Fuel Temp', 'sensor_21': 'Engine Load'
-}
-
-# Realistic value mapping for display
-realistic_value_mapper = {
-    'Temperature': {'unit': '°C', 'min': 20, 'max': 120},
-    'Pressure': {'unit': 'PSI', 'min': 0, 'max': 100},
-    'RPM': {'unit': 'RPM', 'min': 0, 'max': 3000},
-    'Fuel Flow': {'unit': 'L/min', 'min': 0, 'max': 50},
-    'Vibration X': {'unit': 'mm/s', 'min': 0, 'max': 10},
-    'Vibration Y': {'unit': 'mm/s', 'min': 0, 'max': 10},
-    'Vibration Z': {'unit': 'mm/s', 'min': 0, 'max': 10},
-    'Oil Temp': {'unit': '°C', 'min': 60, 'max': 120},
-    'Oil Pressure': {'unit': 'PSI', 'min': 20, 'max': 80},
-    'Exhaust Temp': {'unit': '°C', 'min': 300, 'max': 600},
-    'Compressor Temp': {'unit': '°C', 'min': 100, 'max': 300},
-    'Fan Speed': {'unit': 'RPM', 'min': 0, 'max': 2000},
-    'Throttle Position': {'unit': '%', 'min': 0, 'max': 100},
-    'Fuel Temp': {'unit': '°C', 'min': 15, 'max': 50},
-    'Engine Load': {'unit': '%', 'min': 0, 'max': 100}
-}
-# ---------------------------------Create a object for the sensor mapping -----------------------
-class DummyProcessor:
-    def __init__(self, thresholds, mapping, realistic_mapper):
-        self.sensor_thresholds = thresholds
-        self.sensor_mapping = mapping
-        self.realistic_mapper = realistic_mapper
-    
-    def get_realistic_value(self, sensor_name, scaled_value):
-        """Convert scaled value (0-1) to realistic industrial value"""
-        if sensor_name in self.realistic_mapper:
-            mapper = self.realistic_mapper[sensor_name]
-            realistic_value = scaled_value * (mapper['max'] - mapper['min']) + mapper['min']
-            return round(realistic_value, 2), mapper['unit']
-        return scaled_value, ""
-
-# Initialize processor with ALL mappings
-processor = DummyProcessor(sensor_thresholds, sensor_mapping, realistic_value_mapper)
-
-# Main content
-st.title("SmartMach: AI-Powered Predictive Maintenance System")
-#st.markdown("### AI-Powered Predictive Maintenance & Analytics")
-
-
-with st.sidebar.expander("🔧 System Status", expanded=False):
-    if 'test_df' in st.session_state and st.session_state.test_df is not None:
-        st.success(f"✅ Data: {st.session_state.test_df.shape[0]} rows, {st.session_state.test_df.shape[1]} cols")
-        available_engines = st.session_state.test_df['unit_number'].unique()
-        st.info(f"🚀 Engines: {len(available_engines)} total")
-    else:
-        st.error("❌ Data not loaded")
-    
-    if 'model' in st.session_state and st.session_state.model is not None:
-        st.success("🤖 AI Model: Loaded")
-    else:
-        st.error("🤖 AI Model: Not loaded")
+from feature.threshold_tuning import show_threshold_tuning
+from feature.single_eng import get_engine_health_values, get_fleet_health_values
+from sensor_config import SensorRegistry
+from tracing import start_trace, end_trace, span, show_trace
+from metrics import start_metrics_server
+from inference import quantize_model
+from history_store import open_history_store, engine_ids
+from fleet_watcher import start_fleet_watcher
+from warmup import start_warmup
+
+# Time every stage of this rerun (shown in the sidebar "Performance" expander)
+trace = start_trace()
+# Nothing to render into until the sidebar is built
+performance_panel = None
+
+# try/finally so a rerun cut short (exception, st.stop, interrupted by a new rerun)
+# still ends its trace instead of leaving it for the next fragment rerun to add spans to
+try:
+    # Prometheus metrics on http://127.0.0.1:$SMARTMACH_METRICS_PORT/metrics (off unless the port is set)
+    start_metrics_server()
+
+    # ✅ Configuration
+    st.set_page_config(
+        page_title="SmartMach: AI-Powered Predictive Maintenance System",
+        page_icon="smartmach_logo.png",  # <-- your 64x64 PNG image (place it in the same folder)
+        layout="wide"
+    )
+
+    # ✅ Sidebar Branding
+    st.sidebar.image("smartmach_logo.png", width=64)
+    st.sidebar.title("🤖 SmartMach Dashboard")
+    st.sidebar.caption("AI-Powered Predictive Maintenance System")
+    st.sidebar.markdown("---")
+
+    # ✅ Feature Selection
+    selected_feat = st.sidebar.radio("Select Feature", [ "All Engine Conditions", "Specific Engine", "Cost Optimizer", "Root Cause Analysis", "Trend Forecasting", "Threshold Tuning" ])
+    trace.label = selected_feat
+
+    # -------------------------------Model & Dataset Loading-------------------------
+    # Optional startup warm-up (SMARTMACH_WARMUP=1): adopt its model and data instead of loading them again
+    warmup = start_warmup()
+    if warmup is not None and ('model' not in st.session_state or 'test_df' not in st.session_state):
+        with st.spinner("🔄 Waiting for the startup warm-up to load the model and data..."):
+            warmup.wait("data")
+        if warmup.model is not None and warmup.test_df is not None:
+            st.session_state.model = warmup.model
+            st.session_state.train_df, st.session_state.test_df = warmup.train_df, warmup.test_df
+            st.session_state.data_version = warmup.data_version
+
+    if 'model' not in st.session_state or 'test_df' not in st.session_state:
+        try:
+            with st.spinner("🔄 Loading AI model and data..."):
+                with span("model_loading"):
+                    st.session_state.model = load_model("model/model.h5")
+                with span("data_loading"):
+                    st.session_state.train_df, st.session_state.test_df = load_data()
+                with span("scaling"):
+                    st.session_state.train_df, st.session_state.test_df = scale_data(
+                        st.session_state.train_df, st.session_state.test_df
+                    )
+                with span("compaction"):
+                    # float32 features in model order; engine windows become zero-copy slices
+                    st.session_state.test_df = compact_frame(st.session_state.test_df)
+            st.sidebar.success("Model and data loaded successfully!")
+        except FileNotFoundError as e:
+            st.error(f"❌ File not found: {str(e)}")
+            st.info("Please check if these files exist:")
+            st.info("- model/model.h5")
+            st.info("- data/train_data.csv") 
+            st.info("- data/test_data.csv")
+            # Don't stop the app, allow other features to work
+            st.session_state.model = None
+            st.session_state.test_df = None
+        except Exception as e:
+            st.error(f"❌ Error loading model: {str(e)}")
+            st.session_state.model = None
+            st.session_state.test_df = None
+
+    # Fingerprint the loaded data once so cached results can be keyed by it
+    if st.session_state.get('test_df') is not None and 'data_version' not in st.session_state:
+        with span("data_fingerprint"):
+            st.session_state.data_version = dataset_version(st.session_state.test_df)
 
-# Feature routing with proper error handling
-if selected_feat == "All Engine Conditions":
-    if st.session_state.test_df is not None and st.session_state.model is not None:
-        show_all_eng(st.session_state.test_df, st.session_state.model, processor)
+    # Optional SQLite history store for the per-engine views (SMARTMACH_HISTORY_DB=history.db)
+    history_store = open_history_store()
+    if history_store is not None:
+        engine_source, engine_data_version = history_store, history_store.version()
     else:
-        st.error("❌ Data or model not loaded. Please check the system status in sidebar.")
-        
-elif selected_feat == "Specific Engine":
-    if st.session_state.test_df is not None and st.session_state.model is not None:
-        available_engines = st.session_state.test_df['unit_number'].unique()
-        engine_id = st.slider("Select Engine ID:", 
-                             min_value=int(min(available_engines)), 
-                             max_value=int(max(available_engines)), 
-                             value=int(min(available_engines)))
-        
-        if st.button("Analyze Engine Health", type="primary"):
-            show_single_eng(engine_id, st.session_state.test_df, st.session_state.model, processor)
+        engine_source, engine_data_version = st.session_state.get('test_df'), st.session_state.get('data_version')
+    # Engines the sliders offer, from the same source the views read
+    available_engines = engine_ids(engine_source) if engine_source is not None else []
+
+    # Optional reduced-precision copy of the model for scoring (SMARTMACH_PRECISION=float16|int8)
+    if 'scoring_model' not in st.session_state and warmup is not None and warmup.model is st.session_state.model:
+        warmup.wait("precision")
+        st.session_state.scoring_model = warmup.scoring_model
+
+    if 'scoring_model' not in st.session_state:
+        try:
+            with span("model_quantization"):
+                st.session_state.scoring_model = quantize_model(st.session_state.model)
+        except Exception as e:
+            st.sidebar.warning(f"⚠️ Quantized inference unavailable, using float32: {str(e)}")
+            st.session_state.scoring_model = st.session_state.model
+
+    # Start the All Engines view from the warm-up's fleet scores (same model, same cache key)
+    if warmup is not None and warmup.fleet_key is not None and 'fleet_snapshot' not in st.session_state \
+            and warmup.scoring_model is st.session_state.scoring_model:
+        st.session_state.fleet_snapshot = warmup.fleet_snapshot
+        st.session_state.fleet_snapshot_key = warmup.fleet_key
+
+    # After model loading in session_state
+    if st.session_state.model is None:
+        st.sidebar.warning("🤖 AI Model: Demo Mode (Using simulated predictions)")
+        # You can add simulated predictions here
     else:
-        st.error("❌ Data or model not loaded. Please check the system status in sidebar.")
-        
-elif selected_feat == "Cost Optimizer":
-    if st.session_state.test_df is not None and st.session_state.model is not None:
-    
+        st.sidebar.success("🤖 AI Model: Loaded (TensorFlow Active)")
+
+    # Initialize processor with ALL mappings
+    processor = SensorRegistry()
+
+    # Background re-scoring with status-transition alerts (off unless SMARTMACH_WATCH_INTERVAL is set)
+    fleet_watcher = start_fleet_watcher(engine_source, st.session_state.get('scoring_model'), processor)
+
+    # Main content
+    st.title("SmartMach: AI-Powered Predictive Maintenance System")
+    #st.markdown("### AI-Powered Predictive Maintenance & Analytics")
+
+
+    with st.sidebar.expander("🔧 System Status", expanded=False):
+        if 'test_df' in st.session_state and st.session_state.test_df is not None:
+            st.success(f"✅ Data: {st.session_state.test_df.shape[0]} rows, {st.session_state.test_df.shape[1]} cols")
+            st.info(f"🚀 Engines: {len(available_engines)} total")
+            if history_store is not None:
+                st.info(f"🗄️ History store: {history_store.path}")
+        else:
+            st.error("❌ Data not loaded")
+
+        if 'model' in st.session_state and st.session_state.model is not None:
+            st.success("🤖 AI Model: Loaded")
+            st.info(f"⚙️ Inference precision: {getattr(st.session_state.scoring_model, 'precision', 'float32')}")
+        else:
+            st.error("🤖 AI Model: Not loaded")
 
-        available_engines = st.session_state.test_df['unit_number'].unique()
-        engine_id = st.slider("Select Engine ID:", 
-                             min_value=int(min(available_engines)), 
-                             max_value=int(max(available_engines)), 
-                             value=int(min(available_engines)))
-
-        if st.button("Optimize Maintenance Costs", type="primary"):
-            # Automatically fetch health data before running cost optimizer
-            with st.spinner("🔍 Collecting engine health data..."):
-                engine_data = get_engine_health_values(
-                    engine_id, st.session_state.test_df,
-                    st.session_state.model, processor
-                )
-
-            if engine_data is None:
-                st.warning("⚠️ Please analyze this engine first in the 'Specific Engine' tab.")
+        if warmup is not None:
+            finished, total, running = warmup.progress()
+            if warmup.ready:
+                st.success(f"🔥 Warm-up: ready ({warmup.elapsed:.1f}s)")
             else:
-                st.success("✅ Engine health data fetched successfully!")
-                # st.json(engine_data)
+                st.progress(finished / total, text=f"🔥 Warm-up {finished}/{total}: {running or 'starting'}...")
+            for step in warmup.steps.values():
+                if step['status'] == 'failed':
+                    st.warning(f"⚠️ Warm-up step '{step['label']}' failed: {step['error']}")
 
-                # Now call the optimizer
-                cost_optimizer(engine_id, engine_data)
+    if fleet_watcher is not None:
+        with st.sidebar.expander("🔔 Fleet Alerts", expanded=False):
+            if fleet_watcher.last_run is None:
+                st.info(f"⏳ Watcher: first scan in progress (every {fleet_watcher.interval:g}s)")
+            else:
+                report = fleet_watcher.last_report
+                st.caption(f"Last scan {fleet_watcher.last_run:%H:%M:%S}: {report['recomputed']} engines "
+                           f"recomputed, {report['reused']} unchanged")
+            if fleet_watcher.last_error:
+                st.error(f"❌ Watcher error: {fleet_watcher.last_error}")
 
-    else:
-        st.error("❌ Data or model not loaded. Please check the system status in sidebar.")
-
-
-        
-elif selected_feat == "Root Cause Analysis":
-    if st.session_state.test_df is not None:
-        available_engines = st.session_state.test_df['unit_number'].unique()
-        engine_id = st.slider("Select Engine ID for Analysis:", 
-                             min_value=int(min(available_engines)), 
-                             max_value=int(max(available_engines)), 
-                             value=int(min(available_engines)))
-        
-        if st.button("Analyze Root Causes", type="primary"):
+            recent_alerts = fleet_watcher.alerts(limit=10)
+            if not recent_alerts:
+                st.success("✅ No status changes since the watcher started")
+            for alert in recent_alerts:
+                message = (f"{alert['time'][11:]} Engine {alert['engine_id']}: "
+                           f"{alert['from'] or 'NEW'} → {alert['to']} ({alert['overall_health']}%)")
+                if alert['new_critical_sensors']:
+                    message += f" | 🚨 {', '.join(alert['new_critical_sensors'])}"
+                if alert['to'] == "CRITICAL" and alert['escalation']:
+                    st.error(message)
+                elif alert['escalation']:
+                    st.warning(message)
+                else:
+                    st.success(message)
+
+    # Filled in at the end of the script, once every stage of this rerun has been timed
+    performance_panel = st.sidebar.expander("⏱️ Performance", expanded=False)
+
+    # Feature routing with proper error handling
+    if selected_feat == "All Engine Conditions":
+        if st.session_state.test_df is not None and st.session_state.model is not None:
+            show_all_eng(engine_source, st.session_state.scoring_model, processor,
+                         data_version=engine_data_version)
+        else:
+            st.error("❌ Data or model not loaded. Please check the system status in sidebar.")
+
+    elif selected_feat == "Specific Engine":
+        if st.session_state.test_df is not None and st.session_state.model is not None:
+            engine_id = st.slider("Select Engine ID:", 
+                                 min_value=int(min(available_engines)), 
+                                 max_value=int(max(available_engines)), 
+                                 value=int(min(available_engines)))
+
+            if st.button("Analyze Engine Health", type="primary"):
+                st.session_state.analyzed_engine = engine_id
+
+            # Keep showing the stored analysis across reruns (expanders, report downloads)
+            if st.session_state.get('analyzed_engine') == engine_id:
+                show_single_eng(engine_id, engine_source, st.session_state.scoring_model, processor,
+                                data_version=engine_data_version)
+        else:
+            st.error("❌ Data or model not loaded. Please check the system status in sidebar.")
+
+    elif selected_feat == "Cost Optimizer":
+        if st.session_state.test_df is not None and st.session_state.model is not None:
+            optimizer_mode = st.radio("Optimization Mode:", ["Single Engine", "Entire Fleet"], horizontal=True)
+
+            if optimizer_mode == "Entire Fleet":
+                # Values are kept per fleet snapshot key, so new data never shows stale costs
+                cost_key = fleet_snapshot_key(engine_source, data_version=engine_data_version)
+                if st.button("Optimize Fleet Costs", type="primary"):
+                    # Shares the All Engines snapshot: one batched pass, skipped when already scored
+                    with st.spinner("🔍 Collecting health data for all engines..."):
+                        st.session_state.fleet_cost_values = get_fleet_health_values(
+                            engine_source, st.session_state.scoring_model, processor,
+                            data_version=engine_data_version
+                        )
+                    st.session_state.fleet_cost_key = cost_key
+
+                if (st.session_state.get('fleet_cost_key') == cost_key
+                        and st.session_state.get('fleet_cost_values') is not None):
+                    fleet_cost_optimizer(st.session_state.fleet_cost_values)
+
+            else:
+                engine_id = st.slider("Select Engine ID:", 
+                                     min_value=int(min(available_engines)), 
+                                     max_value=int(max(available_engines)), 
+                                     value=int(min(available_engines)))
+
+                if st.button("Optimize Maintenance Costs", type="primary"):
+                    # Automatically fetch health data before running cost optimizer
+                    with st.spinner("🔍 Collecting engine health data..."):
+                        engine_data = get_engine_health_values(
+                            engine_id, engine_source,
+                            st.session_state.scoring_model, processor
+                        )
+
+                    if engine_data is None:
+                        st.warning("⚠️ Please analyze this engine first in the 'Specific Engine' tab.")
+                    else:
+                        st.success("✅ Engine health data fetched successfully!")
+                        # st.json(engine_data)
+
+                        # Now call the optimizer
+                        cost_optimizer(engine_id, engine_data)
+
+        else:
+            st.error("❌ Data or model not loaded. Please check the system status in sidebar.")
+
+
+
+    elif selected_feat == "Root Cause Analysis":
+        if st.session_state.test_df is not None:
+            engine_id = st.slider("Select Engine ID for Analysis:", 
+                                 min_value=int(min(available_engines)), 
+                                 max_value=int(max(available_engines)), 
+                                 value=int(min(available_engines)))
+
+            if st.button("Analyze Root Causes", type="primary"):
+                try:
+                    from feature.root_cause_analyzer import show_root_cause_analysis
+                    show_root_cause_analysis(engine_id, engine_source, processor)
+                except ImportError as e:
+                    st.error(f"❌ Missing dependency: {str(e)}")
+                    st.info("Please install required packages: pip install scikit-learn plotly")
+                except Exception as e:
+                    st.error(f"❌ Error in root cause analysis: {str(e)}")
+        else:
+            st.error("❌ Data not loaded. Please check the system status in sidebar.")
+
+    elif selected_feat == "Trend Forecasting":
+        if st.session_state.test_df is not None:
+            engine_id = st.slider("Select Engine ID:", 
+                                  min_value=int(min(available_engines)), 
+                                  max_value=int(max(available_engines)), 
+                                  value=int(min(available_engines)))
             try:
-                from feature.root_cause_analyzer import show_root_cause_analysis
-                show_root_cause_analysis(engine_id, st.session_state.test_df, processor)
-            except ImportError as e:
-                st.error(f"❌ Missing dependency: {str(e)}")
-                st.info("Please install required packages: pip install scikit-learn plotly")
+                from feature.trend_forecast import show_trend_forecasting
+                show_trend_forecasting(engine_id, engine_source, processor,
+                                       data_version=engine_data_version)
             except Exception as e:
-                st.error(f"❌ Error in root cause analysis: {str(e)}")
-    else:
-        st.error("❌ Data not loaded. Please check the system status in sidebar.")
-        
-elif selected_feat == "Trend Forecasting":
-    if st.session_state.test_df is not None:
-        available_engines = st.session_state.test_df['unit_number'].unique()
-        engine_id = st.slider("Select Engine ID:", 
-                              min_value=int(min(available_engines)), 
-                              max_value=int(max(available_engines)), 
-                              value=int(min(available_engines)))
-        try:
-            from feature.trend_forecast import show_trend_forecasting
-            show_trend_forecasting(engine_id, st.session_state.test_df, processor)
-        except Exception as e:
-            st.error(f"❌ Error loading trend forecasting: {str(e)}")
-    else:
-        st.error("❌ Data not loaded. Please check the system status in sidebar.")
+                st.error(f"❌ Error loading trend forecasting: {str(e)}")
+        else:
+            st.error("❌ Data not loaded. Please check the system status in sidebar.")
+
+    elif selected_feat == "Threshold Tuning":
+        if st.session_state.test_df is not None and st.session_state.model is not None:
+            show_threshold_tuning(engine_source, st.session_state.scoring_model, processor,
+                                  data_version=engine_data_version)
+        else:
+            st.error("❌ Data or model not loaded. Please check the system status in sidebar.")
+
 
 
 
 
 
+    # Footer
+    st.markdown("---")
+    st.markdown(
+        """
+        <div style='text-align: center; color: gray;'>
+            <p>⚙️ © 2025 SmartMach | Powered by AI & Machine Learning | All Rights Reserved</p>
+        </div>
+        """, 
+        unsafe_allow_html=True
+    )
 
-# Footer
-st.markdown("---")
-st.markdown(
-    """
-    <div style='text-align: center; color: gray;'>
-        <p>⚙️ © 2025 SmartMach | Powered by AI & Machine Learning | All Rights Reserved</p>
-    </div>
-    """, 
-    unsafe_allow_html=True
-)
+finally:
+    finished_trace = end_trace()
+    if performance_panel is not None:
+        with performance_panel:
+            show_trace(finished_trace)
 
 # # Quick installation guide in sidebar
 # with st.sidebar.expander("📦 Installation Guide", expanded=False):
@@ -0,0 +1,265 @@
+"""Full-history backtest of the RUL model over every sliding window of every engine.
+
+The dashboard only compares predicted and actual RUL on each engine's last
+window. The backtest streams every window of a history CSV (create_dataset
+semantics, optionally strided) through ChunkedHistory in batches bounded by
+a memory ceiling, predicts each batch in one call through the compiled
+scoring model, and folds the errors into running statistics:
+
+    by RUL bucket   windows, bias, MAE, RMSE, median / p90 / max |error|,
+                    share of late predictions (RUL overestimated) and of
+                    windows landing in the wrong RUL health step
+    by engine       windows, bias, MAE, RMSE, max |error|, late share
+
+Only sums, maxima and an |error| histogram are kept, so memory does not
+grow with the number of windows. The result is saved as a compressed .npz
+that BacktestStats.load() reads back.
+
+Usage (from the repository root):
+    python backtest.py --data data/test_data.csv --output backtest.npz
+    python backtest.py --data data/synthetic/test_data.csv --stride 5 --memory-mb 512 --output backtest.npz
+    python backtest.py --show backtest.npz
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+import numpy as np
+import pandas as pd
+
+from chunked_data import ChunkedHistory, DEFAULT_MEMORY_MB
+
+# Lower edges of the actual-RUL buckets (cycles); the last bucket is open-ended
+RUL_BUCKETS = (0, 20, 50, 100, 150)
+# |error| histogram bins of one cycle; larger errors land in the last bin
+MAX_ERROR = 300
+
+ENGINE_FIELDS = ('engine_ids', 'engine_windows', 'engine_sum_error', 'engine_sum_abs', 'engine_sum_sq',
+                 'engine_max_abs', 'engine_late')
+
+
+def bucket_labels(edges=RUL_BUCKETS):
+    return [f"{lo}–{hi - 1}" for lo, hi in zip(edges[:-1], edges[1:])] + [f"{edges[-1]}+"]
+
+
+class BacktestStats:
+    """Running error statistics of predicted vs actual RUL, by RUL bucket and by engine
+
+    Errors are predicted - actual, in cycles; positive means the RUL was
+    overestimated (maintenance would come too late).
+    """
+
+    def __init__(self, edges=RUL_BUCKETS, max_error=MAX_ERROR, meta=None):
+        self.edges = np.asarray(edges, dtype=np.int64)
+        self.max_error = max_error
+        self.meta = dict(meta or {})
+
+        n_buckets = len(self.edges)
+        self.windows = np.zeros(n_buckets, dtype=np.int64)
+        self.sum_error = np.zeros(n_buckets)
+        self.sum_abs = np.zeros(n_buckets)
+        self.sum_sq = np.zeros(n_buckets)
+        self.max_abs = np.zeros(n_buckets, dtype=np.int64)
+        self.late = np.zeros(n_buckets, dtype=np.int64)
+        self.health_miss = np.zeros(n_buckets, dtype=np.int64)
+        self.histogram = np.zeros((n_buckets, max_error + 1), dtype=np.int64)
+
+        # Per-engine partial sums; an engine may span batches, so they are merged lazily
+        self._engine_parts = []
+        self._engines = None
+
+    # ------------------------------- Accumulation -------------------------------
+
+    def update(self, engine_ids, actual_rul, predicted_rul):
+        """Fold one batch of windows (engine, actual RUL, predicted RUL) into the statistics"""
+        from feature.health_monitor import rul_health_scores
+        actual_rul = np.asarray(actual_rul, dtype=np.int64)
+        error = np.asarray(predicted_rul, dtype=np.int64) - actual_rul
+        abs_error = np.abs(error)
+        late = error > 0
+        n_buckets = len(self.edges)
+
+        bucket = np.clip(np.searchsorted(self.edges, actual_rul, side='right') - 1, 0, n_buckets - 1)
+        self.windows += np.bincount(bucket, minlength=n_buckets)
+        self.sum_error += np.bincount(bucket, error, minlength=n_buckets)
+        self.sum_abs += np.bincount(bucket, abs_error, minlength=n_buckets)
+        self.sum_sq += np.bincount(bucket, abs_error.astype(np.float64) ** 2, minlength=n_buckets)
+        np.maximum.at(self.max_abs, bucket, abs_error)
+        self.late += np.bincount(bucket[late], minlength=n_buckets)
+        health_miss = rul_health_scores(predicted_rul) != rul_health_scores(actual_rul)
+        self.health_miss += np.bincount(bucket[health_miss], minlength=n_buckets)
+        self.histogram += np.bincount(bucket * (self.max_error + 1) + np.minimum(abs_error, self.max_error),
+                                      minlength=self.histogram.size).reshape(self.histogram.shape)
+
+        ids, rows = np.unique(np.asarray(engine_ids, dtype=np.int64), return_inverse=True)
+        max_abs = np.zeros(len(ids), dtype=np.int64)
+        np.maximum.at(max_abs, rows, abs_error)
+        self._engine_parts.append((
+            ids, np.bincount(rows, minlength=len(ids)), np.bincount(rows, error, minlength=len(ids)),
+            np.bincount(rows, abs_error, minlength=len(ids)),
+            np.bincount(rows, abs_error.astype(np.float64) ** 2, minlength=len(ids)),
+            max_abs, np.bincount(rows[late], minlength=len(ids))
+        ))
+        self._engines = None
+
+    def engine_sums(self):
+        """Per-engine (engine_ids, windows, sum_error, sum_abs, sum_sq, max_abs, late), sorted by engine"""
+        if self._engines is None:
+            if not self._engine_parts:
+                self._engine_parts = [tuple(np.zeros(0, dtype=np.int64) for _ in ENGINE_FIELDS)]
+            parts = [np.concatenate(column) for column in zip(*self._engine_parts)]
+            ids, rows = np.unique(parts[0], return_inverse=True)
+            sums = [np.bincount(rows, column, minlength=len(ids)) for column in parts[1:]]
+            max_abs = np.zeros(len(ids), dtype=np.int64)
+            np.maximum.at(max_abs, rows, parts[5])
+            self._engines = (ids, sums[0].astype(np.int64), sums[1], sums[2], sums[3], max_abs,
+                             sums[5].astype(np.int64))
+            self._engine_parts = [self._engines]
+        return self._engines
+
+    # ------------------------------- Reports -------------------------------
+
+    def _quantile(self, histogram, counts, q):
+        # Smallest |error| whose cumulative count reaches q of the windows
+        cumulative = np.cumsum(histogram, axis=-1)
+        return np.argmax(cumulative >= np.ceil(q * counts)[..., None], axis=-1)
+
+    def bucket_frame(self):
+        """Error statistics per actual-RUL bucket, plus an 'All' row"""
+        windows = np.append(self.windows, self.windows.sum())
+        sums = [np.append(a, a.sum()) for a in (self.sum_error, self.sum_abs, self.sum_sq, self.late, self.health_miss)]
+        histogram = np.vstack([self.histogram, self.histogram.sum(axis=0)])
+        n = np.maximum(windows, 1)
+        frame = pd.DataFrame({
+            'RUL Bucket': bucket_labels(self.edges.tolist()) + ['All'],
+            'Windows': windows,
+            'Bias': np.round(sums[0] / n, 2),
+            'MAE': np.round(sums[1] / n, 2),
+            'RMSE': np.round(np.sqrt(sums[2] / n), 2),
+            'P50 |Error|': self._quantile(histogram, windows, 0.5),
+            'P90 |Error|': self._quantile(histogram, windows, 0.9),
+            'Max |Error|': np.append(self.max_abs, self.max_abs.max(initial=0)),
+            'Late %': np.round(sums[3] / n * 100, 1),
+            'Health Step Miss %': np.round(sums[4] / n * 100, 1),
+        })
+        return frame[frame['Windows'] > 0].reset_index(drop=True)
+
+    def engine_frame(self):
+        """Error statistics per engine, worst MAE first"""
+        ids, windows, sum_error, sum_abs, sum_sq, max_abs, late = self.engine_sums()
+        n = np.maximum(windows, 1)
+        frame = pd.DataFrame({
+            'Engine ID': ids,
+            'Windows': windows,
+            'Bias': np.round(sum_error / n, 2),
+            'MAE': np.round(sum_abs / n, 2),
+            'RMSE': np.round(np.sqrt(sum_sq / n), 2),
+            'Max |Error|': max_abs,
+            'Late %': np.round(late / n * 100, 1),
+        })
+        return frame.sort_values('MAE', ascending=False, kind='stable').reset_index(drop=True)
+
+    # ------------------------------- Artifact -------------------------------
+
+    def save(self, path):
+        """Compressed .npz with the raw sums (lossless; frames are derived on load)"""
+        np.savez_compressed(
+            path, meta=np.array(json.dumps(self.meta)), edges=self.edges, max_error=np.array(self.max_error),
+            windows=self.windows, sum_error=self.sum_error, sum_abs=self.sum_abs, sum_sq=self.sum_sq,
+            max_abs=self.max_abs, late=self.late, health_miss=self.health_miss, histogram=self.histogram,
+            **dict(zip(ENGINE_FIELDS, self.engine_sums()))
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as artifact:
+            stats = cls(artifact['edges'], int(artifact['max_error']), json.loads(str(artifact['meta'])))
+            for name in ('windows', 'sum_error', 'sum_abs', 'sum_sq', 'max_abs', 'late', 'health_miss', 'histogram'):
+                setattr(stats, name, artifact[name])
+            stats._engines = tuple(artifact[name] for name in ENGINE_FIELDS)
+            stats._engine_parts = [stats._engines]
+        return stats
+
+
+def run_backtest(history, model, seq_length=50, stride=1, on_batch=None):
+    """Predict every (strided) window of a ChunkedHistory and return its BacktestStats
+
+    `model` is called once per bounded batch (pass the compiled scoring model
+    from quantize_model); on_batch(stats) is called after each batch.
+    """
+    from feature.health_monitor import predict_rul
+    stats = BacktestStats()
+    start = time.perf_counter()
+    predict_seconds = 0.0
+    for engine_ids, _, actual_rul, X in history.windows(seq_length, stride):
+        predict_start = time.perf_counter()
+        predicted_rul = predict_rul(model, X)
+        predict_seconds += time.perf_counter() - predict_start
+        stats.update(engine_ids, actual_rul, predicted_rul)
+        if on_batch is not None:
+            on_batch(stats)
+
+    seconds = time.perf_counter() - start
+    total = int(stats.windows.sum())
+    stats.meta.update({
+        'data': history.path,
+        'seq_length': seq_length,
+        'stride': stride,
+        'memory_mb': history.memory_limit_mb,
+        'windows': total,
+        'engines': len(stats.engine_sums()[0]),
+        'seconds': round(seconds, 2),
+        'predict_seconds': round(predict_seconds, 2),
+        'windows_per_second': round(total / seconds, 1) if seconds else None,
+        'precision': getattr(model, 'precision', 'float32'),
+    })
+    return stats
+
+
+def print_report(stats, worst=10):
+    meta = stats.meta
+    if 'windows' in meta:
+        print(f"{meta['windows']} windows of {meta['engines']} engines ({meta['data']}, seq_length "
+              f"{meta['seq_length']}, stride {meta['stride']}) in {meta['seconds']}s "
+              f"({meta['windows_per_second']} windows/s, {meta['predict_seconds']}s in predict)")
+    print("\nError by actual RUL (error = predicted - actual, cycles):")
+    print(stats.bucket_frame().to_string(index=False))
+    print(f"\n{worst} engines with the highest MAE:")
+    print(stats.engine_frame().head(worst).to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data/test_data.csv", help="history CSV (same layout as data/test_data.csv)")
+    parser.add_argument("--train", default="data/train_data.csv", help="training CSV the scaler is fitted on")
+    parser.add_argument("--model", default="model/model.h5")
+    parser.add_argument("--precision", default=None, help="float32 (compiled), float16 or int8; "
+                                                          "default $SMARTMACH_PRECISION, else float32")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB, help="memory ceiling for data chunks")
+    parser.add_argument("--seq-length", type=int, default=50)
+    parser.add_argument("--stride", type=int, default=1, help="keep every n-th window of each engine")
+    parser.add_argument("--output", default="backtest.npz", help="compressed statistics artifact")
+    parser.add_argument("--worst", type=int, default=10, help="engines listed in the printed report")
+    parser.add_argument("--show", metavar="NPZ", default=None, help="print a saved artifact instead of running")
+    args = parser.parse_args()
+
+    if args.show:
+        print_report(BacktestStats.load(args.show), args.worst)
+        raise SystemExit
+
+    from preprocess import load_model
+    from inference import quantize_model
+    model = load_model(args.model)
+    if model is None:
+        raise SystemExit(f"Could not load the model from {args.model}")
+    scoring_model = quantize_model(model, args.precision)
+    history = ChunkedHistory.with_training_scaler(args.data, args.train, args.memory_mb)
+
+    stats = run_backtest(history, scoring_model, args.seq_length, args.stride)
+    stats.meta['model'] = args.model
+    stats.save(args.output)
+    print_report(stats, args.worst)
+    print(f"\nstatistics written to {args.output}")
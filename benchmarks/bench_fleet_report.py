@@ -0,0 +1,80 @@
+"""Benchmark the fleet PDF report at large fleet sizes.
+
+Builds synthetic FleetSnapshots (no model or dataset needed) and times
+generate_fleet_report. Wall time is measured without tracing; peak Python
+memory comes from a second, tracemalloc-traced build (tracing slows it down).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_fleet_report
+    python -m benchmarks.bench_fleet_report --sizes 1000 10000 50000
+"""
+import argparse
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+from feature.fleet_snapshot import FleetSnapshot
+from feature.generatereport_all_eng import generate_fleet_report
+
+SENSOR_NAMES = ['Temperature', 'Pressure', 'RPM', 'Fuel Flow', 'Vibration X', 'Vibration Y',
+                'Vibration Z', 'Oil Temp', 'Oil Pressure', 'Exhaust Temp', 'Compressor Temp',
+                'Fan Speed', 'Throttle Position', 'Fuel Temp', 'Engine Load']
+
+
+def synthetic_snapshot(n_engines, seed=0):
+    """Random but plausible FleetSnapshot with `n_engines` rows"""
+    rng = np.random.default_rng(seed)
+    n_sensors = len(SENSOR_NAMES)
+
+    pred_rul = rng.integers(0, 250, n_engines)
+    rul_health = np.select([pred_rul > 150, pred_rul > 50, pred_rul > 20, pred_rul > 1],
+                           [100, 70, 40, 5], default=0)
+    sensor_score = np.round(rng.uniform(50, 100, (n_engines, n_sensors)), 2)
+    sensor_health = np.round(sensor_score.mean(axis=1), 2)
+    sensor_status = rng.choice(3, size=(n_engines, n_sensors), p=[0.9, 0.05, 0.05])
+
+    return FleetSnapshot(
+        engine_ids=np.arange(1, n_engines + 1),
+        pred_rul=pred_rul,
+        actual_rul=np.clip(pred_rul + rng.integers(-20, 20, n_engines), 0, None),
+        rul_health=rul_health,
+        sensor_health=sensor_health,
+        overall_health=np.round(0.6 * rul_health + 0.4 * sensor_health, 2),
+        sensor_names=SENSOR_NAMES,
+        sensor_units=[''] * n_sensors,
+        sensor_values=rng.uniform(0, 100, (n_engines, n_sensors)),
+        sensor_status=sensor_status,
+        sensor_anomaly=np.round(100 - sensor_score, 2),
+        sensor_score=sensor_score,
+    )
+
+
+def run(sizes):
+    processor = SimpleNamespace(sensor_mapping={f"sensor_{i}": name for i, name in enumerate(SENSOR_NAMES)})
+
+    # Warm-up: font loading, matplotlib and reportlab imports
+    generate_fleet_report(synthetic_snapshot(100), processor)
+
+    print(f"{'engines':>8} {'seconds':>9} {'rows/s':>9} {'pdf MB':>8} {'peak MB':>8}")
+    for n_engines in sizes:
+        snapshot = synthetic_snapshot(n_engines)
+
+        start = time.perf_counter()
+        buffer = generate_fleet_report(snapshot, processor)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        generate_fleet_report(snapshot, processor)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        size_mb = len(buffer.getvalue()) / 1e6 if buffer else float('nan')
+        print(f"{n_engines:>8} {elapsed:>9.2f} {n_engines / elapsed:>9.0f} {size_mb:>8.2f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    run(parser.parse_args().sizes)
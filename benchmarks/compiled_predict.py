@@ -0,0 +1,123 @@
+"""Latency and throughput of the bucketed compiled predict (inference.CompiledPredictor).
+
+Compares Keras `model.predict` with CompiledPredictor, as a plain graph and
+XLA-compiled, on a synthetic fleet:
+
+    single engine   predict_engine_health latency per engine (sampled)
+    batch sizes     model call time and windows/s for a range of batch sizes,
+                    including sizes that are not buckets (padding cost)
+    fleet           predict_fleet_health over the whole fleet
+    correctness     max |prediction - Keras| and traces after the run
+
+Usage (from the repository root):
+    python -m benchmarks.compiled_predict
+    python -m benchmarks.compiled_predict --engines 10000 --output compiled.json
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+import numpy as np
+from preprocess import load_data
+from sensor_config import SensorRegistry
+from feature.health_monitor import extract_fleet_windows, predict_engine_health, predict_fleet_health
+from inference import CompiledPredictor
+from benchmarks.run_benchmarks import SEQ_LENGTH, load_benchmark_model, synthetic_fleet_df, run_metadata
+
+BATCH_SIZES = [1, 7, 32, 100, 512, 1000]
+
+
+def build_modes(model):
+    return [
+        ("keras predict", model),
+        ("compiled graph", CompiledPredictor(model, jit_compile=False)),
+        ("compiled xla", CompiledPredictor(model, jit_compile=True)),
+    ]
+
+
+def median_ms(fn, calls):
+    fn()
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1e3
+
+
+def single_engine(predictor, fleet_df, engine_ids, processor, samples):
+    times = []
+    predict_engine_health(int(engine_ids[0]), fleet_df, predictor, processor, SEQ_LENGTH)
+    for engine_id in engine_ids[:samples]:
+        start = time.perf_counter()
+        predict_engine_health(int(engine_id), fleet_df, predictor, processor, SEQ_LENGTH)
+        times.append(time.perf_counter() - start)
+    return {
+        'single_p50_ms': round(float(np.percentile(times, 50)) * 1e3, 3),
+        'single_p99_ms': round(float(np.percentile(times, 99)) * 1e3, 3),
+    }
+
+
+def batch_sizes(predictor, X, sizes, repeats):
+    results = {}
+    for size in sizes:
+        batch = X[:size]
+        ms = median_ms(lambda: predictor.predict(batch, verbose=0), repeats)
+        results[str(size)] = {'ms': round(ms, 3), 'windows_per_s': round(len(batch) / ms * 1e3, 1)}
+    return results
+
+
+def run(engines=5000, repeats=5, samples=50, cycles=60, model_path="model/model.h5"):
+    raw_train_df, _ = load_data()
+    processor = SensorRegistry()
+    model, model_name = load_benchmark_model(model_path, raw_train_df.shape[1] - 3)
+
+    fleet_df = synthetic_fleet_df(raw_train_df, engines, cycles)
+    engine_ids, _, X, _ = extract_fleet_windows(fleet_df, SEQ_LENGTH)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    sizes = [s for s in BATCH_SIZES if s < len(X)] + [len(X)]
+    reference = model.predict(X, verbose=0)[:, 0]
+
+    print(f"model: {model_name}; {len(X)} fleet windows")
+    print(f"{'mode':<16} {'1-eng p50':>10} {'1-eng p99':>10} {'fleet ms':>10} "
+          + " ".join(f"{'b=' + str(s) + ' ms':>10}" for s in sizes) + f" {'max |d|':>9} {'traces':>7}")
+
+    results = []
+    for name, predictor in build_modes(model):
+        result = {'mode': name}
+        result.update(single_engine(predictor, fleet_df, engine_ids, processor, samples))
+        result['batches'] = batch_sizes(predictor, X, sizes, repeats)
+        fleet_ms = median_ms(lambda: predict_fleet_health(fleet_df, predictor, processor, SEQ_LENGTH),
+                                max(1, repeats // 2))
+        result['fleet_ms'] = round(fleet_ms, 1)
+        result['max_abs_delta'] = round(float(np.abs(predictor.predict(X, verbose=0)[:, 0] - reference).max()), 5)
+        result['traces'] = getattr(predictor, 'tracing_count', None)
+        results.append(result)
+        print(f"{name:<16} {result['single_p50_ms']:>10.2f} {result['single_p99_ms']:>10.2f} {fleet_ms:>10.1f} "
+              + " ".join(f"{result['batches'][str(s)]['ms']:>10.2f}" for s in sizes)
+              + f" {result['max_abs_delta']:>9.5f} {str(result['traces']):>7}")
+
+    meta = run_metadata([engines], repeats, samples, cycles, model_name)
+    meta['buckets'] = list(CompiledPredictor(model).buckets)
+    return {'meta': meta, 'results': results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", type=int, default=5000, help="synthetic fleet size")
+    parser.add_argument("--repeats", type=int, default=5, help="timed calls per batch size")
+    parser.add_argument("--samples", type=int, default=50, help="engines timed through predict_engine_health")
+    parser.add_argument("--cycles", type=int, default=60, help="history rows kept per synthetic engine")
+    parser.add_argument("--model", default="model/model.h5")
+    parser.add_argument("--output", default=None,
+                        help="JSON results file (default: benchmarks/results_compiled_<commit>.json)")
+    args = parser.parse_args()
+
+    report = run(args.engines, args.repeats, args.samples, args.cycles, args.model)
+    output = args.output or os.path.join("benchmarks", f"results_compiled_{report['meta']['commit'] or 'local'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
@@ -0,0 +1,137 @@
+"""Accuracy and throughput of reduced-precision RUL inference.
+
+Compares the Keras float32 model with TFLite conversions of it (float32,
+float16 weights, int8 dynamic-range weights; see inference.py):
+
+    accuracy     every sliding window of data/test_data.csv (create_dataset
+                 semantics): prediction delta against Keras float32, RMSE
+                 against the true RUL, rounded-RUL agreement and engines whose
+                 GOOD/WARNING/CRITICAL status changes on their last window
+    throughput   windows/s over a synthetic fleet's last windows, and
+                 single-window latency as in predict_engine_health
+    memory       model size and resident memory added by loading it
+
+Usage (from the repository root):
+    python -m benchmarks.quantization
+    python -m benchmarks.quantization --engines 10000 --output quant.json
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+import numpy as np
+
+from preprocess import load_data, scale_data, create_dataset
+from sensor_config import SensorRegistry
+from feature.health_monitor import extract_fleet_windows, predict_rul, score_fleet_windows
+from inference import QuantizedPredictor
+from metrics import resident_memory_bytes
+from benchmarks.run_benchmarks import SEQ_LENGTH, load_benchmark_model, synthetic_fleet_df, run_metadata
+
+MODES = [("float32", "keras"), ("float32", "tflite"), ("float16", "tflite"), ("int8", "tflite")]
+
+
+def build_predictor(model, precision, runtime, batch_size):
+    """(predictor, model bytes, resident MB added while building it)"""
+    before = resident_memory_bytes()
+    if runtime == "keras":
+        predictor = model
+        size = sum(w.size * w.dtype.itemsize for w in model.get_weights())
+    else:
+        predictor = QuantizedPredictor.from_keras(model, precision, batch_size)
+        size = predictor.size_bytes
+    return predictor, size, (resident_memory_bytes() - before) / 1e6
+
+
+def accuracy(predictor, X, y, reference, last_windows, reference_status, processor):
+    predicted = predictor.predict(X, verbose=0)[:, 0]
+    delta = predicted - reference
+    engine_ids, actual_rul, X_last, feature_cols = last_windows
+    snapshot = score_fleet_windows(engine_ids, X_last, predict_rul(predictor, X_last), actual_rul,
+                                   feature_cols, processor, SEQ_LENGTH)
+    return {
+        'windows': len(X),
+        'mean_abs_delta': round(float(np.abs(delta).mean()), 4),
+        'max_abs_delta': round(float(np.abs(delta).max()), 4),
+        'rmse_vs_actual': round(float(np.sqrt(np.mean((predicted - y) ** 2))), 3),
+        'rounded_rul_agreement': round(float(np.mean(np.rint(predicted) == np.rint(reference))), 4),
+        'status_changes': int((snapshot.status != reference_status).sum()),
+    }
+
+
+def throughput(predictor, X_fleet, repeats):
+    predictor.predict(X_fleet[:1], verbose=0)
+    fleet_times, single_times = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predictor.predict(X_fleet, verbose=0)
+        fleet_times.append(time.perf_counter() - start)
+    for i in range(min(50, len(X_fleet))):
+        start = time.perf_counter()
+        predictor.predict(X_fleet[i:i + 1], verbose=0)
+        single_times.append(time.perf_counter() - start)
+    return {
+        'fleet_windows_per_s': round(len(X_fleet) / float(np.median(fleet_times)), 1),
+        'single_p50_ms': round(float(np.percentile(single_times, 50)) * 1e3, 3),
+        'single_p99_ms': round(float(np.percentile(single_times, 99)) * 1e3, 3),
+    }
+
+
+def run(engines=10000, repeats=3, batch_size=32, cycles=60, model_path="model/model.h5"):
+    raw_train_df, raw_test_df = load_data()
+    _, test_df = scale_data(raw_train_df.copy(), raw_test_df)
+    processor = SensorRegistry()
+    model, model_name = load_benchmark_model(model_path, test_df.shape[1] - 3)
+
+    X, y = create_dataset(test_df, SEQ_LENGTH)
+    X = X.astype(np.float32)
+    last_windows = extract_fleet_windows(test_df, SEQ_LENGTH)
+    _, _, X_fleet, _ = extract_fleet_windows(synthetic_fleet_df(raw_train_df, engines, cycles), SEQ_LENGTH)
+    X_fleet = X_fleet.astype(np.float32)
+
+    reference = model.predict(X, verbose=0)[:, 0]
+    engine_ids, actual_rul, X_last, feature_cols = last_windows
+    reference_status = score_fleet_windows(engine_ids, X_last, predict_rul(model, X_last), actual_rul,
+                                           feature_cols, processor, SEQ_LENGTH).status
+
+    print(f"model: {model_name}; {len(X)} test windows, {len(X_fleet)} fleet windows")
+    print(f"{'mode':<18} {'size KB':>9} {'+RSS MB':>8} {'mean |d|':>9} {'max |d|':>9} {'RMSE':>8} "
+          f"{'agree':>7} {'status':>7} {'win/s':>10} {'1-win ms':>9}")
+
+    results = []
+    for precision, runtime in MODES:
+        predictor, size, rss_mb = build_predictor(model, precision, runtime, batch_size)
+        result = {'precision': precision, 'runtime': runtime, 'model_kb': round(size / 1e3, 1),
+                  'rss_delta_mb': round(rss_mb, 1)}
+        result.update(accuracy(predictor, X, y, reference, last_windows, reference_status, processor))
+        result.update(throughput(predictor, X_fleet, repeats))
+        results.append(result)
+        print(f"{precision + ' ' + runtime:<18} {result['model_kb']:>9.1f} {result['rss_delta_mb']:>8.1f} "
+              f"{result['mean_abs_delta']:>9.4f} {result['max_abs_delta']:>9.4f} {result['rmse_vs_actual']:>8.2f} "
+              f"{result['rounded_rul_agreement']:>7.1%} {result['status_changes']:>7} "
+              f"{result['fleet_windows_per_s']:>10.0f} {result['single_p50_ms']:>9.2f}")
+
+    meta = run_metadata([engines], repeats, None, cycles, model_name)
+    meta['batch_size'] = batch_size
+    return {'meta': meta, 'results': results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", type=int, default=10000, help="synthetic fleet size for throughput")
+    parser.add_argument("--repeats", type=int, default=3, help="timed whole-fleet predictions per mode")
+    parser.add_argument("--batch-size", type=int, default=32, help="static TFLite batch size")
+    parser.add_argument("--cycles", type=int, default=60, help="history rows kept per synthetic engine")
+    parser.add_argument("--model", default="model/model.h5")
+    parser.add_argument("--output", default=None,
+                        help="JSON results file (default: benchmarks/results_quantization_<commit>.json)")
+    args = parser.parse_args()
+
+    report = run(args.engines, args.repeats, args.batch_size, args.cycles, args.model)
+    output = args.output or os.path.join("benchmarks", f"results_quantization_{report['meta']['commit'] or 'local'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
@@ -0,0 +1,260 @@
+"""Benchmark suite for the scoring hot paths.
+
+Runs headless (no Streamlit server) against synthetic fleets from
+synthetic_fleet.py, scaled like the bundled data, and times:
+
+    predict_engine_health            per engine, sampled
+    calculate_overall_health_score   per engine, sampled
+    predict_fleet_health             whole fleet, as in show_all_eng
+    analyze_sensor_issues            whole fleet
+    generate_fleet_report            whole fleet
+    create_csv_report                whole fleet
+    train_predict_rnn                per engine, independent of fleet size
+
+Every benchmark reports throughput, p50/p99 latency and peak traced Python
+memory. Memory is taken from a separate tracemalloc run because tracing
+slows the timed calls down. Results are written as JSON so runs from
+different commits can be compared with --compare.
+
+If model/model.h5 cannot be loaded (e.g. a git-lfs pointer checkout), an
+untrained stand-in LSTM with the same input shape is used; inference cost
+does not depend on the weights.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 100 1000 10000 50000 --output bench.json
+    python -m benchmarks.run_benchmarks --compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+import numpy as np
+import pandas as pd
+
+from preprocess import load_data, scale_data, load_model, compact_frame
+from synthetic_fleet import generate_fleet
+from sensor_config import SensorRegistry
+from feature.health_monitor import HealthScoreCalculator, predict_engine_health, predict_fleet_health
+from feature.generatereport_all_eng import analyze_sensor_issues, generate_fleet_report, create_csv_report
+from feature.trend_forecast import train_predict_rnn
+
+DEFAULT_SIZES = [100, 1000, 10000]
+SEQ_LENGTH = 50
+
+
+# ------------------------------- Inputs -------------------------------
+
+def load_benchmark_model(model_path, n_features):
+    """The trained model if it loads, otherwise an untrained stand-in of the same input shape"""
+    model = load_model(model_path) if os.path.exists(model_path) else None
+    if model is not None:
+        return model, model_path
+
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Input, LSTM, Dense
+    model = Sequential([
+        Input((SEQ_LENGTH, n_features)),
+        LSTM(64, return_sequences=True),
+        LSTM(32),
+        Dense(1)
+    ])
+    return model, "stand-in (untrained LSTM)"
+
+
+def synthetic_fleet_df(raw_train_df, n_engines, cycles=60, seed=0):
+    """Scaled, compacted synthetic test fleet of `n_engines` engines, each with its last `cycles` cycles"""
+    chunks = generate_fleet(n_engines, "test", history_length=cycles, min_cycles=cycles, seed=seed)
+    fleet_df = pd.concat(chunks, ignore_index=True)
+    _, fleet_df = scale_data(raw_train_df.copy(), fleet_df)
+    return compact_frame(fleet_df)
+
+
+# ------------------------------- Measurement -------------------------------
+
+def time_calls(fn, calls):
+    """Wall time of each call in `calls` (a list of argument tuples)"""
+    timings = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def peak_memory_mb(fn, args):
+    """Peak traced Python memory of a single call"""
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1e6
+
+
+def summarize(name, fleet_size, timings, items_per_call, unit, peak_mb):
+    timings = np.asarray(timings)
+    return {
+        'benchmark': name,
+        'fleet_size': fleet_size,
+        'calls': len(timings),
+        'p50_ms': round(float(np.percentile(timings, 50)) * 1e3, 3),
+        'p99_ms': round(float(np.percentile(timings, 99)) * 1e3, 3),
+        'mean_ms': round(float(timings.mean()) * 1e3, 3),
+        'throughput': round(items_per_call / float(timings.mean()), 2),
+        'throughput_unit': unit,
+        'peak_mb': round(peak_mb, 2),
+    }
+
+
+def bench(name, fleet_size, fn, calls, items_per_call, unit):
+    """Warm up, time every call, then trace one call for peak memory"""
+    fn(*calls[0])
+    timings = time_calls(fn, calls)
+    result = summarize(name, fleet_size, timings, items_per_call, unit, peak_memory_mb(fn, calls[0]))
+    print(f"{name:<32} {str(fleet_size):>7} {result['p50_ms']:>11.2f} {result['p99_ms']:>11.2f} "
+          f"{result['throughput']:>12.1f} {unit:<10} {result['peak_mb']:>8.1f}")
+    return result
+
+
+# ------------------------------- Suite -------------------------------
+
+def run(sizes, repeats=3, samples=50, rnn_engines=3, cycles=60, model_path="model/model.h5"):
+    raw_train_df, raw_test_df = load_data()
+    train_df, test_df = scale_data(raw_train_df.copy(), raw_test_df)
+    test_df = compact_frame(test_df)
+    processor = SensorRegistry()
+    n_features = test_df.shape[1] - 3
+    model, model_name = load_benchmark_model(model_path, n_features)
+    calculator = HealthScoreCalculator(processor)
+    sensors = list(processor.sensor_mapping)
+
+    print(f"model: {model_name}")
+    print(f"{'benchmark':<32} {'engines':>7} {'p50 ms':>11} {'p99 ms':>11} {'throughput':>12} {'':<10} {'peak MB':>8}")
+
+    results = []
+    for n_engines in sizes:
+        fleet_df = synthetic_fleet_df(raw_train_df, n_engines, cycles)
+        rng = np.random.default_rng(0)
+        sampled = rng.choice(np.arange(1, n_engines + 1), size=min(samples, n_engines), replace=False)
+
+        results.append(bench(
+            "predict_engine_health", n_engines, predict_engine_health,
+            [(int(e), fleet_df, model, processor, SEQ_LENGTH) for e in sampled], 1, "engines/s"
+        ))
+
+        windows = fleet_df[fleet_df['unit_number'].isin(sampled)].groupby('unit_number').tail(SEQ_LENGTH)
+        health_calls = []
+        for _, window in windows.groupby('unit_number'):
+            history = {s: window[s].values for s in sensors}
+            current = {s: window[s].iloc[-1] for s in sensors}
+            health_calls.append((int(rng.integers(0, 250)), history, current))
+        results.append(bench(
+            "calculate_overall_health_score", n_engines, calculator.calculate_overall_health_score,
+            health_calls, 1, "engines/s"
+        ))
+
+        fleet_calls = [(fleet_df, model, processor, SEQ_LENGTH)] * repeats
+        results.append(bench(
+            "predict_fleet_health", n_engines, predict_fleet_health, fleet_calls, n_engines, "engines/s"
+        ))
+
+        snapshot = predict_fleet_health(fleet_df, model, processor, SEQ_LENGTH)
+        results.append(bench(
+            "analyze_sensor_issues", n_engines, analyze_sensor_issues,
+            [(snapshot, processor)] * repeats, n_engines, "engines/s"
+        ))
+        results.append(bench(
+            "generate_fleet_report", n_engines, generate_fleet_report,
+            [(snapshot, processor)] * repeats, n_engines, "engines/s"
+        ))
+        results.append(bench(
+            "create_csv_report", n_engines, create_csv_report,
+            [(snapshot,)] * repeats, n_engines, "engines/s"
+        ))
+
+    # The forecaster trains on one engine's own history, so fleet size does not matter
+    sizes_per_engine = test_df.groupby('unit_number').size()
+    long_engines = sizes_per_engine.index[sizes_per_engine >= 100][:rnn_engines]
+    rnn_calls = [(test_df[test_df['unit_number'] == e].tail(100), 'sensor_21', SEQ_LENGTH, 10)
+                 for e in long_engines]
+    if rnn_calls:
+        results.append(bench(
+            "train_predict_rnn", None, train_predict_rnn, rnn_calls, 1, "engines/s"
+        ))
+
+    return {
+        'meta': run_metadata(sizes, repeats, samples, cycles, model_name),
+        'results': results,
+    }
+
+
+def run_metadata(sizes, repeats, samples, cycles, model_name):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+
+    import tensorflow as tf
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'tensorflow': tf.__version__,
+        'cpu_count': os.cpu_count(),
+        'model': model_name,
+        'sizes': sizes,
+        'repeats': repeats,
+        'samples': samples,
+        'cycles': cycles,
+    }
+
+
+def compare(before_path, after_path):
+    """Print p50 latency and throughput changes between two result files"""
+    with open(before_path) as f:
+        before = {(r['benchmark'], r['fleet_size']): r for r in json.load(f)['results']}
+    with open(after_path) as f:
+        after = json.load(f)['results']
+
+    print(f"{'benchmark':<32} {'engines':>7} {'p50 before':>11} {'p50 after':>11} {'speedup':>8}")
+    for result in after:
+        old = before.get((result['benchmark'], result['fleet_size']))
+        if old is None:
+            continue
+        speedup = old['p50_ms'] / result['p50_ms'] if result['p50_ms'] else float('nan')
+        print(f"{result['benchmark']:<32} {str(result['fleet_size']):>7} {old['p50_ms']:>11.2f} "
+              f"{result['p50_ms']:>11.2f} {speedup:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="fleet sizes (engines)")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs of each whole-fleet benchmark")
+    parser.add_argument("--samples", type=int, default=50, help="engines sampled for per-engine benchmarks")
+    parser.add_argument("--rnn-engines", type=int, default=3, help="engines timed for train_predict_rnn")
+    parser.add_argument("--cycles", type=int, default=60, help="history rows kept per synthetic engine")
+    parser.add_argument("--model", default="model/model.h5")
+    parser.add_argument("--output", default=None, help="JSON results file (default: benchmarks/results_<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        report = run(args.sizes, args.repeats, args.samples, args.rnn_engines, args.cycles, args.model)
+        output = args.output or os.path.join("benchmarks", f"results_{report['meta']['commit'] or 'local'}.json")
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {output}")
@@ -0,0 +1,179 @@
+"""Out-of-core processing for sensor histories larger than RAM.
+
+ChunkedHistory reads a CSV laid out like data/test_data.csv (rows grouped
+by engine, cycles in order) in engine-aligned chunks, so no engine is ever
+split across chunks. Each chunk is scaled with a scaler fitted the same way
+as scale_data() and held as a float32 CompactDataset. The chunk size comes
+from a memory ceiling rather than a row count; the ceiling covers the
+chunks in flight, not results kept across chunks such as tail().
+
+    live scoring   tail()     keeps only each engine's last rows, then
+                              predict_fleet_health() as usual
+    backfill       windows()  streams every sliding window of the full
+                              history in bounded batches
+
+Usage (from the repository root):
+    python chunked_data.py score --data data/synthetic/test_data.csv --memory-mb 256 --output scores.csv
+    python chunked_data.py backfill --data data/synthetic/test_data.csv --memory-mb 256 --output backfill.csv
+"""
+import argparse
+import os
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from preprocess import CompactDataset, ID_COLUMNS
+
+DEFAULT_MEMORY_MB = 256
+# Peak bytes while parsing, carrying and scaling one chunk, per float64 cell read
+CHUNK_OVERHEAD = 8
+# Share of the ceiling a batch of model input windows may take
+WINDOW_SHARE = 0.25
+
+
+def rows_per_chunk(n_columns, memory_limit_mb=DEFAULT_MEMORY_MB):
+    """CSV rows read at a time so one chunk stays within the memory ceiling"""
+    return max(1000, int(memory_limit_mb * 1e6 // (n_columns * 8 * CHUNK_OVERHEAD)))
+
+
+def windows_per_batch(seq_length, n_features, memory_limit_mb=DEFAULT_MEMORY_MB):
+    """float32 windows per batch so one batch takes at most WINDOW_SHARE of the ceiling"""
+    return max(1, int(memory_limit_mb * 1e6 * WINDOW_SHARE // (seq_length * n_features * 4)))
+
+
+def fit_scaler(train_path="data/train_data.csv", memory_limit_mb=DEFAULT_MEMORY_MB):
+    """MinMaxScaler over the training features, fitted chunk by chunk (same result as scale_data)"""
+    columns = pd.read_csv(train_path, nrows=0).columns
+    feature_cols = [c for c in columns if c not in ID_COLUMNS]
+    scaler = MinMaxScaler()
+    for chunk in pd.read_csv(train_path, chunksize=rows_per_chunk(len(columns), memory_limit_mb)):
+        scaler.partial_fit(chunk[feature_cols])
+    return scaler, feature_cols
+
+
+class ChunkedHistory:
+    """Engine-aligned, scaled chunks of a history CSV that does not fit in memory"""
+
+    def __init__(self, path, scaler, feature_cols, memory_limit_mb=DEFAULT_MEMORY_MB):
+        self.path = path
+        self.scaler = scaler
+        self.feature_cols = list(feature_cols)
+        self.memory_limit_mb = memory_limit_mb
+        self.columns = list(pd.read_csv(path, nrows=0).columns)
+        self.chunk_rows = rows_per_chunk(len(self.columns), memory_limit_mb)
+
+    @classmethod
+    def with_training_scaler(cls, path, train_path="data/train_data.csv", memory_limit_mb=DEFAULT_MEMORY_MB):
+        scaler, feature_cols = fit_scaler(train_path, memory_limit_mb)
+        return cls(path, scaler, feature_cols, memory_limit_mb)
+
+    def raw_chunks(self):
+        """Unscaled chunks holding complete engines only"""
+        carry = None
+        for chunk in pd.read_csv(self.path, chunksize=self.chunk_rows):
+            if carry is not None and len(carry):
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            # The last engine may continue in the next chunk
+            units = chunk['unit_number'].values
+            split = len(units) - np.argmax(units[::-1] != units[-1]) if (units != units[-1]).any() else 0
+            carry = chunk.iloc[split:]
+            if len(carry) > self.chunk_rows:
+                raise MemoryError(f"Engine {units[-1]} alone has more than {self.chunk_rows} rows; "
+                                  f"raise the memory limit above {self.memory_limit_mb} MB")
+            if split:
+                yield chunk.iloc[:split]
+        if carry is not None and len(carry):
+            yield carry
+
+    def chunks(self):
+        """Scaled chunks as CompactDatasets (float32 features in model column order)"""
+        for chunk in self.raw_chunks():
+            features = self.scaler.transform(chunk[self.feature_cols])
+            yield CompactDataset(chunk['unit_number'].values, chunk['time_in_cycles'].values,
+                                 chunk['RUL'].values, features, self.feature_cols, self.columns)
+
+    def tail(self, rows=50):
+        """Compact frame of each engine's last `rows` cycles, for live scoring"""
+        parts = []
+        for dataset in self.chunks():
+            kept = np.minimum(dataset.counts, rows)
+            keep = np.repeat(dataset.ends - kept, kept) + np.arange(kept.sum()) - np.repeat(np.cumsum(kept) - kept, kept)
+            parts.append(CompactDataset(dataset.unit_number[keep], dataset.cycles[keep], dataset.rul[keep],
+                                        dataset.features[keep], self.feature_cols, self.columns))
+        if not parts:
+            return CompactDataset([], [], [], np.zeros((0, len(self.feature_cols))), self.feature_cols,
+                                  self.columns).frame()
+        return CompactDataset(
+            np.concatenate([p.unit_number for p in parts]), np.concatenate([p.cycles for p in parts]),
+            np.concatenate([p.rul for p in parts]), np.concatenate([p.features for p in parts]),
+            self.feature_cols, self.columns
+        ).frame()
+
+    def windows(self, seq_length=50, stride=1):
+        """Yield (engine_ids, cycles, actual_rul, X) for every sliding window, in bounded batches.
+
+        Windows follow preprocess.create_dataset: window i covers rows
+        i..i+seq_length-1 of one engine and is labelled with the RUL of its
+        last row. `stride` keeps every n-th window.
+        """
+        batch_size = windows_per_batch(seq_length, len(self.feature_cols), self.memory_limit_mb)
+        offsets = np.arange(seq_length)
+        for dataset in self.chunks():
+            n_windows = np.maximum(dataset.counts - seq_length, -1) // stride + 1
+            engine_rows = np.repeat(np.arange(len(dataset.engine_ids)), n_windows)
+            within = np.arange(n_windows.sum()) - np.repeat(np.cumsum(n_windows) - n_windows, n_windows)
+            starts = (dataset.ends - dataset.counts)[engine_rows] + within * stride
+
+            for i in range(0, len(starts), batch_size):
+                batch_starts = starts[i:i + batch_size]
+                last_rows = batch_starts + seq_length - 1
+                yield (dataset.unit_number[last_rows].astype(np.int64), dataset.cycles[last_rows],
+                       dataset.rul[last_rows].astype(np.int64), dataset.features[batch_starts[:, None] + offsets])
+
+
+def backfill(history, model, seq_length=50, stride=1):
+    """Yield per-window predictions over the full history as DataFrame batches"""
+    from feature.health_monitor import predict_rul
+    for engine_ids, cycles, actual_rul, X in history.windows(seq_length, stride):
+        yield pd.DataFrame({
+            'unit_number': engine_ids,
+            'time_in_cycles': cycles,
+            'actual_rul': actual_rul,
+            'predicted_rul': predict_rul(model, X),
+        })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["score", "backfill"])
+    parser.add_argument("--data", required=True, help="history CSV (same layout as data/test_data.csv)")
+    parser.add_argument("--train", default="data/train_data.csv", help="training CSV the scaler is fitted on")
+    parser.add_argument("--model", default="model/model.h5")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB, help="memory ceiling for data chunks")
+    parser.add_argument("--seq-length", type=int, default=50)
+    parser.add_argument("--stride", type=int, default=1, help="backfill: keep every n-th window")
+    parser.add_argument("--output", required=True, help="CSV written incrementally")
+    args = parser.parse_args()
+
+    from preprocess import load_model
+    model = load_model(args.model)
+    if model is None:
+        raise SystemExit(f"Could not load the model from {args.model}")
+    history = ChunkedHistory.with_training_scaler(args.data, args.train, args.memory_mb)
+
+    if args.mode == "score":
+        from sensor_config import SensorRegistry
+        from feature.health_monitor import predict_fleet_health
+        processor = SensorRegistry()
+        snapshot = predict_fleet_health(history.tail(args.seq_length), model, processor, args.seq_length)
+        snapshot.to_frame().to_csv(args.output, index=False)
+        print(f"{len(snapshot)} engines scored -> {args.output}")
+    else:
+        rows = 0
+        for i, batch in enumerate(backfill(history, model, args.seq_length, args.stride)):
+            batch.to_csv(args.output, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            rows += len(batch)
+        print(f"{rows} windows predicted -> {args.output}")
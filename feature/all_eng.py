@@ -1,198 +1,260 @@
+import os
 import streamlit as st
-from feature.health_monitor import predict_engine_health
+import numpy as np
+from feature.health_monitor import rescore_fleet_health
+from feature.fleet_snapshot import GOOD, WARNING, CRITICAL
 from animation import show_loading_animation
 from feature.generatereport_all_eng import generate_fleet_report, create_csv_report
+from feature.single_eng_report import export_fleet_reports_zip
 from datetime import datetime
+from tracing import span, traced_rerun
+from metrics import record_cache
 
 
+# Sortable columns -> FleetSnapshot array holding their values
+SORT_COLUMNS = {
+    'Engine ID': 'engine_ids',
+    'Health Score': 'overall_health',
+    'Predicted RUL': 'pred_rul',
+    'Actual RUL': 'actual_rul',
+    'Critical Sensors': 'critical_sensors',
+    'Warning Sensors': 'warning_sensors',
+}
+PAGE_SIZES = [10, 25, 50, 100]
+# st.download_button keeps the whole archive in Streamlit's in-memory media store,
+# so the dashboard ZIP holds at most this many reports (lowest health first)
+MAX_ZIP_REPORTS = 500
 
 
+@st.fragment
+@traced_rerun("fleet_table")
+def show_paged_table(snapshot, mask, key, columns=None, max_height=400):
+    """Sort, filter and page snapshot rows on the server; only the visible page is sent.
 
+    Runs as a fragment, so sorting or paging reruns this table alone.
+    """
+    rows = np.flatnonzero(mask)
 
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        sort_by = st.selectbox("Sort by", list(SORT_COLUMNS), key=f"{key}_sort_by")
+    with col2:
+        descending = st.toggle("Descending", key=f"{key}_descending")
+    with col3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    n_pages = max(1, -(-len(rows) // page_size))
+    # Keep the page number valid when the filter or page size shrinks the table
+    if st.session_state.get(f"{key}_page", 1) > n_pages:
+        st.session_state[f"{key}_page"] = n_pages
+    with col4:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key=f"{key}_page")
+
+    values = getattr(snapshot, SORT_COLUMNS[sort_by])[rows]
+    order = np.argsort(-values if descending else values, kind='stable')
+    page_rows = rows[order[(page - 1) * page_size: page * page_size]]
+
+    frame = snapshot.display_frame(page_rows)
+    st.dataframe(
+        frame[columns] if columns else frame,
+        use_container_width=True,
+        hide_index=True,
+        height=min(max_height, len(page_rows) * 35 + 40)
+    )
+    st.caption(f"Showing {(page - 1) * page_size + 1}–{(page - 1) * page_size + len(page_rows)} "
+               f"of {len(rows)} engines (page {page} of {n_pages})")
+
+
+def fleet_snapshot_key(test_df, seq_length=50, data_version=None):
+    """Cache key of the fleet snapshot for this data source and window length"""
+    return (data_version if data_version is not None else id(test_df), seq_length)
 
 
+def get_fleet_snapshot(test_df, model, processor, seq_length=50, data_version=None):
+    """Score the fleet once per (data version, window length) and reuse it across reruns.
 
+    When the data version changes, only engines whose last window changed are
+    re-scored; the rest keep their rows from the previous snapshot.
+    """
+    cache_key = fleet_snapshot_key(test_df, seq_length, data_version)
 
+    record_cache("fleet_snapshot", st.session_state.get('fleet_snapshot_key') == cache_key)
+    if st.session_state.get('fleet_snapshot_key') != cache_key:
+        previous = st.session_state.get('fleet_snapshot')
+        if previous is None:
+            with span("loading_animation"):
+                show_loading_animation("all")
+        with span("fleet_scoring"):
+            st.session_state.fleet_snapshot, st.session_state.fleet_rescore = rescore_fleet_health(
+                test_df, model, processor, seq_length, previous
+            )
+        st.session_state.fleet_snapshot_key = cache_key
+
+    return st.session_state.fleet_snapshot
+
+
+@st.fragment
+@traced_rerun("filtered_report")
+def show_filtered_report(snapshot):
+    """Complete engine table with status filters; toggling a filter reruns only this section"""
+    st.markdown("---")
+    st.subheader("Complete Engine Health Report (Filterable)")
+
+    # Add filter options
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        show_all = st.checkbox("Show All", value=True)
+    with col2:
+        show_critical = st.checkbox("Show Critical", value=True)
+    with col3:
+        show_warning = st.checkbox("Show Warning", value=True)
+    with col4:
+        show_good = st.checkbox("Show Good", value=True)
+
+    # Filter data based on selection
+    if show_all:
+        selected_statuses = [GOOD, WARNING, CRITICAL]
+    else:
+        selected_statuses = [code for code, shown in
+                             [(CRITICAL, show_critical), (WARNING, show_warning), (GOOD, show_good)] if shown]
+    filtered = snapshot.mask(selected_statuses)
+
+    if filtered.any():
+        show_paged_table(snapshot, filtered, "complete_table", max_height=600)
+
+        # Show summary
+        good_count, warning_count, critical_count = np.bincount(snapshot.status[filtered], minlength=3)
+        total_engines = int(filtered.sum())
+
+        st.write(f"**Summary:** Total: {total_engines} | ✅ Good: {good_count} | ⚠️ Warning: {warning_count} | 🚨 Critical: {critical_count}")
+    else:
+        st.info("No engines match the selected filters")
+
+
+@st.fragment
+@traced_rerun("report_downloads")
+def show_report_downloads(snapshot, processor):
+    """PDF, CSV and ZIP export buttons, rerun on their own"""
+    st.subheader("📥 Download Report")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("📄 Generate PDF Report", use_container_width=True):
+            with st.spinner("Generating professional PDF report..."):
+                pdf_buffer = generate_fleet_report(snapshot, processor)
+                if pdf_buffer:
+                    st.success("PDF report generated successfully!")
+                    st.download_button(
+                        label="⬇️ Download PDF Report",
+                        data=pdf_buffer,
+                        file_name=f"fleet_health_report_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+                        mime="application/pdf",
+                        on_click="ignore",
+                        use_container_width=True
+                    )
+
+    with col2:
+        if st.button("📊 Generate CSV Report", use_container_width=True):
+            with st.spinner("Generating CSV report..."):
+                with span("csv_export"):
+                    csv_buffer = create_csv_report(snapshot)
+                if csv_buffer:
+                    st.success("CSV report generated successfully!")
+                    st.download_button(
+                        label="⬇️ Download CSV Data",
+                        data=csv_buffer,
+                        file_name=f"fleet_health_data_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                        mime="text/csv",
+                        on_click="ignore",
+                        use_container_width=True
+                     )
+
+    with col3:
+        if st.button("🗂️ Generate All Engine Reports (ZIP)", use_container_width=True):
+            zip_path = None
+            try:
+                engines = snapshot
+                if len(snapshot) > MAX_ZIP_REPORTS:
+                    engines = snapshot.take(np.sort(np.argsort(snapshot.overall_health, kind='stable')[:MAX_ZIP_REPORTS]))
+                    st.info(f"ℹ️ The download is held in memory, so the ZIP covers the {MAX_ZIP_REPORTS} engines "
+                            f"with the lowest health out of {len(snapshot)}.")
+                with st.spinner(f"Rendering {len(engines)} engine reports in parallel..."):
+                    zip_path, stats = export_fleet_reports_zip(engines)
+                st.success(
+                    f"{stats['reports']} engine reports generated in {stats['seconds']:.1f}s "
+                    f"({stats['reports_per_second']:.1f} reports/s)"
+                )
+                with open(zip_path, "rb") as zip_file:
+                    st.download_button(
+                        label="⬇️ Download Engine Reports (ZIP)",
+                        data=zip_file,
+                        file_name=f"engine_health_reports_{datetime.now().strftime('%Y%m%d_%H%M')}.zip",
+                        mime="application/zip",
+                        on_click="ignore",
+                        use_container_width=True
+                    )
+            except Exception as e:
+                st.error(f"Error generating engine reports: {str(e)}")
+            finally:
+                if zip_path is not None and os.path.exists(zip_path):
+                    os.remove(zip_path)
 
 
 # -------------------------------Function no_01------------------
 
-def show_all_eng(test_df, model, processor, seq_length=50):
+def show_all_eng(test_df, model, processor, seq_length=50, data_version=None):
     """Display all engines health overview with 3-stage classification"""
     
     
     
     st.subheader("All Engines Health Overview")
-    show_loading_animation("all")
+    if st.button("🔄 Re-run Analysis"):
+        # Full re-score: drop the previous results as well as the cache key
+        st.session_state.pop('fleet_snapshot_key', None)
+        st.session_state.pop('fleet_snapshot', None)
     
-    engine_health_scores = {}
-    engine_details = {}
-
-    # Calculate health for all engines------- 
-    for engine_id in test_df['unit_number'].unique():
-        # Hit the request to the health_monitor.py----------------------------------------
-        pred_rul, actual_rul, health_details = predict_engine_health(
-            engine_id, test_df, model, processor, seq_length
-        )
-        
-        if pred_rul is not None:
-            engine_health_scores[engine_id] = health_details['overall_health']
-            engine_details[engine_id] = {
-                'pred_rul': pred_rul,
-                'actual_rul': actual_rul,
-                'health_status': health_details['health_status'],
-                'critical_sensors': len(health_details['critical_sensors']),
-                'warning_sensors': len(health_details['warning_sensors'])
-            }
+    # Score the whole fleet once; every table below is a view of this snapshot
+    snapshot = get_fleet_snapshot(test_df, model, processor, seq_length, data_version)
+    rescore = st.session_state.get('fleet_rescore')
+    if rescore:
+        st.caption(f"🔁 Last scoring run: {rescore['recomputed']} engines recomputed, "
+                   f"{rescore['reused']} reused (unchanged data)")
 
     # Display health scores
-    if engine_health_scores:
-        # Separate engines by health status
-        critical_engines = {eid: score for eid, score in engine_health_scores.items() if score < 41}
-        warning_engines = {eid: score for eid, score in engine_health_scores.items() if 41 <= score < 65}
-        good_engines = {eid: score for eid, score in engine_health_scores.items() if score >= 65}
-        
+    if len(snapshot):
+        is_critical = snapshot.mask([CRITICAL])
+        is_warning = snapshot.mask([WARNING])
+        is_good = snapshot.mask([GOOD])
+        table_columns = ['Engine ID', 'Health Score', 'Predicted RUL', 'Actual RUL',
+                         'Critical Sensors', 'Warning Sensors', 'Status']
+
         # 1. CRITICAL ENGINES TABLE
-        if critical_engines:
+        if is_critical.any():
             st.markdown("---")
             st.error("🚨 **CRITICAL ALERT: Engines Requiring Immediate Attention**")
-            
-            critical_data = []
-            for eid, score in sorted(critical_engines.items()):
-                details = engine_details[eid]
-                critical_data.append({
-                    'Engine ID': eid,
-                    'Health Score': f"{score}%",
-                    'Predicted RUL': details['pred_rul'],
-                    'Actual RUL': details['actual_rul'],
-                    'Critical Sensors': details['critical_sensors'],
-                    'Warning Sensors': details['warning_sensors'],
-                    'Status': '🚨 CRITICAL'
-                })
-            
-            st.dataframe(
-                critical_data,
-                use_container_width=True,
-                height=min(300, len(critical_data) * 35 + 40)
-            )
+            show_paged_table(snapshot, is_critical, "critical_table", table_columns, max_height=300)
         
         # 2. WARNING ENGINES TABLE
-        if warning_engines:
+        if is_warning.any():
             st.markdown("---")
             st.warning("⚠️ **WARNING: Engines Requiring Monitoring**")
-            
-            warning_data = []
-            for eid, score in sorted(warning_engines.items()):
-                details = engine_details[eid]
-                warning_data.append({
-                    'Engine ID': eid,
-                    'Health Score': f"{score}%",
-                    'Predicted RUL': details['pred_rul'],
-                    'Actual RUL': details['actual_rul'],
-                    'Critical Sensors': details['critical_sensors'],
-                    'Warning Sensors': details['warning_sensors'],
-                    'Status': '⚠️ WARNING'
-                })
-            
-            st.dataframe(
-                warning_data,
-                use_container_width=True,
-                height=min(300, len(warning_data) * 35 + 40)
-            )
+            show_paged_table(snapshot, is_warning, "warning_table", table_columns, max_height=300)
         
         # 3. GOOD ENGINES TABLE
-        if good_engines:
+        if is_good.any():
             st.markdown("---")
             st.success("✅ **GOOD: Engines in Healthy Condition**")
-            
-            good_data = []
-            for eid, score in sorted(good_engines.items()):
-                details = engine_details[eid]
-                good_data.append({
-                    'Engine ID': eid,
-                    'Health Score': f"{score}%",
-                    'Predicted RUL': details['pred_rul'],
-                    'Actual RUL': details['actual_rul'],
-                    'Critical Sensors': details['critical_sensors'],
-                    'Warning Sensors': details['warning_sensors'],
-                    'Status': '✅ GOOD'
-                })
-            
-            st.dataframe(
-                good_data,
-                use_container_width=True,
-                height=min(400, len(good_data) * 35 + 40)
-            )
+            show_paged_table(snapshot, is_good, "good_table", table_columns, max_height=400)
         
         # 4. COMPLETE ENGINE HEALTH REPORT (Optional - with filters)
-        st.markdown("---")
-        st.subheader("Complete Engine Health Report (Filterable)")
-        
-        # Add filter options
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            show_all = st.checkbox("Show All", value=True)
-        with col2:
-            show_critical = st.checkbox("Show Critical", value=True)
-        with col3:
-            show_warning = st.checkbox("Show Warning", value=True)
-        with col4:
-            show_good = st.checkbox("Show Good", value=True)
-        
-        # Filter data based on selection
-        filtered_data = []
-        for eid, score in sorted(engine_health_scores.items()):
-            details = engine_details[eid]
-            
-            # Determine engine category
-            is_critical = score < 41
-            is_warning = 41 <= score < 65
-            is_good = score >= 65
-            
-            # Apply filters
-            if not show_all:
-                if is_critical and not show_critical:
-                    continue
-                if is_warning and not show_warning:
-                    continue
-                if is_good and not show_good:
-                    continue
-                
-            filtered_data.append({
-                'Engine ID': eid,
-                'Health Score': f"{score}%",
-                'Status': details['health_status'],
-                'Predicted RUL': details['pred_rul'],
-                'Actual RUL': details['actual_rul'],
-                'Critical Sensors': details['critical_sensors'],
-                'Warning Sensors': details['warning_sensors']
-            })
-        
-        if filtered_data:
-            st.dataframe(
-                filtered_data,
-                use_container_width=True,
-                height=min(600, len(filtered_data) * 35 + 40)
-            )
-            
-            # Show summary
-            total_engines = len(filtered_data)
-            critical_count = len([d for d in filtered_data if '🚨' in d['Status']])
-            warning_count = len([d for d in filtered_data if '⚠️' in d['Status']])
-            good_count = len([d for d in filtered_data if '✅' in d['Status']])
-            
-            st.write(f"**Summary:** Total: {total_engines} | ✅ Good: {good_count} | ⚠️ Warning: {warning_count} | 🚨 Critical: {critical_count}")
-        else:
-            st.info("No engines match the selected filters")
-            
+        show_filtered_report(snapshot)
+
         # Overall Fleet Health Summary
         st.markdown("---")
         st.subheader("Fleet Health Summary")
         
-        total_fleet = len(engine_health_scores)
-        fleet_critical = len(critical_engines)
-        fleet_warning = len(warning_engines)
-        fleet_good = len(good_engines)
+        total_fleet = len(snapshot)
+        fleet_good, fleet_warning, fleet_critical = snapshot.status_counts()
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -234,33 +296,4 @@ def show_all_eng(test_df, model, processor, seq_length=50):
         - **⚠️ WARNING** = 41-64% (Monitor)  
         - **🚨 CRITICAL** = 0-40% (Urgent)
         """)
-    st.subheader("📥 Download Report")
-
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("📄 Generate PDF Report", use_container_width=True):
-            with st.spinner("Generating professional PDF report..."):
-                pdf_buffer = generate_fleet_report(engine_health_scores, engine_details, test_df, processor)
-                if pdf_buffer:
-                    st.success("PDF report generated successfully!")
-                    st.download_button(
-                        label="⬇️ Download PDF Report",
-                        data=pdf_buffer,
-                        file_name=f"fleet_health_report_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                        mime="application/pdf",
-                        use_container_width=True
-                    )
-
-    with col2:
-        if st.button("📊 Generate CSV Report", use_container_width=True):
-            with st.spinner("Generating CSV report..."):
-                csv_buffer = create_csv_report(engine_health_scores, engine_details)
-                if csv_buffer:
-                    st.success("CSV report generated successfully!")
-                    st.download_button(
-                        label="⬇️ Download CSV Data",
-                        data=csv_buffer,
-                        file_name=f"fleet_health_data_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                        mime="text/csv",
-                        use_container_width=True
-                     )
\ No newline at end of file
+    show_report_downloads(snapshot, processor)
@@ -5,6 +5,61 @@ import numpy as np
 import pickle
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from tracing import span
+from metrics import COST_PREDICTION_SECONDS, COST_SCENARIOS
+
+COST_FEATURES = [
+    "repair_day", "warning_sensors", "critical_sensors",
+    "good_sensors", "predicted_rul", "sensor_health", "anomaly_level"
+]
+SCENARIO_LABELS = ["🟢 Preventive", "🟡 Current", "🟠 End-of-Life", "🔴 Emergency"]
+PENALTY_PER_DAY = 200000
+
+
+@st.cache_resource
+def load_cost_model(path="model/cost_model.pkl"):
+    """Load the pickled cost model once per server process"""
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def build_scenario_matrix(engine_values):
+    """Build the 4 maintenance scenarios for every engine as one frame
+
+    engine_values: {engine_id: dict from get_engine_health_values}
+    Rows are ordered engine by engine, 4 scenarios each (see SCENARIO_LABELS).
+    """
+    features = pd.DataFrame.from_dict(engine_values, orient="index")
+    features = features.reindex(columns=COST_FEATURES[1:]).fillna(0)
+    n_engines = len(features)
+
+    scenarios = pd.DataFrame({
+        "engine_id": np.repeat(features.index.values, 4),
+        "scenario": np.tile(np.arange(4), n_engines),
+    })
+    for col in COST_FEATURES[1:]:
+        scenarios[col] = np.repeat(features[col].values, 4)
+
+    # before_10_days, today, end_cycle, after_10_days
+    scenarios["repair_day"] = np.stack([
+        np.full(n_engines, -10), features["predicted_rul"].values,
+        np.zeros(n_engines, dtype=int), np.full(n_engines, 10)
+    ], axis=1).ravel()
+
+    return scenarios
+
+
+def predict_scenario_costs(cost_model, scenarios, mode="single"):
+    """Predict base and final (downtime-penalised) cost for every scenario row"""
+    with span("cost_model.predict"), COST_PREDICTION_SECONDS.labels(mode).time():
+        scenarios["predicted_cost"] = cost_model.predict(scenarios[COST_FEATURES])
+    COST_SCENARIOS.labels(mode).inc(len(scenarios))
+
+    penalty_days = np.where(scenarios["repair_day"] == 0, 1,
+                            np.where(scenarios["repair_day"] == 10, 11, 0))
+    scenarios["final_cost"] = scenarios["predicted_cost"] + penalty_days * PENALTY_PER_DAY
+    return scenarios
+
 
 def cost_optimizer(engine_id, engine_data):
     # Elegant Header
@@ -29,8 +84,7 @@ def cost_optimizer(engine_id, engine_data):
     # Load Model
     # ---------------------------------
     try:
-        with open("model/cost_model.pkl", "rb") as f:
-            cost_model = pickle.load(f)
+        cost_model = load_cost_model()
     except Exception as e:
         st.error(f"❌ Model not found or load error: {e}")
         return
@@ -73,40 +127,12 @@ def cost_optimizer(engine_id, engine_data):
     # Build 4 Scenarios
     # ---------------------------------
     # st.markdown("### Maintenance Scenarios")
-    scenarios = pd.DataFrame({
-        "repair_day": ["before_10_days", "today", "end_cycle", "after_10_days"],
-        "warning_sensors": [warning_count]*4,
-        "critical_sensors": [critical_count]*4,
-        "good_sensors": [good_count]*4,
-        "predicted_rul": [predicted_rul]*4,
-        "sensor_health": [sensor_health]*4,
-        "anomaly_level": [anomaly_level]*4
-    })
-
-    scenarios["repair_day"] = scenarios["repair_day"].map({
-        "before_10_days": -10,
-        "today": predicted_rul,
-        "end_cycle": 0,
-        "after_10_days": 10
-    })
+    scenarios = build_scenario_matrix({engine_id: engine_data})
 
     # ---------------------------------
     # Predict Costs
     # ---------------------------------
-    X = scenarios[[
-        "repair_day", "warning_sensors", "critical_sensors",
-        "good_sensors", "predicted_rul", "sensor_health", "anomaly_level"
-    ]]
-    scenarios["predicted_cost"] = cost_model.predict(X)
-
-    penalty_per_day = 200000
-    scenarios["final_cost"] = scenarios["predicted_cost"]
-
-    for i, row in scenarios.iterrows():
-        if row["repair_day"] == 0:
-            scenarios.loc[i, "final_cost"] += 1 * penalty_per_day
-        elif row["repair_day"] == 10:
-            scenarios.loc[i, "final_cost"] += 11 * penalty_per_day
+    scenarios = predict_scenario_costs(cost_model, scenarios)
 
   # ---------------------------------
     # Cost Table (Updated with Repair Time)
@@ -114,7 +140,7 @@ def cost_optimizer(engine_id, engine_data):
     st.markdown("### Cost Summary")
 
     display = scenarios.copy()
-    display["Scenario"] = ["🟢 Preventive", "🟡 Current", "🟠 End-of-Life", "🔴 Emergency"]
+    display["Scenario"] = SCENARIO_LABELS
     display["Repair Time"] = ["Before 10 Days", f"Today, {predicted_rul} days before", "End of Cycle", "After 10 Days"]
     display["Penalty"] = display["final_cost"] - display["predicted_cost"]
 
@@ -173,4 +199,87 @@ def cost_optimizer(engine_id, engine_data):
     fig.update_layout(height=520, showlegend=False, template="plotly_white")
     st.plotly_chart(fig, use_container_width=True)
 
-  
+
+def fleet_cost_optimizer(fleet_values):
+    """Rank every engine by potential savings using one batched cost prediction"""
+    st.markdown("""
+    <div style='background:#f9f9fb; padding:15px 25px; border-radius:12px; border-left:6px solid #5A60FF; margin-bottom:25px;
+                box-shadow:0 2px 5px rgba(0,0,0,0.05);'>
+        <h3 style='margin:0; color:#333;'>Fleet Cost Optimizer</h3>
+        <p style='margin:6px 0 0 0; color:#555;'>Ranking all engines by potential maintenance savings</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    if not fleet_values:
+        st.warning("⚠️ No engine has enough data for cost optimization.")
+        return
+
+    try:
+        cost_model = load_cost_model()
+    except Exception as e:
+        st.error(f"❌ Model not found or load error: {e}")
+        return
+
+    # ---------------------------------
+    # Scenario matrix for the whole fleet -> one predict call
+    # ---------------------------------
+    scenarios = predict_scenario_costs(cost_model, build_scenario_matrix(fleet_values), mode="fleet")
+    final_costs = scenarios["final_cost"].values.reshape(-1, 4)
+
+    best_scenario = final_costs.argmin(axis=1)
+    best_cost = final_costs.min(axis=1)
+    savings = final_costs.max(axis=1) - best_cost
+    engine_ids = scenarios["engine_id"].values[::4]
+
+    ranking = pd.DataFrame({
+        "Engine ID": engine_ids,
+        "Predicted RUL": [fleet_values[eid]["predicted_rul"] for eid in engine_ids],
+        "Optimal Scenario": np.array(SCENARIO_LABELS)[best_scenario],
+        "Optimal Cost (৳)": best_cost,
+        "Potential Savings (৳)": savings,
+    })
+
+    # ---------------------------------
+    # Fleet Summary
+    # ---------------------------------
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🚀 Engines Analyzed", len(ranking))
+    col2.metric("💰 Total Potential Savings", f"৳{savings.sum():,.0f}")
+    col3.metric("🏆 Top Engine", f"Engine {ranking.loc[savings.argmax(), 'Engine ID']}")
+
+    # ---------------------------------
+    # Ranking Table
+    # ---------------------------------
+    st.markdown("### Engine Ranking")
+    rank_by = st.radio("Rank engines by:", ["Potential Savings", "Optimal Scenario"], horizontal=True)
+
+    if rank_by == "Potential Savings":
+        ranking = ranking.sort_values("Potential Savings (৳)", ascending=False, kind="stable")
+    else:
+        ranking["_order"] = best_scenario
+        ranking = ranking.sort_values(["_order", "Potential Savings (৳)"], ascending=[True, False], kind="stable")
+        ranking = ranking.drop(columns="_order")
+
+    st.dataframe(
+        ranking,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Optimal Cost (৳)": st.column_config.NumberColumn(format="৳%d"),
+            "Potential Savings (৳)": st.column_config.NumberColumn(format="৳%d"),
+        }
+    )
+
+    # ---------------------------------
+    # Scenario Mix
+    # ---------------------------------
+    st.markdown("### Optimal Scenario Mix")
+    mix = np.bincount(best_scenario, minlength=4)
+    fig = go.Figure(go.Bar(
+        x=SCENARIO_LABELS, y=mix,
+        marker_color=["#28a745", "#ffc107", "#fd7e14", "#dc3545"],
+        text=mix, textposition="outside"
+    ))
+    fig.update_layout(height=420, showlegend=False, template="plotly_white",
+                      yaxis_title="Number of Engines")
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+# Engine status codes (same cut-offs as HealthScoreCalculator)
+GOOD, WARNING, CRITICAL = 0, 1, 2
+STATUS_LABELS = np.array(["✅ GOOD", "⚠️ WARNING", "🚨 CRITICAL"])
+STATUS_NAMES = np.array(["GOOD", "WARNING", "CRITICAL"])
+
+# Sensor status codes (current value vs thresholds)
+SENSOR_OK, SENSOR_LOW, SENSOR_HIGH = 0, 1, 2
+SENSOR_STATUS_LABELS = np.array(["✅ OK", "⚠️ LOW", "🚨 HIGH"])
+
+
+def classify_health(overall_health):
+    """Map overall health scores to GOOD / WARNING / CRITICAL codes"""
+    overall_health = np.asarray(overall_health)
+    return np.where(overall_health >= 65, GOOD,
+                    np.where(overall_health >= 41, WARNING, CRITICAL)).astype(np.int8)
+
+
+class FleetSnapshot:
+    """Columnar result of one fleet scoring run.
+
+    One row per engine (sorted by engine ID) and, for the sensor matrices,
+    one column per monitored sensor in `sensor_names` order. Tables, PDF and
+    CSV exports are all filtered views of these arrays. `fingerprints` holds
+    a hash of each engine's scored window, so a later run can tell which
+    engines received new data (see rescore_fleet_health).
+    """
+
+    def __init__(self, engine_ids, pred_rul, actual_rul, rul_health, sensor_health,
+                 overall_health, sensor_names, sensor_units, sensor_values,
+                 sensor_status, sensor_anomaly, sensor_score, seq_length=50, fingerprints=None):
+        self.engine_ids = np.asarray(engine_ids, dtype=np.int64)
+        self.pred_rul = np.asarray(pred_rul, dtype=np.int64)
+        self.actual_rul = np.asarray(actual_rul, dtype=np.int64)
+        self.rul_health = np.asarray(rul_health, dtype=np.int64)
+        self.sensor_health = np.asarray(sensor_health, dtype=np.float64)
+        self.overall_health = np.asarray(overall_health, dtype=np.float64)
+        self.status = classify_health(self.overall_health)
+
+        self.sensor_names = list(sensor_names)
+        self.sensor_units = list(sensor_units)
+        self.sensor_values = np.asarray(sensor_values, dtype=np.float64)
+        self.sensor_status = np.asarray(sensor_status, dtype=np.int8)
+        self.sensor_anomaly = np.asarray(sensor_anomaly, dtype=np.float64)
+        self.sensor_score = np.asarray(sensor_score, dtype=np.float64)
+        self.seq_length = seq_length
+        self.fingerprints = None if fingerprints is None else np.asarray(fingerprints, dtype=np.uint64)
+
+        self.critical_sensors = (self.sensor_status == SENSOR_HIGH).sum(axis=1)
+        self.warning_sensors = (self.sensor_status == SENSOR_LOW).sum(axis=1)
+
+    def __len__(self):
+        return len(self.engine_ids)
+
+    def take(self, rows):
+        """Snapshot of the given rows (index array or boolean mask)"""
+        return FleetSnapshot(
+            self.engine_ids[rows], self.pred_rul[rows], self.actual_rul[rows], self.rul_health[rows],
+            self.sensor_health[rows], self.overall_health[rows], self.sensor_names, self.sensor_units,
+            self.sensor_values[rows], self.sensor_status[rows], self.sensor_anomaly[rows],
+            self.sensor_score[rows], self.seq_length,
+            None if self.fingerprints is None else self.fingerprints[rows]
+        )
+
+    @staticmethod
+    def concat(parts):
+        """Merge snapshots over disjoint engines (same sensors) into one, sorted by engine ID"""
+        first = parts[0]
+        engine_ids = np.concatenate([p.engine_ids for p in parts])
+        order = np.argsort(engine_ids, kind='stable')
+
+        def stacked(name):
+            return np.concatenate([getattr(p, name) for p in parts])[order]
+
+        fingerprints = None
+        if all(p.fingerprints is not None for p in parts):
+            fingerprints = stacked('fingerprints')
+        return FleetSnapshot(
+            engine_ids[order], stacked('pred_rul'), stacked('actual_rul'), stacked('rul_health'),
+            stacked('sensor_health'), stacked('overall_health'), first.sensor_names, first.sensor_units,
+            stacked('sensor_values'), stacked('sensor_status'), stacked('sensor_anomaly'),
+            stacked('sensor_score'), first.seq_length, fingerprints
+        )
+
+    def status_counts(self):
+        """Number of GOOD, WARNING and CRITICAL engines"""
+        return np.bincount(self.status, minlength=3)
+
+    def mask(self, statuses=(GOOD, WARNING, CRITICAL)):
+        """Boolean row mask for the given engine status codes"""
+        return np.isin(self.status, list(statuses))
+
+    def index_of(self, engine_id):
+        """Row index of an engine, or None if it was not scored"""
+        i = np.searchsorted(self.engine_ids, engine_id)
+        if i < len(self.engine_ids) and self.engine_ids[i] == engine_id:
+            return int(i)
+        return None
+
+    def to_frame(self, mask=None):
+        """Engine-level columns as a DataFrame (optionally filtered by a row mask)"""
+        rows = slice(None) if mask is None else mask
+        return pd.DataFrame({
+            'engine_id': self.engine_ids[rows],
+            'overall_health': self.overall_health[rows],
+            'status': STATUS_NAMES[self.status[rows]],
+            'pred_rul': self.pred_rul[rows],
+            'actual_rul': self.actual_rul[rows],
+            'critical_sensors': self.critical_sensors[rows],
+            'warning_sensors': self.warning_sensors[rows],
+        })
+
+    def display_frame(self, mask=None):
+        """Table rows as shown in the dashboard"""
+        rows = slice(None) if mask is None else mask
+        scores = pd.Series(self.overall_health[rows]).astype(str) + "%"
+        return pd.DataFrame({
+            'Engine ID': self.engine_ids[rows],
+            'Health Score': scores.values,
+            'Status': STATUS_LABELS[self.status[rows]],
+            'Predicted RUL': self.pred_rul[rows],
+            'Actual RUL': self.actual_rul[rows],
+            'Critical Sensors': self.critical_sensors[rows],
+            'Warning Sensors': self.warning_sensors[rows],
+        })
+
+    def engine_health_details(self, i):
+        """Rebuild the per-engine `health_details` dict used by single-engine views"""
+        sensor_status_today = {}
+        for j, name in enumerate(self.sensor_names):
+            sensor_status_today[name] = {
+                "value": self.sensor_values[i, j],
+                "unit": self.sensor_units[j],
+                "status": str(SENSOR_STATUS_LABELS[self.sensor_status[i, j]]),
+                "anomaly_level": self.sensor_anomaly[i, j],
+                "score": self.sensor_score[i, j],
+                "history_analysis": f"Based on {self.seq_length} cycles"
+            }
+
+        names = np.array(self.sensor_names)
+        return {
+            "overall_health": self.overall_health[i],
+            "health_status": str(STATUS_LABELS[self.status[i]]),
+            "rul_health": self.rul_health[i],
+            "sensor_health": self.sensor_health[i],
+            "sensor_status_today": sensor_status_today,
+            "critical_sensors": names[self.sensor_status[i] == SENSOR_HIGH].tolist(),
+            "warning_sensors": names[self.sensor_status[i] == SENSOR_LOW].tolist()
+        }
@@ -1,57 +1,107 @@
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
 import seaborn as sns
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 import io
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 from datetime import datetime
+from feature.fleet_snapshot import WARNING, CRITICAL, SENSOR_LOW, SENSOR_HIGH
+from tracing import span
+from metrics import REPORT_SECONDS, REPORT_FAILURES, QUEUE_DEPTH, record_cache
 
-def analyze_sensor_issues(engine_health_scores, engine_details, processor, test_df):
+def analyze_sensor_issues(snapshot, processor):
     """Analyze which sensors are most frequently causing issues across the fleet"""
     
     # Initialize counters
     critical_sensor_counts = {sensor_name: 0 for sensor_name in processor.sensor_mapping.values()}
     warning_sensor_counts = {sensor_name: 0 for sensor_name in processor.sensor_mapping.values()}
     
-    # Count sensor issues across all engines
-    for engine_id in engine_health_scores.keys():
-        # Get the latest sensor readings for this engine
-        engine_data = test_df[test_df['unit_number'] == engine_id].tail(1)
-        
-        if not engine_data.empty:
-            # Check each sensor against its thresholds
-            for sensor_col, sensor_name in processor.sensor_mapping.items():
-                if sensor_col in engine_data.columns:
-                    value = engine_data[sensor_col].iloc[0]
-                    low, high = processor.sensor_thresholds.get(sensor_col, (0, 1))
-                    
-                    # Check if sensor is out of range
-                    if value < low:
-                        warning_sensor_counts[sensor_name] += 1
-                    elif value > high:
-                        critical_sensor_counts[sensor_name] += 1
+    # Count sensor issues across all engines from the statuses already computed
+    # while scoring (HIGH = critical, LOW = warning)
+    critical_totals = (snapshot.sensor_status == SENSOR_HIGH).sum(axis=0)
+    warning_totals = (snapshot.sensor_status == SENSOR_LOW).sum(axis=0)
+    
+    for j, sensor_name in enumerate(snapshot.sensor_names):
+        critical_sensor_counts[sensor_name] = int(critical_totals[j])
+        warning_sensor_counts[sensor_name] = int(warning_totals[j])
     
     return critical_sensor_counts, warning_sensor_counts
 
-def create_sensor_bar_chart(sensor_counts, title, color):
-    """Create a bar chart for sensor issue frequency"""
-    
-    # Filter out sensors with zero counts and sort by count
-    filtered_counts = {k: v for k, v in sensor_counts.items() if v > 0}
-    if not filtered_counts:
-        return None
-    
-    # Sort by count (descending)
-    sorted_items = sorted(filtered_counts.items(), key=lambda x: x[1], reverse=True)
-    sensors = [item[0] for item in sorted_items]
-    counts = [item[1] for item in sorted_items]
-    
-    # Create bar chart
-    fig, ax = plt.subplots(figsize=(10, 6))
+def report_rows(snapshot, rows=None):
+    """Snapshot rows (mask, slice or index array) pre-formatted as PDF table strings"""
+    frame = snapshot.to_frame(rows)
+    return pd.DataFrame({
+        'engine_id': frame['engine_id'].astype(str),
+        'health': np.char.mod('%.1f%%', frame['overall_health'].values),
+        'status': frame['status'],
+        'pred_rul': frame['pred_rul'].astype(str),
+        'actual_rul': frame['actual_rul'].astype(str),
+        'critical_sensors': frame['critical_sensors'].astype(str),
+        'warning_sensors': frame['warning_sensors'].astype(str),
+    })
+
+# ------------------------------- Chart rendering -------------------------------
+# Charts use the object-oriented Figure API (no global pyplot state), so they
+# can be rendered concurrently in a thread pool. Rendered PNG bytes are cached
+# by a hash of the chart inputs, so an unchanged fleet re-uses its charts.
+
+CHART_CACHE_SIZE = 64
+_chart_cache = OrderedDict()
+_chart_cache_lock = threading.Lock()
+_chart_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="chart")
+
+
+def render_cached_chart(render_fn, *inputs):
+    """Return a PNG buffer for `render_fn(*inputs)`, rendering only on a cache miss"""
+    key = hashlib.sha256(repr((render_fn.__name__, inputs)).encode()).hexdigest()
+
+    with _chart_cache_lock:
+        png = _chart_cache.get(key)
+        if png is not None:
+            _chart_cache.move_to_end(key)
+    record_cache("chart_png", png is not None)
+
+    if png is None:
+        png = render_fn(*inputs)
+        with _chart_cache_lock:
+            _chart_cache[key] = png
+            while len(_chart_cache) > CHART_CACHE_SIZE:
+                _chart_cache.popitem(last=False)
+
+    return io.BytesIO(png)
+
+
+def submit_chart(render_fn, *args):
+    """Queue a chart on the render pool, tracking how many are waiting"""
+    depth = QUEUE_DEPTH.labels("chart_render")
+    depth.inc()
+    future = _chart_pool.submit(render_fn, *args)
+    future.add_done_callback(lambda _: depth.dec())
+    return future
+
+
+def figure_to_png(fig):
+    """Serialise a Figure to PNG bytes"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def render_sensor_bar_chart(sensors, counts, title, color):
+    """Draw the sensor issue frequency bar chart and return PNG bytes"""
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
     bars = ax.bar(sensors, counts, color=color, alpha=0.7, edgecolor='black', linewidth=0.5)
     
     # Customize the chart
@@ -60,8 +110,10 @@ def create_sensor_bar_chart(sensor_counts, title, color):
     ax.set_ylabel('Number of Engines Affected', fontsize=12, fontweight='bold')
     
     # Rotate x-axis labels for better readability
-    plt.xticks(rotation=45, ha='right', fontsize=9)
-    plt.yticks(fontsize=10)
+    ax.tick_params(axis='x', labelrotation=45, labelsize=9)
+    ax.tick_params(axis='y', labelsize=10)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
     
     # Add value labels on bars
     for bar, count in zip(bars, counts):
@@ -70,19 +122,153 @@ def create_sensor_bar_chart(sensor_counts, title, color):
                 f'{count}', ha='center', va='bottom', fontsize=9, fontweight='bold')
     
     # Adjust layout
-    plt.tight_layout()
+    fig.tight_layout()
+    return figure_to_png(fig)
+
+
+def render_health_pie_chart(sizes):
+    """Draw the fleet health distribution pie chart and return PNG bytes"""
+    fig = Figure(figsize=(8, 6))
+    ax = fig.add_subplot()
+    labels = [f'Good\n({sizes[0]} engines)', f'Warning\n({sizes[1]} engines)', f'Critical\n({sizes[2]} engines)']
+    colors_pie = ['#28a745', '#ffc107', '#dc3545']
     
-    # Save to buffer
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-    plt.close()
-    buffer.seek(0)
+    wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors_pie, autopct='%1.1f%%',
+                                     startangle=90, textprops={'fontsize': 10})
+    
+    # Improve autotext appearance
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+    
+    ax.set_title('Fleet Health Distribution', fontsize=12, fontweight='bold')
+    return figure_to_png(fig)
+
+
+def create_health_pie_chart(sizes):
+    """Create the fleet health distribution pie chart"""
+    return render_cached_chart(render_health_pie_chart, tuple(int(size) for size in sizes))
+
+
+def create_sensor_bar_chart(sensor_counts, title, color):
+    """Create a bar chart for sensor issue frequency"""
+    
+    # Filter out sensors with zero counts and sort by count
+    filtered_counts = {k: v for k, v in sensor_counts.items() if v > 0}
+    if not filtered_counts:
+        return None
+    
+    # Sort by count (descending)
+    sorted_items = sorted(filtered_counts.items(), key=lambda x: x[1], reverse=True)
+    sensors = tuple(item[0] for item in sorted_items)
+    counts = tuple(int(item[1]) for item in sorted_items)
     
-    return buffer
+    return render_cached_chart(render_sensor_bar_chart, sensors, counts, title, color)
+
+# ------------------------------- Paged tables -------------------------------
+# reportlab lays out a Table by splitting it page by page, copying the rest of
+# the rows each time, which is quadratic in the number of rows. PagedTable keeps
+# only snapshot row indices and materialises one page-sized Table per split,
+# with the header repeated, so layout time is linear and peak memory is bounded
+# by a single page of rows.
+
+TABLE_COLUMNS = ['engine_id', 'health', 'status', 'pred_rul', 'actual_rul', 'critical_sensors', 'warning_sensors']
+
+
+def status_row_styles(status, color_map):
+    """Precompute (first_row, last_row, color) background runs from status codes"""
+    status = np.asarray(status)
+    if len(status) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), []
+
+    run_starts = np.flatnonzero(np.r_[True, status[1:] != status[:-1]])
+    run_ends = np.r_[run_starts[1:], len(status)] - 1
+    keep = np.isin(status[run_starts], list(color_map))
+    run_starts, run_ends = run_starts[keep], run_ends[keep]
+    run_colors = [color_map[code] for code in status[run_starts]]
+    return run_starts, run_ends, run_colors
+
+
+class PagedTable(Flowable):
+    """A table over snapshot rows that is built one page at a time"""
+
+    def __init__(self, snapshot, row_index, header, columns, col_widths, base_style,
+                 color_map=None):
+        Flowable.__init__(self)
+        self.snapshot = snapshot
+        self.row_index = np.asarray(row_index)
+        self.header = header
+        self.columns = columns
+        self.col_widths = col_widths
+        self.base_style = base_style
+        self.runs = status_row_styles(snapshot.status[self.row_index], color_map or {})
+        self.start = 0
+        self._row_height = None
+
+    def _page_table(self, start, stop):
+        rows = report_rows(self.snapshot, self.row_index[start:stop])[self.columns].values.tolist()
+        style = TableStyle(self.base_style)
+
+        # Row backgrounds for the runs overlapping this page (+1 for the header row)
+        run_starts, run_ends, run_colors = self.runs
+        first = np.searchsorted(run_ends, start)
+        last = np.searchsorted(run_starts, stop)
+        for k in range(first, last):
+            r0 = max(run_starts[k], start) - start + 1
+            r1 = min(run_ends[k], stop - 1) - start + 1
+            style.add('BACKGROUND', (0, r0), (-1, r1), run_colors[k])
 
-def generate_fleet_report(engine_health_scores, engine_details, test_df, processor):
+        return Table([self.header] + rows, colWidths=self.col_widths, style=style, repeatRows=1)
+
+    def _measure(self, avail_width):
+        # All rows are single-line text, so header + 1 row and header + 2 rows
+        # samples give the header height and the (uniform) row height
+        row = report_rows(self.snapshot, self.row_index[:1])[self.columns].values.tolist()
+        one_row, two_rows = [
+            Table([self.header] + row * n, colWidths=self.col_widths,
+                  style=TableStyle(self.base_style)).wrap(avail_width, 1e9)[1]
+            for n in (1, 2)
+        ]
+        self._row_height = two_rows - one_row
+        self._header_height = one_row - self._row_height
+
+    def _remaining(self):
+        return len(self.row_index) - self.start
+
+    def wrap(self, avail_width, avail_height):
+        if self._row_height is None:
+            self._measure(avail_width)
+        self.width = sum(self.col_widths)
+        self.height = self._header_height + self._remaining() * self._row_height
+        return self.width, self.height
+
+    def split(self, avail_width, avail_height):
+        if self._row_height is None:
+            self._measure(avail_width)
+        fits = int((avail_height - self._header_height) / self._row_height + 1e-6)
+        if fits < 1:
+            return []
+        stop = self.start + min(fits, self._remaining())
+        page = self._page_table(self.start, stop)
+
+        rest = copy.copy(self)
+        rest.start = stop
+        # Don't inherit reportlab's layout state (e.g. `_postponed`) from this page
+        for attr in ('_postponed', '_frame', 'canv'):
+            rest.__dict__.pop(attr, None)
+        return [page, rest] if rest._remaining() else [page]
+
+    def draw(self):
+        # Only reached when all remaining rows fit in the current frame
+        table = self._page_table(self.start, len(self.row_index))
+        table.wrapOn(self.canv, self.width, self.height)
+        table.drawOn(self.canv, 0, 0)
+
+
+def generate_fleet_report(snapshot, processor):
     """Generate professional PDF fleet health report with charts"""
     
+    start = time.perf_counter()
     try:
         # Create PDF buffer
         buffer = io.BytesIO()
@@ -117,17 +303,31 @@ def generate_fleet_report(engine_health_scores, engine_details, test_df, process
         elements.append(Paragraph("EXECUTIVE SUMMARY", heading_style))
         
         # Calculate statistics
-        total_engines = len(engine_health_scores)
-        critical_engines = {eid: score for eid, score in engine_health_scores.items() if score < 41}
-        warning_engines = {eid: score for eid, score in engine_health_scores.items() if 41 <= score < 65}
-        good_engines = {eid: score for eid, score in engine_health_scores.items() if score >= 65}
+        total_engines = len(snapshot)
+        good_count, warning_count, critical_count = snapshot.status_counts()
+        
+        # Render the pie and both sensor charts in parallel while the tables are built
+        critical_sensor_counts, warning_sensor_counts = analyze_sensor_issues(snapshot, processor)
+        pie_future = submit_chart(create_health_pie_chart, (good_count, warning_count, critical_count))
+        critical_future = submit_chart(
+            create_sensor_bar_chart,
+            critical_sensor_counts, 
+            "Most Frequently Critical Sensors", 
+            '#dc3545'  # Red color for critical
+        )
+        warning_future = submit_chart(
+            create_sensor_bar_chart,
+            warning_sensor_counts, 
+            "Most Frequently Warning Sensors", 
+            '#ffc107'  # Yellow color for warning
+        )
         
         summary_data = [
             ['Metric', 'Count', 'Percentage'],
             ['Total Engines', str(total_engines), '100%'],
-            ['Good Condition', str(len(good_engines)), f"{len(good_engines)/total_engines*100:.1f}%"],
-            ['Requires Monitoring', str(len(warning_engines)), f"{len(warning_engines)/total_engines*100:.1f}%"],
-            ['Critical Attention', str(len(critical_engines)), f"{len(critical_engines)/total_engines*100:.1f}%"]
+            ['Good Condition', str(good_count), f"{good_count/total_engines*100:.1f}%"],
+            ['Requires Monitoring', str(warning_count), f"{warning_count/total_engines*100:.1f}%"],
+            ['Critical Attention', str(critical_count), f"{critical_count/total_engines*100:.1f}%"]
         ]
         
         summary_table = Table(summary_data, colWidths=[2*inch, 1.5*inch, 1.5*inch])
@@ -149,28 +349,8 @@ def generate_fleet_report(engine_health_scores, engine_details, test_df, process
         # 2. Health Distribution Chart
         elements.append(Paragraph("FLEET HEALTH DISTRIBUTION", heading_style))
         
-        # Create pie chart
-        fig, ax = plt.subplots(figsize=(8, 6))
-        sizes = [len(good_engines), len(warning_engines), len(critical_engines)]
-        labels = [f'Good\n({sizes[0]} engines)', f'Warning\n({sizes[1]} engines)', f'Critical\n({sizes[2]} engines)']
-        colors_pie = ['#28a745', '#ffc107', '#dc3545']
-        
-        wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors_pie, autopct='%1.1f%%',
-                                         startangle=90, textprops={'fontsize': 10})
-        
-        # Improve autotext appearance
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-        
-        ax.set_title('Fleet Health Distribution', fontsize=12, fontweight='bold')
-        
-        # Save chart to buffer
-        chart_buffer = io.BytesIO()
-        plt.savefig(chart_buffer, format='png', dpi=150, bbox_inches='tight')
-        plt.close()
-        
-        chart_buffer.seek(0)
+        with span("chart_building"):
+            chart_buffer = pie_future.result()
         chart_image = Image(chart_buffer, width=5*inch, height=3.5*inch)
         elements.append(chart_image)
         elements.append(Spacer(1, 20))
@@ -180,17 +360,9 @@ def generate_fleet_report(engine_health_scores, engine_details, test_df, process
         elements.append(Paragraph("Identifying Most Problematic Sensors Across Fleet", styles['Normal']))
         elements.append(Spacer(1, 10))
         
-        # Analyze sensor issues using actual sensor data
-        critical_sensor_counts, warning_sensor_counts = analyze_sensor_issues(
-            engine_health_scores, engine_details, processor, test_df
-        )
-        
-        # Create Critical Sensors Bar Chart
-        critical_chart_buffer = create_sensor_bar_chart(
-            critical_sensor_counts, 
-            "Most Frequently Critical Sensors", 
-            '#dc3545'  # Red color for critical
-        )
+        # Critical Sensors Bar Chart
+        with span("chart_building"):
+            critical_chart_buffer = critical_future.result()
         
         if critical_chart_buffer:
             critical_chart_image = Image(critical_chart_buffer, width=6*inch, height=4*inch)
@@ -201,12 +373,9 @@ def generate_fleet_report(engine_health_scores, engine_details, test_df, process
             elements.append(Paragraph("No critical sensor issues detected across the fleet.", styles['Normal']))
             elements.append(Spacer(1, 10))
         
-        # Create Warning Sensors Bar Chart
-        warning_chart_buffer = create_sensor_bar_chart(
-            warning_sensor_counts, 
-            "Most Frequently Warning Sensors", 
-            '#ffc107'  # Yellow color for warning
-        )
+        # Warning Sensors Bar Chart
+        with span("chart_building"):
+            warning_chart_buffer = warning_future.result()
         
         if warning_chart_buffer:
             warning_chart_image = Image(warning_chart_buffer, width=6*inch, height=4*inch)
@@ -218,30 +387,25 @@ def generate_fleet_report(engine_health_scores, engine_details, test_df, process
         elements.append(Spacer(1, 20))
         
         # 4. Critical Engines Details
-        if critical_engines:
+        if critical_count:
             elements.append(Paragraph("🚨 CRITICAL ENGINES - IMMEDIATE ATTENTION REQUIRED", heading_style))
             
-            critical_data = [['Engine ID', 'Health %', 'Pred RUL', 'Actual RUL', 'Critical Sensors']]
-            for eid, score in sorted(critical_engines.items()):
-                details = engine_details[eid]
-                critical_data.append([
-                    str(eid),
-                    f"{score:.1f}%",
-                    str(details['pred_rul']),
-                    str(details['actual_rul']),
-                    str(details['critical_sensors'])
-                ])
-            
-            critical_table = Table(critical_data, colWidths=[0.8*inch, 1*inch, 0.8*inch, 0.8*inch, 1.2*inch])
-            critical_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#dc3545')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFE5E5')),
-                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ]))
+            critical_table = PagedTable(
+                snapshot,
+                np.flatnonzero(snapshot.mask([CRITICAL])),
+                header=['Engine ID', 'Health %', 'Pred RUL', 'Actual RUL', 'Critical Sensors'],
+                columns=['engine_id', 'health', 'pred_rul', 'actual_rul', 'critical_sensors'],
+                col_widths=[0.8*inch, 1*inch, 0.8*inch, 0.8*inch, 1.2*inch],
+                base_style=[
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#dc3545')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFE5E5')),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+                    ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ]
+            )
             
             elements.append(critical_table)
             elements.append(Spacer(1, 15))
@@ -249,49 +413,25 @@ def generate_fleet_report(engine_health_scores, engine_details, test_df, process
         # 5. Complete Engine Health Data
         elements.append(Paragraph("COMPLETE ENGINE HEALTH DATA", heading_style))
         
-        # Prepare table data
-        table_data = [['Engine ID', 'Health %', 'Status', 'Pred RUL', 'Act RUL', 'Crit Sens', 'Warn Sens']]
-        
-        for eid, score in sorted(engine_health_scores.items()):
-            details = engine_details[eid]
-            
-            # Determine status color coding
-            status_text = details['health_status'].replace('✅', '').replace('⚠️', '').replace('🚨', '').strip()
-            
-            table_data.append([
-                str(eid),
-                f"{score:.1f}%",
-                status_text,
-                str(details['pred_rul']),
-                str(details['actual_rul']),
-                str(details['critical_sensors']),
-                str(details['warning_sensors'])
-            ])
-        
-        # Create main table
-        main_table = Table(table_data, colWidths=[0.7*inch, 0.8*inch, 1*inch, 0.6*inch, 0.6*inch, 0.7*inch, 0.7*inch])
-        
-        # Table styling
-        style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 7),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ])
-        
-        # Add row coloring based on status
-        for i in range(1, len(table_data)):
-            score = engine_health_scores[int(table_data[i][0])]
-            if score < 41:
-                style.add('BACKGROUND', (0, i), (-1, i), colors.HexColor('#FFE5E5'))
-            elif score < 65:
-                style.add('BACKGROUND', (0, i), (-1, i), colors.HexColor('#FFF3CD'))
-        
-        main_table.setStyle(style)
+        # Main table, paged with the header repeated and status row colouring
+        main_table = PagedTable(
+            snapshot,
+            np.arange(len(snapshot)),
+            header=['Engine ID', 'Health %', 'Status', 'Pred RUL', 'Act RUL', 'Crit Sens', 'Warn Sens'],
+            columns=TABLE_COLUMNS,
+            col_widths=[0.7*inch, 0.8*inch, 1*inch, 0.6*inch, 0.6*inch, 0.7*inch, 0.7*inch],
+            base_style=[
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 7),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ],
+            color_map={CRITICAL: colors.HexColor('#FFE5E5'), WARNING: colors.HexColor('#FFF3CD')}
+        )
         elements.append(main_table)
         
         # 6. Footer
@@ -301,49 +441,42 @@ def generate_fleet_report(engine_health_scores, engine_details, test_df, process
                                 ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, alignment=1)))
         
         # Build PDF
-        doc.build(elements)
+        with span("pdf_rendering"):
+            doc.build(elements)
         buffer.seek(0)
         
+        REPORT_SECONDS.labels("fleet_pdf").observe(time.perf_counter() - start)
         return buffer
         
     except Exception as e:
+        REPORT_FAILURES.labels("fleet_pdf").inc()
         st.error(f"Error generating report: {str(e)}")
         return None
 
-def create_csv_report(engine_health_scores, engine_details):
+def create_csv_report(snapshot):
     """Generate CSV report as alternative format"""
+    start = time.perf_counter()
     try:
         # Prepare data for CSV
-        data = []
-        for eid, score in sorted(engine_health_scores.items()):
-            details = engine_details[eid]
-            
-            # Determine status
-            if score >= 65:
-                status = "GOOD"
-            elif score >= 41:
-                status = "WARNING"
-            else:
-                status = "CRITICAL"
-            
-            data.append({
-                'Engine_ID': eid,
-                'Health_Score_Percent': score,
-                'Status': status,
-                'Predicted_RUL': details['pred_rul'],
-                'Actual_RUL': details['actual_rul'],
-                'Critical_Sensors': details['critical_sensors'],
-                'Warning_Sensors': details['warning_sensors']
-            })
-        
-        # Create DataFrame and CSV
-        df = pd.DataFrame(data)
+        df = snapshot.to_frame().rename(columns={
+            'engine_id': 'Engine_ID',
+            'overall_health': 'Health_Score_Percent',
+            'status': 'Status',
+            'pred_rul': 'Predicted_RUL',
+            'actual_rul': 'Actual_RUL',
+            'critical_sensors': 'Critical_Sensors',
+            'warning_sensors': 'Warning_Sensors'
+        })
+        
+        # Create CSV
         csv_buffer = io.BytesIO()
         df.to_csv(csv_buffer, index=False)
         csv_buffer.seek(0)
         
+        REPORT_SECONDS.labels("csv").observe(time.perf_counter() - start)
         return csv_buffer
         
     except Exception as e:
+        REPORT_FAILURES.labels("csv").inc()
         st.error(f"Error generating CSV: {str(e)}")
-        return None
\ No newline at end of file
+        return None
@@ -1,11 +1,14 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
+from tracing import traced
+from history_store import engine_history
 
+@traced("chart_building")
 def graph(engine_id, test_df, processor, health_details, seq_length=50):
     """Create enhanced sensor visualization using pre-calculated sensor data with threshold lines"""
     try:
-        engine_data = test_df[test_df['unit_number'] == engine_id].tail(seq_length)
+        engine_data = engine_history(test_df, engine_id, seq_length)
         if engine_data.empty:
             st.warning(f"No data found for Engine {engine_id}")
             return
@@ -35,18 +38,17 @@ def graph(engine_id, test_df, processor, health_details, seq_length=50):
                 color = "green"
 
             # Identify sensor key
-            if sensor_name in processor.sensor_mapping.values():
-                sensor_key = [k for k, v in processor.sensor_mapping.items() if v == sensor_name][0]
+            sensor_key = processor.key_for(sensor_name)
+            if sensor_key is not None:
                 values = engine_data[sensor_key].values
 
                 # Convert to realistic values
-                realistic_vals = [processor.get_realistic_value(sensor_name, v)[0] for v in values]
+                realistic_vals, _ = processor.to_realistic(values, sensor_key)
                 time_labels = [f"Cycle {i+1}" for i in range(len(realistic_vals))]
 
                 # ✅ Get threshold (scaled → realistic)
                 low_scaled, high_scaled = processor.sensor_thresholds.get(sensor_key, (0.1, 0.9))
-                min_thr, _ = processor.get_realistic_value(sensor_name, low_scaled)
-                max_thr, _ = processor.get_realistic_value(sensor_name, high_scaled)
+                (min_thr, max_thr), _ = processor.to_realistic([low_scaled, high_scaled], sensor_key)
 
                 # ✅ Create figure with thresholds
                 fig = go.Figure()
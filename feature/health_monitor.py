@@ -1,4 +1,10 @@
 import numpy as np
+from feature.fleet_snapshot import FleetSnapshot, SENSOR_OK, SENSOR_LOW, SENSOR_HIGH
+from preprocess import CompactDataset
+from history_store import HistoryStore
+import time
+from tracing import span
+from metrics import PREDICTION_SECONDS, ENGINES_SCORED, ENGINES_REUSED
 
 class HealthScoreCalculator:
     def __init__(self, processor):
@@ -111,30 +117,233 @@ class HealthScoreCalculator:
 # --------------------------------Called from the all engine Function-no_01 -----------
 def predict_engine_health(engine_id, test_df, model, processor, seq_length=50):
     """Predict engine health with RUL and sensor analysis"""
-    test_groups = test_df.groupby('unit_number')
+    start = time.perf_counter()
+    if isinstance(test_df, HistoryStore):
+        test_df = test_df.engine_history(engine_id, seq_length)
 
-    if engine_id not in test_df['unit_number'].unique():
-        return None, None, None
+    dataset = CompactDataset.of(test_df)
+    if dataset is not None:
+        # Zero-copy slice of the float32 feature matrix
+        with span("window_extraction"):
+            window = dataset.window(engine_id, seq_length)
+            if window is None:
+                return None, None, None
+            X_last, actual_rul = window
+            sensor_idx = {s: dataset.feature_cols.index(s) for s in processor.sensor_mapping.keys()}
 
-    engine_data = test_groups.get_group(engine_id)
+        with span("model.predict"):
+            y_pred = model.predict(X_last[np.newaxis], verbose=0)
+        predicted_rul = int(round(y_pred[0][0]))
 
-    if len(engine_data) < seq_length:
-        return None, None, None
+        current_sensors = {s: float(X_last[-1, j]) for s, j in sensor_idx.items()}
+        sensor_history = {s: X_last[:, j].astype(np.float64) for s, j in sensor_idx.items()}
+    else:
+        with span("window_extraction"):
+            test_groups = test_df.groupby('unit_number')
 
-    last_window = engine_data.tail(seq_length)
-    X_last = last_window.drop(['unit_number', 'time_in_cycles', 'RUL'], axis=1).values
-    X_last = X_last.reshape(1, seq_length, X_last.shape[1])
+            if engine_id not in test_df['unit_number'].unique():
+                return None, None, None
 
-    y_pred = model.predict(X_last, verbose=0)
-    predicted_rul = int(round(y_pred[0][0]))
-    actual_rul = int(last_window['RUL'].iloc[-1])
+            engine_data = test_groups.get_group(engine_id)
 
-    current_sensors = {s: last_window[s].iloc[-1] for s in processor.sensor_mapping.keys()}
-    sensor_history = {s: last_window[s].values for s in processor.sensor_mapping.keys()}
+            if len(engine_data) < seq_length:
+                return None, None, None
 
-    health_calculator = HealthScoreCalculator(processor)
-    overall_health, health_details = health_calculator.calculate_overall_health_score(
-        predicted_rul, sensor_history, current_sensors
+            last_window = engine_data.tail(seq_length)
+            X_last = last_window.drop(['unit_number', 'time_in_cycles', 'RUL'], axis=1).values
+            X_last = X_last.reshape(1, seq_length, X_last.shape[1])
+
+        with span("model.predict"):
+            y_pred = model.predict(X_last, verbose=0)
+        predicted_rul = int(round(y_pred[0][0]))
+        actual_rul = int(last_window['RUL'].iloc[-1])
+
+        current_sensors = {s: last_window[s].iloc[-1] for s in processor.sensor_mapping.keys()}
+        sensor_history = {s: last_window[s].values for s in processor.sensor_mapping.keys()}
+
+    with span("health_scoring"):
+        health_calculator = HealthScoreCalculator(processor)
+        overall_health, health_details = health_calculator.calculate_overall_health_score(
+            predicted_rul, sensor_history, current_sensors
+        )
+
+    PREDICTION_SECONDS.labels("engine").observe(time.perf_counter() - start)
+    ENGINES_SCORED.labels("engine").inc()
+    return predicted_rul, actual_rul, health_details
+
+# --------------------------------Batched variant for fleet-wide features -----------
+def rul_health_scores(predicted_rul):
+    """Vectorized RUL health buckets (same steps as calculate_overall_health_score)"""
+    predicted_rul = np.asarray(predicted_rul)
+    return np.select(
+        [predicted_rul > 150, predicted_rul > 50, predicted_rul > 20, predicted_rul > 1],
+        [100, 70, 40, 5],
+        default=0
+    )
+
+
+def calculate_fleet_sensor_health(sensor_windows, low, high):
+    """Vectorized HealthScoreCalculator.calculate_sensor_health for many engines
+
+    sensor_windows: (engines, cycles, sensors) scaled values, last cycle = today
+    low, high: (sensors,) thresholds
+    Returns (anomaly_level, score, status) as (engines, sensors) arrays and the
+    per-engine sensor health (engines,).
+    """
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    ideal = (low + high) / 2
+
+    anomaly = np.where(
+        sensor_windows < low, (low - sensor_windows) / low * 100,
+        np.where(sensor_windows > high, (sensor_windows - high) / high * 100,
+                 np.abs(sensor_windows - ideal) / (high - low) * 50)
     )
+    anomaly_level = anomaly.mean(axis=1)
+    score = np.maximum(0, 100 - anomaly_level)
+
+    current = sensor_windows[:, -1, :]
+    status = np.where(current < low, SENSOR_LOW, np.where(current > high, SENSOR_HIGH, SENSOR_OK))
+
+    sensor_health = np.round(score.mean(axis=1), 2) if score.shape[1] else np.full(len(score), 100.0)
+    return np.round(anomaly_level, 2), np.round(score, 2), status, sensor_health
+
+
+def extract_fleet_windows(test_df, seq_length=50):
+    """Last `seq_length` cycles of every engine that has them, as model input
+
+    Returns (engine_ids, actual_rul, X, feature_cols) with X shaped
+    (engines, seq_length, features) in `feature_cols` order.
+    """
+    if isinstance(test_df, HistoryStore):
+        return test_df.fetch_windows(seq_length)
+
+    dataset = CompactDataset.of(test_df)
+    if dataset is not None:
+        return dataset.last_windows(seq_length)
+
+    feature_cols = [c for c in test_df.columns if c not in ['unit_number', 'time_in_cycles', 'RUL']]
+
+    # Grouped contiguously per engine
+    windows = test_df.groupby('unit_number', sort=True).tail(seq_length)
+    windows = windows.sort_values('unit_number', kind='stable')
+    counts = windows['unit_number'].value_counts(sort=False)
+    eligible = counts.index[counts.values == seq_length]
+    windows = windows[windows['unit_number'].isin(eligible)]
+
+    n_engines = len(windows) // seq_length
+    engine_ids = windows['unit_number'].values[::seq_length]
+    actual_rul = windows['RUL'].values[seq_length - 1::seq_length]
+    X = windows[feature_cols].values.reshape(n_engines, seq_length, len(feature_cols))
+    return engine_ids, actual_rul, X, feature_cols
+
+
+# Odd 64-bit multipliers for window_fingerprints (fixed seed: fingerprints are compared across runs)
+_FINGERPRINT_MULTIPLIERS = {}
+
+
+def window_fingerprints(X, actual_rul):
+    """64-bit content hash of each engine's window and RUL label, shape (engines,)
+
+    A multiply-add hash over the raw bytes (wraps modulo 2**64), vectorized
+    over engines; any changed cycle value or new cycle changes it.
+    """
+    words = np.ascontiguousarray(X).reshape(len(X), -1).view(np.uint32).astype(np.uint64)
+    n_words = words.shape[1] + 1
+    if n_words not in _FINGERPRINT_MULTIPLIERS:
+        rng = np.random.default_rng(0x5EED)
+        _FINGERPRINT_MULTIPLIERS[n_words] = rng.integers(0, 2 ** 63, n_words, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    multipliers = _FINGERPRINT_MULTIPLIERS[n_words]
+    labels = np.asarray(actual_rul).astype(np.int64).view(np.uint64)
+    return words @ multipliers[:-1] + labels * multipliers[-1]
+
+
+def predict_rul(model, X):
+    """Rounded RUL predictions for a batch of windows"""
+    if len(X) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.rint(model.predict(X, verbose=0)[:, 0]).astype(np.int64)
+
+
+def fleet_sensor_windows(X, feature_cols, processor):
+    """Monitored-sensor slice of model windows: (registry indices, float64 (engines, cycles, sensors))"""
+    monitored = np.flatnonzero(processor.monitored)
+    sensor_idx = [feature_cols.index(processor.keys[i]) for i in monitored]
+    return monitored, np.asarray(X, dtype=np.float64)[:, :, sensor_idx]
+
+
+def score_fleet_windows(engine_ids, X, predicted_rul, actual_rul, feature_cols, processor, seq_length=50,
+                        fingerprints=None):
+    """Health scores for already-predicted windows, as a FleetSnapshot"""
+    monitored, sensor_windows = fleet_sensor_windows(X, feature_cols, processor)
+    anomaly_level, score, status, sensor_health = calculate_fleet_sensor_health(
+        sensor_windows, processor.low[monitored], processor.high[monitored]
+    )
+
+    rul_health = rul_health_scores(predicted_rul)
+    overall_health = np.round(0.6 * rul_health + 0.4 * sensor_health, 2)
+
+    # Realistic current values for display
+    sensor_names = [processor.names[i] for i in monitored]
+    sensor_units = [processor.units[i] for i in monitored]
+    sensor_values = processor.to_realistic_matrix(sensor_windows[:, -1, :], monitored)
+
+    return FleetSnapshot(
+        engine_ids, predicted_rul, actual_rul, rul_health, sensor_health, overall_health,
+        sensor_names, sensor_units, sensor_values, status, anomaly_level, score, seq_length, fingerprints
+    )
+
+
+def predict_fleet_health(test_df, model, processor, seq_length=50):
+    """Predict RUL and health for every engine with a single batched model call
+
+    Returns a FleetSnapshot (engines with fewer than `seq_length` cycles are skipped).
+    """
+    snapshot, _ = rescore_fleet_health(test_df, model, processor, seq_length)
+    return snapshot
+
+
+def rescore_fleet_health(test_df, model, processor, seq_length=50, previous=None):
+    """Fleet scoring that only re-scores engines whose last window changed since `previous`
+
+    `previous` is an earlier snapshot from the same model and processor.
+    Engines whose window fingerprint matches keep their previous row; new or
+    changed engines go through one batched model call. Returns
+    (snapshot, report) with report = {'recomputed', 'reused', 'dropped'}.
+    """
+    start = time.perf_counter()
+
+    with span("window_extraction"):
+        engine_ids, actual_rul, X, feature_cols = extract_fleet_windows(test_df, seq_length)
+        fingerprints = window_fingerprints(X, actual_rul)
+
+    unchanged = np.zeros(len(engine_ids), dtype=bool)
+    previous_rows = np.zeros(0, dtype=np.int64)
+    if previous is not None and previous.fingerprints is not None and previous.seq_length == seq_length \
+            and len(previous):
+        previous_rows = np.minimum(np.searchsorted(previous.engine_ids, engine_ids), len(previous) - 1)
+        unchanged = (previous.engine_ids[previous_rows] == engine_ids) & \
+                    (previous.fingerprints[previous_rows] == fingerprints)
+        previous_rows = previous_rows[unchanged]
+    if unchanged.any():
+        changed = ~unchanged
+        engine_ids, actual_rul, X, fingerprints = engine_ids[changed], actual_rul[changed], X[changed], fingerprints[changed]
+
+    with span("model.predict"):
+        predicted_rul = predict_rul(model, X)
+
+    with span("health_scoring"):
+        snapshot = score_fleet_windows(engine_ids, X, predicted_rul, actual_rul, feature_cols, processor,
+                                       seq_length, fingerprints)
+        if len(previous_rows):
+            snapshot = FleetSnapshot.concat([previous.take(previous_rows), snapshot])
 
-    return predicted_rul, actual_rul, health_details
\ No newline at end of file
+    report = {
+        'recomputed': len(engine_ids),
+        'reused': len(previous_rows),
+        'dropped': 0 if previous is None else int((~np.isin(previous.engine_ids, snapshot.engine_ids)).sum()),
+    }
+    PREDICTION_SECONDS.labels("fleet").observe(time.perf_counter() - start)
+    ENGINES_SCORED.labels("fleet").inc(report['recomputed'])
+    ENGINES_REUSED.labels("fleet").inc(report['reused'])
+    return snapshot, report
@@ -5,16 +5,29 @@ import numpy as np
 import shap
 import plotly.express as px
 import pickle
+import time
+from tracing import span
+from metrics import ROOT_CAUSE_SECONDS
+from history_store import engine_history
+
+@st.cache_resource
+def load_root_cause_model(path="model/rf.pkl"):
+    """Load the RandomForest and its SHAP explainer once per server process"""
+    with open(path, "rb") as f:
+        model = pickle.load(f)
+    return model, shap.TreeExplainer(model)
+
 
 def show_root_cause_analysis(engine_id, test_df, processor):
     """Explain which sensors contribute most to RUL using RandomForest + SHAP"""
+    start = time.perf_counter()
     try:
         # Load model
-        with open("model/rf.pkl", "rb") as f:
-            model = pickle.load(f)
+        with span("model_loading"):
+            model, explainer = load_root_cause_model()
 
         # Filter engine data
-        engine_data = test_df[test_df['unit_number'] == engine_id].tail(1)
+        engine_data = engine_history(test_df, engine_id, 1)
         if engine_data.empty:
             st.error(f"No data found for Engine {engine_id}")
             return
@@ -24,7 +37,8 @@ def show_root_cause_analysis(engine_id, test_df, processor):
         feature_names = X_input.columns
 
         # Predict RUL
-        predicted_rul = model.predict(X_input)[0]
+        with span("model.predict"):
+            predicted_rul = model.predict(X_input)[0]
 
         # ---- FEATURE IMPORTANCE (GLOBAL) ----
         importances = model.feature_importances_
@@ -59,8 +73,8 @@ def show_root_cause_analysis(engine_id, test_df, processor):
 
         # ---- SHAP ANALYSIS (LOCAL EXPLANATION) ----
         st.markdown("### SHAP-based Local Explanation for This Engine")
-        explainer = shap.TreeExplainer(model)
-        shap_values = explainer.shap_values(X_input)
+        with span("shap_explanation"):
+            shap_values = explainer.shap_values(X_input)
 
         # SHAP DataFrame
         shap_df = pd.DataFrame({
@@ -104,6 +118,7 @@ def show_root_cause_analysis(engine_id, test_df, processor):
             hide_index=True,
             height=350
         )
+        ROOT_CAUSE_SECONDS.observe(time.perf_counter() - start)
 
         # Result summary
         # st.success(f"✅ Root cause analysis completed successfully for Engine {engine_id}!")
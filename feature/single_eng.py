@@ -1,29 +1,70 @@
 import streamlit as st
+import numpy as np
 from feature.health_monitor import predict_engine_health
+from feature.all_eng import get_fleet_snapshot
 from animation import show_loading_animation 
 from feature.graph import graph 
 from feature.single_eng_report import generate_and_download_report
+from preprocess import session_cache
+from tracing import span
+from metrics import record_cache
+from datetime import datetime
 
+# Analyses (with their PDF) kept per session for the current data version
+ENGINE_ANALYSIS_CACHE_SIZE = 32
 
 
 
 
 
 
-def show_single_eng(engine_id, test_df, model, processor, seq_length=50):
+
+def get_engine_analysis(engine_id, test_df, model, processor, seq_length=50, data_version=None):
+    """Analyze an engine once per (engine, data version) and keep the result in session state"""
+    if data_version is None:
+        data_version = id(test_df)
+    analyses = session_cache('engine_analyses', data_version)
+    key = (data_version, int(engine_id), seq_length)
+
+    record_cache("engine_analysis", key in analyses)
+    if key in analyses:
+        analyses.move_to_end(key)
+    else:
+        with span("loading_animation"):
+            show_loading_animation("single", engine_id=engine_id)
+        with span("engine_scoring"):
+            pred_rul, actual_rul, health_details = predict_engine_health(
+                engine_id, test_df, model, processor, seq_length
+            )
+        if pred_rul is None:
+            return None
+        analyses[key] = {
+            'pred_rul': pred_rul,
+            'actual_rul': actual_rul,
+            'health_details': health_details,
+            'analyzed_at': datetime.now(),
+        }
+        while len(analyses) > ENGINE_ANALYSIS_CACHE_SIZE:
+            analyses.popitem(last=False)
+
+    return analyses[key]
+
+
+def show_single_eng(engine_id, test_df, model, processor, seq_length=50, data_version=None):
     """Display single engine health report"""
     
     
     
-    show_loading_animation("single", engine_id=engine_id)
-    pred_rul, actual_rul, health_details = predict_engine_health(
-        engine_id, test_df, model, processor, seq_length
-    )
+    analysis = get_engine_analysis(engine_id, test_df, model, processor, seq_length, data_version)
 
-    if pred_rul is None:
+    if analysis is None:
         st.error(f"❌ Engine {engine_id} - Not enough data for prediction")
         return
 
+    pred_rul = analysis['pred_rul']
+    actual_rul = analysis['actual_rul']
+    health_details = analysis['health_details']
+
 
 
 
@@ -118,7 +159,7 @@ def show_single_eng(engine_id, test_df, model, processor, seq_length=50):
 
     # Sensor Visualization Dashboard
     with st.expander("Sensor Visualization Dashboard"):
-        graph(engine_id, test_df, processor, health_details, seq_length=50)
+        graph(engine_id, test_df, processor, health_details, seq_length=seq_length)
 
     # ✅ ADD THIS SECTION FOR PDF REPORT GENERATION
       # ✅ FIXED: Simple report button that doesn't cause rerun issues
@@ -165,7 +206,9 @@ def show_single_eng(engine_id, test_df, model, processor, seq_length=50):
             **Overall Sensor Health = Average(All Current Scores)**
             """)  
     with st.expander("📄 Generate Report", expanded=False):
-      generate_and_download_report(engine_id, test_df, processor, pred_rul, actual_rul, health_details)
+      # The built PDF is kept with the analysis, so reruns only rebuild it after a new analysis
+      generate_and_download_report(engine_id, test_df, processor, pred_rul, actual_rul, health_details,
+                                   cache=analysis)
 
 
 # ---------------------------------------------------------------
@@ -197,29 +240,80 @@ def get_engine_health_values(engine_id, test_df, model, processor, seq_length=50
         if pred_rul is None or health_details is None:
             return None
 
-        # Sensor breakdown
-        sensor_status_today = health_details['sensor_status_today']
-        warning_count = len(health_details['warning_sensors'])
-        critical_count = len(health_details['critical_sensors'])
-        total_sensors = len(sensor_status_today)
-        good_count = total_sensors - (warning_count + critical_count)
-
-        # Calculate average anomaly level and score
-        anomaly_levels = [s['anomaly_level'] for s in sensor_status_today.values()]
-        scores = [s['score'] for s in sensor_status_today.values()]
-        avg_anomaly = round(sum(anomaly_levels) / len(anomaly_levels), 2) if anomaly_levels else 0
-        avg_score = round(sum(scores) / len(scores), 2) if scores else 0
-
-        return {
-            'predicted_rul': pred_rul,
-            'sensor_health': health_details['sensor_health'],
-            'warning_sensors': warning_count,
-            'critical_sensors': critical_count,
-            'good_sensors': good_count,
-            'anomaly_level': avg_anomaly,
-            'sensor_health': avg_score
-        }
+        return summarize_engine_health(pred_rul, health_details)
 
     except Exception as e:
         print(f"Error in get_engine_health_values: {str(e)}")
         return None
+
+
+def summarize_engine_health(pred_rul, health_details):
+    """Reduce one engine's health details to the cost optimizer's input values"""
+    # Sensor breakdown
+    sensor_status_today = health_details['sensor_status_today']
+    warning_count = len(health_details['warning_sensors'])
+    critical_count = len(health_details['critical_sensors'])
+    total_sensors = len(sensor_status_today)
+    good_count = total_sensors - (warning_count + critical_count)
+
+    # Calculate average anomaly level and score
+    anomaly_levels = [s['anomaly_level'] for s in sensor_status_today.values()]
+    scores = [s['score'] for s in sensor_status_today.values()]
+    avg_anomaly = round(sum(anomaly_levels) / len(anomaly_levels), 2) if anomaly_levels else 0
+    avg_score = round(sum(scores) / len(scores), 2) if scores else 0
+
+    return {
+        'predicted_rul': pred_rul,
+        'sensor_health': health_details['sensor_health'],
+        'warning_sensors': warning_count,
+        'critical_sensors': critical_count,
+        'good_sensors': good_count,
+        'anomaly_level': avg_anomaly,
+        'sensor_health': avg_score
+    }
+
+
+def snapshot_cost_values(snapshot):
+    """Cost optimizer input values for every engine of a FleetSnapshot
+
+    Returns:
+        dict: {engine_id: dict in the same format as get_engine_health_values}
+    """
+    total_sensors = len(snapshot.sensor_names)
+    good_counts = total_sensors - (snapshot.warning_sensors + snapshot.critical_sensors)
+    if total_sensors:
+        avg_anomaly = np.round(snapshot.sensor_anomaly.mean(axis=1), 2)
+        avg_score = np.round(snapshot.sensor_score.mean(axis=1), 2)
+    else:
+        avg_anomaly = avg_score = np.zeros(len(snapshot))
+
+    return {
+        int(engine_id): {
+            'predicted_rul': int(snapshot.pred_rul[i]),
+            'warning_sensors': int(snapshot.warning_sensors[i]),
+            'critical_sensors': int(snapshot.critical_sensors[i]),
+            'good_sensors': int(good_counts[i]),
+            'anomaly_level': avg_anomaly[i],
+            'sensor_health': avg_score[i]
+        }
+        for i, engine_id in enumerate(snapshot.engine_ids)
+    }
+
+
+def get_fleet_health_values(test_df, model, processor, seq_length=50, data_version=None):
+    """
+    Returns the cost optimizer input values for every engine in one pass.
+
+    Reuses the All Engines fleet snapshot (and its cache), so the fleet is only
+    scored again when the data changed.
+
+    Returns:
+        dict: {engine_id: dict in the same format as get_engine_health_values}
+    """
+    try:
+        snapshot = get_fleet_snapshot(test_df, model, processor, seq_length, data_version)
+        return snapshot_cost_values(snapshot)
+
+    except Exception as e:
+        st.error(f"❌ Error collecting fleet health data: {str(e)}")
+        return None
@@ -2,97 +2,131 @@
 
 import streamlit as st
 import io
+import os
+import time
+import zipfile
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 from reportlab.lib.units import inch
+from tracing import span
+from metrics import REPORT_SECONDS, REPORT_FAILURES, QUEUE_DEPTH, record_cache
 
-def generate_and_download_report(engine_id, test_df, processor, pred_rul=None, actual_rul=None, health_details=None):
-    """Generate and immediately download PDF report"""
-    try:
-        if not all([pred_rul, actual_rul, health_details]):
-            st.error("Missing engine health data. Please analyze the engine first.")
-            return
+def build_engine_report_pdf(engine_id, pred_rul, actual_rul, health_details, analyzed_at=None):
+    """Build one engine's PDF health report and return it as bytes
 
-        # Create PDF buffer
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        elements = []
+    `analyzed_at` labels a report built from an earlier (cached) analysis;
+    without it the report is stamped with the generation time.
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    elements = []
 
-        styles = getSampleStyleSheet()
+    styles = getSampleStyleSheet()
 
-        # === Title ===
-        elements.append(Paragraph(f"Engine {engine_id} - Health Report", styles['Heading1']))
+    # === Title ===
+    elements.append(Paragraph(f"Engine {engine_id} - Health Report", styles['Heading1']))
+    if analyzed_at is None:
         elements.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-        elements.append(Spacer(1, 15))
-
-        # === Summary Table ===
-        elements.append(Paragraph("Executive Summary", styles['Heading2']))
-        summary_data = [
-            ["Metric", "Value"],
-            ["Predicted RUL", f"{pred_rul} cycles"],
-            ["Actual RUL", f"{actual_rul} cycles"],
-            ["Overall Health", f"{health_details['overall_health']}%"],
-            ["Status", health_details['health_status']],
-            ["RUL Health", f"{health_details['rul_health']}%"],
-            ["Sensor Health", f"{health_details['sensor_health']}%"],
-            ["Critical Sensors", ", ".join(health_details['critical_sensors']) if health_details['critical_sensors'] else "None"],
-            ["Warning Sensors", ", ".join(health_details['warning_sensors']) if health_details['warning_sensors'] else "None"],
-        ]
-
-        summary_table = Table(summary_data, colWidths=[2.5*inch, 3.5*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ]))
-        elements.append(summary_table)
-        elements.append(Spacer(1, 15))
-
-        # === Sensor Details ===
-        elements.append(Paragraph("Sensor Analysis", styles['Heading2']))
-        sensor_data = [["Sensor", "Value", "Status", "Anomaly", "Score (%)"]]
-
-        for sensor_name, info in health_details['sensor_status_today'].items():
-            sensor_data.append([
-                sensor_name,
-                f"{info['value']} {info.get('unit', '')}",
-                info['status'].replace('✅', 'OK').replace('⚠️', 'WARN').replace('🚨', 'CRIT'),
-                f"{info['anomaly_level']}%",
-                f"{info['score']}%",
-            ])
-
-        sensor_table = Table(sensor_data, colWidths=[1.7*inch, 1.2*inch, 0.8*inch, 0.8*inch, 0.8*inch])
-        sensor_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ]))
-        elements.append(sensor_table)
-        elements.append(Spacer(1, 20))
-
-        # === Recommendations ===
-        elements.append(Paragraph("Maintenance Recommendations", styles['Heading2']))
-        recommendations = generate_recommendations(health_details, pred_rul)
-        for rec in recommendations:
-            elements.append(Paragraph(f"• {rec}", styles['Normal']))
-
-        elements.append(Spacer(1, 20))
-        # elements.append(Paragraph("End of Report.", styles['Italic']))
-
-        # === Build PDF ===
+    else:
+        elements.append(Paragraph(f"Analysis time: {analyzed_at.strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
+    elements.append(Spacer(1, 15))
+
+    # === Summary Table ===
+    elements.append(Paragraph("Executive Summary", styles['Heading2']))
+    summary_data = [
+        ["Metric", "Value"],
+        ["Predicted RUL", f"{pred_rul} cycles"],
+        ["Actual RUL", f"{actual_rul} cycles"],
+        ["Overall Health", f"{health_details['overall_health']}%"],
+        ["Status", health_details['health_status']],
+        ["RUL Health", f"{health_details['rul_health']}%"],
+        ["Sensor Health", f"{health_details['sensor_health']}%"],
+        ["Critical Sensors", ", ".join(health_details['critical_sensors']) if health_details['critical_sensors'] else "None"],
+        ["Warning Sensors", ", ".join(health_details['warning_sensors']) if health_details['warning_sensors'] else "None"],
+    ]
+
+    summary_table = Table(summary_data, colWidths=[2.5*inch, 3.5*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ]))
+    elements.append(summary_table)
+    elements.append(Spacer(1, 15))
+
+    # === Sensor Details ===
+    elements.append(Paragraph("Sensor Analysis", styles['Heading2']))
+    sensor_data = [["Sensor", "Value", "Status", "Anomaly", "Score (%)"]]
+
+    for sensor_name, info in health_details['sensor_status_today'].items():
+        sensor_data.append([
+            sensor_name,
+            f"{info['value']} {info.get('unit', '')}",
+            info['status'].replace('✅', 'OK').replace('⚠️', 'WARN').replace('🚨', 'CRIT'),
+            f"{info['anomaly_level']}%",
+            f"{info['score']}%",
+        ])
+
+    sensor_table = Table(sensor_data, colWidths=[1.7*inch, 1.2*inch, 0.8*inch, 0.8*inch, 0.8*inch])
+    sensor_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ]))
+    elements.append(sensor_table)
+    elements.append(Spacer(1, 20))
+
+    # === Recommendations ===
+    elements.append(Paragraph("Maintenance Recommendations", styles['Heading2']))
+    recommendations = generate_recommendations(health_details, pred_rul)
+    for rec in recommendations:
+        elements.append(Paragraph(f"• {rec}", styles['Normal']))
+
+    elements.append(Spacer(1, 20))
+    # elements.append(Paragraph("End of Report.", styles['Italic']))
+
+    # === Build PDF ===
+    with span("pdf_rendering"):
         doc.build(elements)
-        buffer.seek(0)
+    return buffer.getvalue()
+
+
+def generate_and_download_report(engine_id, test_df, processor, pred_rul=None, actual_rul=None, health_details=None,
+                                 cache=None):
+    """Generate and immediately download PDF report.
+
+    If `cache` (a dict, e.g. a stored engine analysis) is given, the PDF is
+    built once and reused from `cache['report_pdf']` on later reruns.
+    """
+    try:
+        if not all([pred_rul, actual_rul, health_details]):
+            st.error("Missing engine health data. Please analyze the engine first.")
+            return
+
+        if cache is not None:
+            record_cache("engine_pdf", 'report_pdf' in cache)
+        if cache is not None and 'report_pdf' in cache:
+            pdf_bytes = cache['report_pdf']
+        else:
+            with REPORT_SECONDS.labels("engine_pdf").time():
+                pdf_bytes = build_engine_report_pdf(engine_id, pred_rul, actual_rul, health_details,
+                                                    None if cache is None else cache.get('analyzed_at'))
+            if cache is not None:
+                cache['report_pdf'] = pdf_bytes
 
         # === Download Button ===
         st.download_button(
             label="📥 Click to Download Engine Report (PDF)",
-            data=buffer,
+            data=pdf_bytes,
             file_name=f"Engine_{engine_id}_Health_Report_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
             mime="application/pdf",
             use_container_width=True,
@@ -104,6 +138,7 @@ def generate_and_download_report(engine_id, test_df, processor, pred_rul=None, a
         st.success("PDF report generated successfully!")
 
     except Exception as e:
+        REPORT_FAILURES.labels("engine_pdf").inc()
         st.error(f"Error generating PDF: {str(e)}")
 
 
@@ -128,3 +163,89 @@ def generate_recommendations(health_details, pred_rul):
         recs.append("All sensors operating within safe ranges.")
 
     return recs
+
+
+# ---------------------------------------------------------------
+# Bulk export: every engine's report in one ZIP
+# ---------------------------------------------------------------
+
+def _render_engine_reports(tasks):
+    """Worker: render a batch of (engine_id, pred_rul, actual_rul, health_details)"""
+    return [
+        (f"Engine_{engine_id}_Health_Report.pdf", build_engine_report_pdf(engine_id, pred_rul, actual_rul, health_details))
+        for engine_id, pred_rul, actual_rul, health_details in tasks
+    ]
+
+
+def _snapshot_report_batches(snapshot, batch_size):
+    """Yield report tasks from a FleetSnapshot in batches, building details lazily"""
+    batch = []
+    for i, engine_id in enumerate(snapshot.engine_ids):
+        batch.append((int(engine_id), int(snapshot.pred_rul[i]), int(snapshot.actual_rul[i]),
+                      snapshot.engine_health_details(i)))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_fleet_reports_zip(snapshot, zip_path=None, max_workers=None, batch_size=16):
+    """Render every engine's PDF report in worker processes and stream them into a ZIP
+
+    At most `2 * max_workers` batches are in flight, and finished PDFs are
+    written to the ZIP on disk as they arrive, so memory stays bounded no
+    matter how large the fleet is. A temporary ZIP created here is removed
+    again if rendering fails.
+
+    Returns:
+        (zip_path, stats) where stats = {'reports', 'seconds', 'reports_per_second'}
+    """
+    created = zip_path is None
+    if created:
+        handle, zip_path = tempfile.mkstemp(prefix="fleet_engine_reports_", suffix=".zip")
+        os.close(handle)
+
+    try:
+        stats = _write_reports_zip(snapshot, zip_path, max_workers or os.cpu_count() or 1, batch_size)
+    except BaseException:
+        if created and os.path.exists(zip_path):
+            os.remove(zip_path)
+        raise
+    return zip_path, stats
+
+
+def _write_reports_zip(snapshot, zip_path, max_workers, batch_size):
+    start = time.perf_counter()
+    n_reports = 0
+
+    # spawn: forking a process that has TensorFlow threads running is unsafe
+    with span("pdf_rendering"), zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive, \
+            ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+
+        def write_finished(futures):
+            nonlocal n_reports
+            for future in futures:
+                for file_name, pdf_bytes in future.result():
+                    archive.writestr(file_name, pdf_bytes)
+                    n_reports += 1
+
+        pending = set()
+        depth = QUEUE_DEPTH.labels("engine_reports")
+        for batch in _snapshot_report_batches(snapshot, batch_size):
+            pending.add(pool.submit(_render_engine_reports, batch))
+            depth.set(len(pending))
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                write_finished(done)
+                depth.set(len(pending))
+        write_finished(pending)
+        depth.set(0)
+
+    seconds = time.perf_counter() - start
+    REPORT_SECONDS.labels("engine_zip").observe(seconds)
+    return {
+        'reports': n_reports,
+        'seconds': seconds,
+        'reports_per_second': n_reports / seconds if seconds > 0 else 0.0
+    }
@@ -0,0 +1,220 @@
+"""Threshold tuning: fleet-wide status impact of sensor threshold changes.
+
+Thresholds only feed sensor health, so tuning them never needs the RUL
+model: predicted RULs come from the cached All Engines snapshot. The
+ThresholdKernel keeps each engine's scaled sensor window sorted, with prefix
+sums, so the mean anomaly under any (low, high) is three binary searches per
+engine instead of a pass over every cycle, and only sensors whose thresholds
+moved are recomputed.
+"""
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from feature.all_eng import get_fleet_snapshot
+from feature.fleet_snapshot import GOOD, WARNING, CRITICAL, STATUS_LABELS, SENSOR_OK, SENSOR_LOW, SENSOR_HIGH, \
+    classify_health
+from feature.health_monitor import extract_fleet_windows, fleet_sensor_windows
+from tracing import span, traced_rerun
+from metrics import record_cache
+
+MOVED_ROWS = 500
+
+
+class ThresholdKernel:
+    """Sensor health and engine status of a scored fleet under any sensor thresholds
+
+    Same results as calculate_fleet_sensor_health on the windows, with the
+    RUL health of each engine held fixed. `baseline` is the evaluation at the
+    thresholds the kernel was built with.
+    """
+
+    def __init__(self, sensor_windows, rul_health, low, high):
+        sensor_windows = np.asarray(sensor_windows, dtype=np.float64)
+        n_engines, self.cycles, n_sensors = sensor_windows.shape
+        self.rul_health = np.asarray(rul_health)
+        self.current = sensor_windows[:, -1, :]
+
+        # (sensors, engines, cycles), every engine's cycles sorted, and their prefix sums
+        ordered = np.sort(sensor_windows.transpose(2, 0, 1), axis=2)
+        self._prefix = np.zeros((n_sensors, n_engines, self.cycles + 1))
+        np.cumsum(ordered, axis=2, out=self._prefix[:, :, 1:])
+
+        # Shift engine e of a sensor by e * span: the flattened rows are then one sorted
+        # array, and a single searchsorted finds the threshold's position in every engine
+        self._vmin = ordered.min(axis=(1, 2), initial=0.0)
+        spans = ordered.max(axis=(1, 2), initial=0.0) - self._vmin + 1.0
+        self._offsets = np.arange(n_engines) * spans[:, None]
+        self._keys = (ordered - self._vmin[:, None, None] + self._offsets[:, :, None]).reshape(n_sensors, -1)
+        self._row_starts = np.arange(n_engines) * self.cycles
+        self._rows = np.arange(n_engines)
+
+        self._anomaly = np.zeros((n_engines, n_sensors))
+        self._low = np.full(n_sensors, np.nan)
+        self._high = np.full(n_sensors, np.nan)
+        self.last_recomputed = 0
+        self.baseline = self.evaluate(low, high)
+
+    def __len__(self):
+        return len(self.rul_health)
+
+    def _count_below(self, sensor, threshold, side):
+        """Per engine, cycles with value < threshold ('left') or <= threshold ('right')"""
+        needles = self._offsets[sensor] + (threshold - self._vmin[sensor])
+        return np.searchsorted(self._keys[sensor], needles, side) - self._row_starts
+
+    def anomaly_level(self, sensor, low, high):
+        """Mean anomaly of one sensor over each engine's window, shape (engines,)"""
+        n = self.cycles
+        ideal = (low + high) / 2
+        prefix = self._prefix[sensor]
+        below = self._count_below(sensor, low, 'left')
+        under_ideal = self._count_below(sensor, ideal, 'left')
+        not_above = self._count_below(sensor, high, 'right')
+        sum_below, sum_ideal, sum_high = (prefix[self._rows, below], prefix[self._rows, under_ideal],
+                                          prefix[self._rows, not_above])
+        total = prefix[:, n]
+
+        # Sums of the three branches of calculate_fleet_sensor_health over sorted cycles
+        anomaly = (100 / low * (below * low - sum_below)
+                   + 100 / high * (total - sum_high - (n - not_above) * high)
+                   + 50 / (high - low) * (ideal * (2 * under_ideal - below - not_above)
+                                          - 2 * sum_ideal + sum_below + sum_high))
+        return anomaly / n
+
+    def evaluate(self, low, high):
+        """(sensor_health, overall_health, status, sensor_status) for thresholds low, high (sensors,)"""
+        low = np.array(low, dtype=np.float64)
+        high = np.array(high, dtype=np.float64)
+        if not ((low > 0) & (low < high)).all():
+            raise ValueError("Thresholds need 0 < low < high for every sensor")
+
+        changed = np.flatnonzero((low != self._low) | (high != self._high))
+        for sensor in changed:
+            self._anomaly[:, sensor] = self.anomaly_level(sensor, low[sensor], high[sensor])
+        self._low, self._high = low, high
+        self.last_recomputed = len(changed)
+
+        score = np.maximum(0, 100 - self._anomaly)
+        sensor_health = np.round(score.mean(axis=1), 2) if score.shape[1] else np.full(len(score), 100.0)
+        overall_health = np.round(0.6 * self.rul_health + 0.4 * sensor_health, 2)
+        sensor_status = np.where(self.current < low, SENSOR_LOW,
+                                 np.where(self.current > high, SENSOR_HIGH, SENSOR_OK))
+        return sensor_health, overall_health, classify_health(overall_health), sensor_status
+
+
+def build_threshold_kernel(test_df, snapshot, processor, seq_length=50):
+    """ThresholdKernel over the snapshot's engines at the processor's thresholds"""
+    engine_ids, _, X, feature_cols = extract_fleet_windows(test_df, seq_length)
+    monitored, sensor_windows = fleet_sensor_windows(X, feature_cols, processor)
+    # Same source and window length as the snapshot; align rows in case engines were added since
+    rows = np.minimum(np.searchsorted(engine_ids, snapshot.engine_ids), max(len(engine_ids) - 1, 0))
+    return ThresholdKernel(sensor_windows[rows], snapshot.rul_health,
+                           processor.low[monitored], processor.high[monitored])
+
+
+def get_threshold_kernel(test_df, snapshot, processor, seq_length=50):
+    """Kernel for the current fleet snapshot, built once per All Engines cache key"""
+    cache_key = st.session_state.get('fleet_snapshot_key')
+    hit = st.session_state.get('threshold_kernel_key') == cache_key and 'threshold_kernel' in st.session_state
+    record_cache("threshold_kernel", hit)
+    if not hit:
+        with span("threshold_kernel_build"):
+            st.session_state.threshold_kernel = build_threshold_kernel(test_df, snapshot, processor, seq_length)
+        st.session_state.threshold_kernel_key = cache_key
+    return st.session_state.threshold_kernel
+
+
+@st.fragment
+@traced_rerun("threshold_tuning")
+def show_threshold_controls(kernel, snapshot, processor):
+    """Threshold sliders and the resulting status moves; a slider change reruns only this section"""
+    monitored = np.flatnonzero(processor.monitored)
+    default_low, default_high = processor.low[monitored], processor.high[monitored]
+
+    if st.button("↩️ Reset to sensor_config thresholds"):
+        for i in monitored:
+            st.session_state.pop(f"threshold_{processor.keys[i]}", None)
+
+    low, high = default_low.copy(), default_high.copy()
+    with st.expander("🎛️ Sensor Thresholds (scaled 0–1)", expanded=True):
+        columns = st.columns(3)
+        for j, i in enumerate(monitored):
+            with columns[j % 3]:
+                low[j], high[j] = st.slider(
+                    f"{processor.names[i]} ({processor.keys[i]})", min_value=0.01, max_value=1.0,
+                    value=(float(default_low[j]), float(default_high[j])), step=0.01,
+                    key=f"threshold_{processor.keys[i]}"
+                )
+
+    try:
+        start = time.perf_counter()
+        with span("threshold_kernel"):
+            sensor_health, overall_health, status, sensor_status = kernel.evaluate(low, high)
+        elapsed_ms = (time.perf_counter() - start) * 1e3
+    except ValueError as e:
+        st.error(f"❌ {str(e)}")
+        return
+
+    _, baseline_health, baseline_status, _ = kernel.baseline
+    before = np.bincount(baseline_status, minlength=3)
+    after = np.bincount(status, minlength=3)
+    moved = np.flatnonzero(status != baseline_status)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("✅ Good", int(after[GOOD]), delta=int(after[GOOD] - before[GOOD]))
+    with col2:
+        st.metric("⚠️ Warning", int(after[WARNING]), delta=int(after[WARNING] - before[WARNING]), delta_color="off")
+    with col3:
+        st.metric("🚨 Critical", int(after[CRITICAL]), delta=int(after[CRITICAL] - before[CRITICAL]),
+                  delta_color="inverse")
+    with col4:
+        st.metric("🔀 Engines Moved", len(moved))
+    st.caption(f"⚡ {len(kernel)} engines re-evaluated in {elapsed_ms:.1f} ms "
+               f"({kernel.last_recomputed} sensors recomputed, RUL predictions reused)")
+
+    st.markdown("**Status transitions** (rows: sensor_config thresholds, columns: tuned thresholds)")
+    transitions = np.bincount(baseline_status * 3 + status, minlength=9).reshape(3, 3)
+    st.dataframe(pd.DataFrame(transitions, index=STATUS_LABELS, columns=STATUS_LABELS), use_container_width=True)
+
+    if len(moved):
+        # Worst new status first, then lowest tuned health
+        moved = moved[np.lexsort((overall_health[moved], -status[moved]))]
+        shown = moved[:MOVED_ROWS]
+        st.markdown("**Engines that changed status**")
+        st.dataframe(pd.DataFrame({
+            'Engine ID': snapshot.engine_ids[shown],
+            'Predicted RUL': snapshot.pred_rul[shown],
+            'Health (config)': baseline_health[shown],
+            'Health (tuned)': overall_health[shown],
+            'Sensor Health (tuned)': sensor_health[shown],
+            'Critical Sensors (tuned)': (sensor_status[shown] == SENSOR_HIGH).sum(axis=1),
+            'Status (config)': STATUS_LABELS[baseline_status[shown]],
+            'Status (tuned)': STATUS_LABELS[status[shown]],
+        }), use_container_width=True, hide_index=True, height=min(400, len(shown) * 35 + 40))
+        if len(moved) > MOVED_ROWS:
+            st.caption(f"Showing {MOVED_ROWS} of {len(moved)} engines")
+
+    changed = np.flatnonzero((low != default_low) | (high != default_high))
+    if len(changed):
+        st.markdown("**Changed thresholds** (for `sensor_thresholds` in sensor_config.py)")
+        st.code("\n".join(f"'{processor.keys[monitored[j]]}': ({low[j]:g}, {high[j]:g})," for j in changed),
+                language="python")
+
+
+def show_threshold_tuning(test_df, model, processor, seq_length=50, data_version=None):
+    """Tune sensor thresholds and see how many engines change status, without re-running the model"""
+    st.subheader("🎚️ Threshold Tuning")
+    st.caption("Thresholds only change sensor health: predicted RULs come from the fleet scoring run "
+               "and only the sensor health and status are recomputed.")
+
+    # Shares the All Engines snapshot (and its cache) for the predicted RULs
+    snapshot = get_fleet_snapshot(test_df, model, processor, seq_length, data_version)
+    if not len(snapshot):
+        st.error("No engine data available for analysis")
+        return
+
+    kernel = get_threshold_kernel(test_df, snapshot, processor, seq_length)
+    show_threshold_controls(kernel, snapshot, processor)
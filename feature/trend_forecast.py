@@ -4,35 +4,13 @@ import matplotlib.pyplot as plt
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import SimpleRNN, Dense, Dropout
 from sklearn.preprocessing import MinMaxScaler
+from tracing import span, traced, traced_rerun
+from metrics import record_cache
+from history_store import engine_history
+from preprocess import session_cache
 
-# -------------------------------
-# 🔹 Simple value converter
-# -------------------------------
-def convert_to_realistic_value(sensor_name, scaled_value):
-    """Convert scaled value to realistic industrial value"""
-    realistic_mapper = {
-        'Temperature': {'unit': '°C', 'min': 20, 'max': 120},
-        'Pressure': {'unit': 'PSI', 'min': 0, 'max': 100},
-        'RPM': {'unit': 'RPM', 'min': 0, 'max': 3000},
-        'Fuel Flow': {'unit': 'L/min', 'min': 0, 'max': 50},
-        'Vibration X': {'unit': 'mm/s', 'min': 0, 'max': 10},
-        'Vibration Y': {'unit': 'mm/s', 'min': 0, 'max': 10},
-        'Vibration Z': {'unit': 'mm/s', 'min': 0, 'max': 10},
-        'Oil Temp': {'unit': '°C', 'min': 60, 'max': 120},
-        'Oil Pressure': {'unit': 'PSI', 'min': 20, 'max': 80},
-        'Exhaust Temp': {'unit': '°C', 'min': 300, 'max': 600},
-        'Compressor Temp': {'unit': '°C', 'min': 100, 'max': 300},
-        'Fan Speed': {'unit': 'RPM', 'min': 0, 'max': 2000},
-        'Throttle Position': {'unit': '%', 'min': 0, 'max': 100},
-        'Fuel Temp': {'unit': '°C', 'min': 15, 'max': 50},
-        'Engine Load': {'unit': '%', 'min': 0, 'max': 100}
-    }
-    
-    if sensor_name in realistic_mapper:
-        mapper = realistic_mapper[sensor_name]
-        realistic_value = scaled_value * (mapper['max'] - mapper['min']) + mapper['min']
-        return realistic_value, mapper['unit']
-    return scaled_value, ""
+# Forecasts kept per session for the current data version
+TREND_FORECAST_CACHE_SIZE = 64
 
 # -------------------------------
 # 🔹 Sequence generator
@@ -89,18 +67,20 @@ def train_predict_rnn(engine_data, sensor_col, seq_len=50, forecast_days=10):
     model.compile(optimizer='adam', loss='mse', metrics=['mae'])
 
     # Train
-    model.fit(X, y, epochs=20, batch_size=16, verbose=0)
+    with span("rnn_training"):
+        model.fit(X, y, epochs=20, batch_size=16, verbose=0)
 
     # Forecast using the last available sequence
     last_seq = scaled[-seq_len:]
     future_preds_scaled = []
     temp_seq = last_seq.copy()
 
-    for _ in range(forecast_days):
-        x_input = temp_seq[-seq_len:].reshape(1, seq_len, 1)
-        pred_scaled = model.predict(x_input, verbose=0)[0, 0]
-        future_preds_scaled.append(pred_scaled)
-        temp_seq = np.append(temp_seq, pred_scaled)
+    with span("model.predict"):
+        for _ in range(forecast_days):
+            x_input = temp_seq[-seq_len:].reshape(1, seq_len, 1)
+            pred_scaled = model.predict(x_input, verbose=0)[0, 0]
+            future_preds_scaled.append(pred_scaled)
+            temp_seq = np.append(temp_seq, pred_scaled)
 
     # Convert to original scale
     future_preds = scaler.inverse_transform(
@@ -109,6 +89,33 @@ def train_predict_rnn(engine_data, sensor_col, seq_len=50, forecast_days=10):
     
     return future_preds
 
+# -------------------------------
+# 🔹 Cached forecast (compute once per engine/sensor)
+# -------------------------------
+def get_sensor_forecast(engine_id, engine_data, sensor_col, data_version=None,
+                        history_days=100, seq_len=50, forecast_days=10):
+    """Forecast for one engine sensor, trained once per data version and reused across reruns"""
+    forecasts = session_cache('trend_forecasts', data_version)
+    key = (data_version, engine_id, sensor_col, history_days, seq_len, forecast_days)
+
+    record_cache("trend_forecast", key in forecasts)
+    if key in forecasts:
+        forecasts.move_to_end(key)
+    else:
+        future_preds = train_predict_rnn(
+            engine_data.tail(history_days),
+            sensor_col,
+            seq_len=seq_len,
+            forecast_days=forecast_days
+        )
+        if len(future_preds) == 0:
+            return future_preds
+        forecasts[key] = future_preds
+        while len(forecasts) > TREND_FORECAST_CACHE_SIZE:
+            forecasts.popitem(last=False)
+
+    return forecasts[key]
+
 # -------------------------------
 # 🔹 Trend & Alerts based on last 3 days
 # -------------------------------
@@ -131,6 +138,7 @@ def get_trend_and_alerts(last_3, high=None, low=None):
 # -------------------------------
 # 🔹 Plot last 50 + next 10 days
 # -------------------------------
+@traced("chart_building")
 def plot_last50_next10(hist_realistic, future_realistic, sensor_name, unit, low=None, high=None):
     last_50 = hist_realistic[-50:]
     plt.figure(figsize=(10, 3))
@@ -154,16 +162,27 @@ def plot_last50_next10(hist_realistic, future_realistic, sensor_name, unit, low=
 # -------------------------------
 # 🔹 Main Streamlit Function with Sensor Selection
 # -------------------------------
-def show_trend_forecasting(engine_id, test_df, processor):
+def show_trend_forecasting(engine_id, test_df, processor, data_version=None):
     st.header("RNN Trend Forecasting")
     
     # Filter engine data
-    engine_data = test_df[test_df['unit_number'] == engine_id].reset_index(drop=True)
+    engine_data = engine_history(test_df, engine_id).reset_index(drop=True)
     
     if engine_data.empty:
         st.error(f"❌ No data found for Engine {engine_id}")
         return
 
+    if data_version is None:
+        data_version = id(test_df)
+    show_sensor_forecast(engine_id, engine_data, processor, data_version)
+
+# -------------------------------
+# 🔹 Sensor forecast section (reruns on its own)
+# -------------------------------
+@st.fragment
+@traced_rerun("trend_forecast")
+def show_sensor_forecast(engine_id, engine_data, processor, data_version):
+    """Sensor picker plus forecast views; changing the sensor reruns only this section"""
     st.subheader("Sensor Selection")
     
     # Get available sensors from processor mapping
@@ -210,10 +229,13 @@ def show_trend_forecasting(engine_id, test_df, processor):
     # Forecast
     try:
         with st.spinner(f"Training RNN and forecasting for {sensor_name}..."):
-            future_preds = train_predict_rnn(
-                engine_data.tail(history_days), 
+            future_preds = get_sensor_forecast(
+                engine_id,
+                engine_data,
                 selected_sensor,
-                seq_len=seq_length, 
+                data_version,
+                history_days=history_days,
+                seq_len=seq_length,
                 forecast_days=forecast_days
             )
 
@@ -223,30 +245,15 @@ def show_trend_forecasting(engine_id, test_df, processor):
 
         st.success("✅ Forecast generated successfully!")
 
-        # Convert historical data to realistic values
+        # Convert historical data and predictions to realistic values (unrounded)
         hist_scaled = engine_data[selected_sensor].tail(history_days).values
-        hist_realistic = []
-        for v in hist_scaled:
-            realistic_val, unit = convert_to_realistic_value(sensor_name, float(v))
-            hist_realistic.append(realistic_val)
-
-        # Convert future predictions to realistic values
-        future_realistic = []
-        future_units = []
-        for v in future_preds:
-            realistic_val, unit = convert_to_realistic_value(sensor_name, float(v))
-            future_realistic.append(realistic_val)
-            future_units.append(unit)
-
-        # Get the unit for display (use first one)
-        display_unit = future_units[0] if future_units else ""
+        hist_realistic, _ = processor.to_realistic(hist_scaled, selected_sensor, decimals=None)
+        future_realistic, display_unit = processor.to_realistic(future_preds, selected_sensor, decimals=None)
 
         # Convert thresholds to realistic values
-        low_threshold_scaled = processor.sensor_thresholds[selected_sensor][0]
-        high_threshold_scaled = processor.sensor_thresholds[selected_sensor][1]
-        
-        low_threshold_realistic, _ = convert_to_realistic_value(sensor_name, low_threshold_scaled)
-        high_threshold_realistic, _ = convert_to_realistic_value(sensor_name, high_threshold_scaled)
+        (low_threshold_realistic, high_threshold_realistic), _ = processor.to_realistic(
+            processor.thresholds(selected_sensor), selected_sensor, decimals=None
+        )
 
         # Trend analysis based on last 3 historical points
         if len(hist_realistic) >= 3:
@@ -0,0 +1,277 @@
+"""Background fleet watcher: continuous re-scoring with status-transition alerts.
+
+A FleetWatcher runs an asyncio loop on a daemon thread. Every `interval`
+seconds, or as soon as notify() is called, it checks the data version of its
+source (a HistoryStore or a DataFrame). When the data changed, the fleet is
+re-scored with rescore_fleet_health, so only engines with new cycles go
+through the model, in one batched call. Engines whose status moves
+(GOOD -> WARNING, WARNING -> CRITICAL, and recoveries) or that raise a new
+critical sensor become alerts: kept in an in-memory feed for the dashboard
+and appended as JSON lines to a local log. The first scan reports every
+engine that is already WARNING or CRITICAL as a NEW alert.
+
+Scoring runs on a single worker thread, and after each run the watcher
+idles so that scoring is busy at most `cpu_share` of the wall-clock time.
+That is a duty cycle, not a CPU cap: TensorFlow (and NumPy) run each call
+on their own intra-op thread pools, so while scoring, the process can use
+several cores. In the dashboard those pools are shared with every session
+and are not limited; the standalone CLI takes --threads to size
+TensorFlow's pools (default 1), which bounds the model call, the bulk of
+the scoring work, to about threads x cpu_share cores.
+
+Usage (from the repository root):
+    SMARTMACH_WATCH_INTERVAL=30 SMARTMACH_HISTORY_DB=history.db streamlit run app.py
+    python fleet_watcher.py --db history.db --interval 30 --log alerts.jsonl
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+import numpy as np
+
+from preprocess import dataset_version
+from history_store import HistoryStore
+from feature.fleet_snapshot import STATUS_NAMES, GOOD, SENSOR_HIGH
+from feature.health_monitor import rescore_fleet_health
+from metrics import FLEET_ALERTS, WATCHER_RUNS
+
+WATCH_INTERVAL_ENV = "SMARTMACH_WATCH_INTERVAL"
+ALERT_LOG_ENV = "SMARTMACH_ALERT_LOG"
+DEFAULT_ALERT_LOG = "alerts.jsonl"
+
+
+def fleet_alerts(previous, snapshot):
+    """Alerts for engines whose status or critical sensors changed between two snapshots
+
+    With no previous snapshot (the first scan) every engine counts as new.
+    """
+    if not len(snapshot):
+        return []
+
+    if previous is not None and len(previous):
+        rows = np.minimum(np.searchsorted(previous.engine_ids, snapshot.engine_ids), len(previous) - 1)
+        known = previous.engine_ids[rows] == snapshot.engine_ids
+        before = np.where(known, previous.status[rows], -1)
+        was_critical = known[:, None] & (previous.sensor_status[rows] == SENSOR_HIGH)
+    else:
+        known = np.zeros(len(snapshot), dtype=bool)
+        before = np.full(len(snapshot), -1)
+        was_critical = np.zeros(snapshot.sensor_status.shape, dtype=bool)
+
+    # New engines only alert when they arrive in WARNING or CRITICAL (as NEW, listing their critical sensors)
+    status_moved = (before != snapshot.status) & (known | (snapshot.status != GOOD))
+    new_critical = (snapshot.sensor_status == SENSOR_HIGH) & ~was_critical
+    sensor_raised = new_critical.any(axis=1) & ~status_moved & known
+
+    now = datetime.now().isoformat(timespec="seconds")
+    names = np.array(snapshot.sensor_names)
+    alerts = []
+    for i in np.flatnonzero(status_moved | sensor_raised):
+        alerts.append({
+            'time': now,
+            'engine_id': int(snapshot.engine_ids[i]),
+            'kind': 'status' if status_moved[i] else 'sensor',
+            'from': str(STATUS_NAMES[before[i]]) if before[i] >= 0 else None,
+            'to': str(STATUS_NAMES[snapshot.status[i]]),
+            'escalation': bool(before[i] < snapshot.status[i]) or bool(sensor_raised[i]),
+            'overall_health': float(snapshot.overall_health[i]),
+            'pred_rul': int(snapshot.pred_rul[i]),
+            'new_critical_sensors': names[new_critical[i]].tolist(),
+        })
+    return alerts
+
+
+class FleetWatcher:
+    """Re-scores a fleet source in the background and records status-transition alerts"""
+
+    def __init__(self, source, model, processor, seq_length=50, interval=30.0, cpu_share=0.25,
+                 log_path=DEFAULT_ALERT_LOG, feed_size=200, on_scan=None):
+        self.source = source
+        self.model = model
+        self.processor = processor
+        self.seq_length = seq_length
+        self.interval = interval
+        self.cpu_share = cpu_share
+        self.log_path = log_path
+        # Called as on_scan(watcher, alerts) after every scoring run
+        self.on_scan = on_scan
+
+        self.snapshot = None
+        self.data_version = None
+        self.last_report = None
+        self.last_run = None
+        self.last_error = None
+        self.runs = 0
+
+        self._feed = collections.deque(maxlen=feed_size)
+        self._lock = threading.Lock()
+        self._static_version = None if isinstance(source, HistoryStore) else dataset_version(source)
+        self._loop = None
+        self._wakeup = None
+        self._stopped = False
+        self._thread = None
+
+    # ------------------------------- Scoring -------------------------------
+
+    def _source_version(self):
+        return self.source.version() if self._static_version is None else self._static_version
+
+    def scan(self, version=None):
+        """Re-score changed engines once and record alerts; returns the new alerts"""
+        version = version or self._source_version()
+        snapshot, report = rescore_fleet_health(self.source, self.model, self.processor, self.seq_length,
+                                                self.snapshot)
+        alerts = fleet_alerts(self.snapshot, snapshot)
+
+        if alerts and self.log_path:
+            with open(self.log_path, "a") as f:
+                f.writelines(json.dumps(alert) + "\n" for alert in alerts)
+        for alert in alerts:
+            FLEET_ALERTS.labels(alert['kind'], alert['to']).inc()
+
+        with self._lock:
+            self._feed.extend(alerts)
+            self.snapshot = snapshot
+            self.data_version = version
+            self.last_report = report
+            self.last_run = datetime.now()
+            self.last_error = None
+            self.runs += 1
+        WATCHER_RUNS.labels("scored").inc()
+        if self.on_scan is not None:
+            self.on_scan(self, alerts)
+        return alerts
+
+    def alerts(self, limit=None):
+        """Most recent alerts first"""
+        with self._lock:
+            feed = list(self._feed)[::-1]
+        return feed if limit is None else feed[:limit]
+
+    # ------------------------------- Scheduling -------------------------------
+
+    async def run(self):
+        """Watch until stop(): re-score on data change, then idle for the interval or a notify()"""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        executor = ThreadPoolExecutor(1, thread_name_prefix="fleet-watcher")
+        try:
+            while not self._stopped:
+                # A notify() from here on (even during the cooldown) triggers the next check
+                self._wakeup.clear()
+                cooldown = 0.0
+                try:
+                    version = await loop.run_in_executor(executor, self._source_version)
+                    if version != self.data_version:
+                        start = time.perf_counter()
+                        await loop.run_in_executor(executor, self.scan, version)
+                        busy = time.perf_counter() - start
+                        # busy / (busy + cooldown) <= cpu_share (wall time; see the module docstring)
+                        cooldown = busy * (1 - self.cpu_share) / self.cpu_share
+                    else:
+                        WATCHER_RUNS.labels("unchanged").inc()
+                except Exception as e:
+                    self.last_error = str(e)
+                    WATCHER_RUNS.labels("error").inc()
+
+                # notify() cannot cut the CPU cooldown short, only the rest of the interval
+                await asyncio.sleep(cooldown)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(0.0, self.interval - cooldown))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            executor.shutdown(wait=False)
+
+    def notify(self):
+        """Check for new data now instead of at the next interval (thread-safe)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def start(self):
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name="fleet-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopped = True
+        self.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def start_fleet_watcher(source, model, processor, interval=None, log_path=None):
+    """Process-wide FleetWatcher on a daemon thread (started once).
+
+    `interval` defaults to $SMARTMACH_WATCH_INTERVAL and the log to
+    $SMARTMACH_ALERT_LOG (alerts.jsonl); returns None when no interval is set.
+    """
+    global _watcher
+    with _watcher_lock:
+        if _watcher is not None:
+            return _watcher
+
+        interval = interval if interval is not None else os.environ.get(WATCH_INTERVAL_ENV)
+        if interval in (None, "") or source is None or model is None:
+            return None
+        log_path = log_path or os.environ.get(ALERT_LOG_ENV, DEFAULT_ALERT_LOG)
+        _watcher = FleetWatcher(source, model, processor, interval=float(interval), log_path=log_path).start()
+        return _watcher
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=None, help="history store to watch (default: data/test_data.csv, static)")
+    parser.add_argument("--model", default="model/model.h5")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between data checks")
+    parser.add_argument("--cpu-share", type=float, default=0.25, help="max share of wall time spent scoring")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="TensorFlow intra-/inter-op threads (0: TensorFlow default, all cores)")
+    parser.add_argument("--log", default=DEFAULT_ALERT_LOG, help="append-only JSON lines alert log")
+    args = parser.parse_args()
+
+    if args.threads:
+        # Must be set before TensorFlow runs its first op (importing it is fine)
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(args.threads)
+        tf.config.threading.set_inter_op_parallelism_threads(args.threads)
+
+    from preprocess import load_data, scale_data, load_model, compact_frame
+    from sensor_config import SensorRegistry
+    model = load_model(args.model)
+    if model is None:
+        raise SystemExit(f"Could not load the model from {args.model}")
+    if args.db:
+        source = HistoryStore(args.db)
+    else:
+        _, test_df = scale_data(*load_data())
+        source = compact_frame(test_df)
+    processor = SensorRegistry()
+
+    def print_scan(watcher, alerts):
+        report = watcher.last_report
+        print(f"[{watcher.last_run:%H:%M:%S}] {watcher.data_version}: {report['recomputed']} recomputed, "
+              f"{report['reused']} reused, {len(alerts)} alerts")
+        for alert in alerts:
+            print(f"  engine {alert['engine_id']}: {alert['from']} -> {alert['to']} "
+                  f"(health {alert['overall_health']}%, RUL {alert['pred_rul']})")
+
+    watcher = FleetWatcher(source, model, processor, interval=args.interval, cpu_share=args.cpu_share,
+                           log_path=args.log, on_scan=print_scan)
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        pass
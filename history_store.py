@@ -0,0 +1,219 @@
+"""Indexed local history store (SQLite) for per-engine time-range queries.
+
+Cycles are kept in one table clustered on (unit_number, time_in_cycles), so
+"engine X, cycles A..B" and "last N cycles of every engine" are index range
+scans instead of DataFrame scans. Values are stored scaled, exactly as the
+dashboard's test_df holds them.
+
+A HistoryStore can be passed wherever per-engine features take `test_df`
+(predict_engine_health, predict_fleet_health, graph, trend forecasting,
+root cause analysis); they read through `engine_history()`. The dashboard
+opens one when SMARTMACH_HISTORY_DB is set.
+
+Usage (from the repository root):
+    python history_store.py import --db history.db --csv data/test_data.csv
+    python history_store.py info --db history.db
+    SMARTMACH_HISTORY_DB=history.db streamlit run app.py
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+HISTORY_DB_ENV = "SMARTMACH_HISTORY_DB"
+INTEGER_COLUMNS = ('unit_number', 'time_in_cycles', 'RUL')
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class HistoryStore:
+    """SQLite-backed sensor history with (unit_number, time_in_cycles) range queries"""
+
+    def __init__(self, path):
+        self.path = path
+        # Streamlit sessions share one store from different threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._load_columns()
+
+    def _load_columns(self):
+        rows = self._query("PRAGMA table_info(cycles)")
+        self.columns = [row[1] for row in rows]
+        self.feature_cols = [c for c in self.columns if c not in INTEGER_COLUMNS]
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _create(self, columns):
+        definitions = ", ".join(
+            f"{_quote(c)} {'INTEGER' if c in INTEGER_COLUMNS else 'REAL'} NOT NULL" for c in columns
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS cycles ({definitions}, "
+                f"PRIMARY KEY (unit_number, time_in_cycles)) WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS engines (unit_number INTEGER PRIMARY KEY, "
+                "last_cycle INTEGER NOT NULL, n_cycles INTEGER NOT NULL)"
+            )
+        self._load_columns()
+
+    # ------------------------------- Writes -------------------------------
+
+    def insert_frame(self, df):
+        """Bulk insert (or overwrite) rows of a frame laid out like test_df; returns rows written"""
+        if not self.columns:
+            self._create(list(df.columns))
+        missing = set(self.columns) - set(df.columns)
+        if missing:
+            raise ValueError(f"Frame is missing columns {sorted(missing)}")
+
+        # Python scalars: sqlite3 rejects numpy integers
+        rows = zip(*(df[c].tolist() for c in self.columns))
+        placeholders = ", ".join("?" * len(self.columns))
+        engine_ids = [(e, e) for e in np.unique(df['unit_number'].values).tolist()]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO cycles ({', '.join(map(_quote, self.columns))}) VALUES ({placeholders})",
+                rows
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO engines (unit_number, last_cycle, n_cycles) "
+                "SELECT ?, MAX(time_in_cycles), COUNT(*) FROM cycles WHERE unit_number = ?",
+                engine_ids
+            )
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('version', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+        return len(df)
+
+    # ------------------------------- Reads -------------------------------
+
+    def version(self):
+        """Counter bumped by every insert, used to key cached results"""
+        rows = self._query("SELECT value FROM meta WHERE key = 'version'")
+        return f"db:{rows[0][0] if rows else 0}"
+
+    def engine_ids(self):
+        if not self.columns:
+            return np.zeros(0, dtype=np.int64)
+        return np.array([row[0] for row in self._query("SELECT unit_number FROM engines ORDER BY unit_number")],
+                        dtype=np.int64)
+
+    def _frame(self, rows):
+        df = pd.DataFrame(rows, columns=self.columns)
+        for col in INTEGER_COLUMNS:
+            df[col] = df[col].astype(np.int64)
+        return df
+
+    def engine_range(self, engine_id, start=None, end=None):
+        """Rows of one engine with start <= time_in_cycles <= end (either bound optional)"""
+        if not self.columns:
+            return pd.DataFrame()
+        start = -2 ** 62 if start is None else int(start)
+        end = 2 ** 62 if end is None else int(end)
+        return self._frame(self._query(
+            "SELECT * FROM cycles WHERE unit_number = ? AND time_in_cycles BETWEEN ? AND ? "
+            "ORDER BY time_in_cycles", (int(engine_id), start, end)
+        ))
+
+    def last_cycles(self, n, engine_ids=None, min_cycles=0):
+        """Last `n` cycles of every engine (or of `engine_ids`) with at least `min_cycles` cycles"""
+        if not self.columns:
+            return pd.DataFrame()
+        sql = (
+            "SELECT c.* FROM engines e JOIN cycles c ON c.unit_number = e.unit_number AND c.time_in_cycles >= "
+            "COALESCE((SELECT time_in_cycles FROM cycles WHERE unit_number = e.unit_number "
+            "ORDER BY time_in_cycles DESC LIMIT 1 OFFSET ?), -1) "
+            "WHERE e.n_cycles >= ?"
+        )
+        params = [int(n) - 1, int(min_cycles)]
+        if engine_ids is not None:
+            sql += " AND e.unit_number IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps([int(e) for e in engine_ids]))
+        return self._frame(self._query(sql + " ORDER BY c.unit_number, c.time_in_cycles", params))
+
+    def engine_history(self, engine_id, last_n=None):
+        """One engine's rows in cycle order, optionally only the last `last_n`"""
+        if last_n is None:
+            return self.engine_range(engine_id)
+        return self.last_cycles(last_n, [engine_id])
+
+    def fetch_windows(self, seq_length=50, engine_ids=None):
+        """Last `seq_length` cycles of each engine as model input, like extract_fleet_windows
+
+        Returns (engine_ids, actual_rul, X, feature_cols) with X float32 shaped
+        (engines, seq_length, features).
+        """
+        rows = self.last_cycles(seq_length, engine_ids, min_cycles=seq_length)
+        n_engines = len(rows) // seq_length
+        X = rows[self.feature_cols].to_numpy(dtype=np.float32).reshape(n_engines, seq_length, len(self.feature_cols))
+        return (rows['unit_number'].values[::seq_length], rows['RUL'].values[seq_length - 1::seq_length],
+                X, self.feature_cols)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def engine_history(source, engine_id, last_n=None):
+    """Rows of one engine from a DataFrame or a HistoryStore, in cycle order"""
+    if isinstance(source, HistoryStore):
+        return source.engine_history(engine_id, last_n)
+    engine_data = source[source['unit_number'] == engine_id]
+    return engine_data if last_n is None else engine_data.tail(last_n)
+
+
+def engine_ids(source):
+    """Sorted engine IDs of a DataFrame or a HistoryStore"""
+    if isinstance(source, HistoryStore):
+        return source.engine_ids()
+    return np.sort(source['unit_number'].unique()).astype(np.int64)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_history_store(path=None):
+    """Process-wide HistoryStore for `path` (default: $SMARTMACH_HISTORY_DB); None if unset"""
+    path = path or os.environ.get(HISTORY_DB_ENV)
+    if not path:
+        return None
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = HistoryStore(path)
+        return _stores[path]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["import", "info"])
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--csv", help="import: history CSV laid out like data/test_data.csv")
+    parser.add_argument("--train", default="data/train_data.csv", help="import: training CSV the scaler is fitted on")
+    parser.add_argument("--memory-mb", type=float, default=256, help="import: memory ceiling while streaming the CSV")
+    args = parser.parse_args()
+
+    store = HistoryStore(args.db)
+    if args.command == "import":
+        if not args.csv:
+            parser.error("import needs --csv")
+        from chunked_data import ChunkedHistory
+        history = ChunkedHistory.with_training_scaler(args.csv, args.train, args.memory_mb)
+        rows = sum(store.insert_frame(dataset.frame()) for dataset in history.chunks())
+        print(f"{rows} rows imported into {args.db}")
+    print(f"{args.db}: {len(store.engine_ids())} engines, version {store.version()}")
@@ -0,0 +1,241 @@
+"""Compiled and reduced-precision inference for the RUL model.
+
+CompiledPredictor calls the Keras model through one fixed-signature
+tf.function per batch-size bucket, padding each batch up to its bucket,
+so single windows, fleets and API micro-batches never retrace and skip
+`model.predict`'s per-call overhead. It is the default float32 path.
+
+`quantize_model(model, "int8")` converts the Keras LSTM to a TensorFlow Lite
+model with post-training dynamic-range quantization (int8 weights, float32
+activations); "float16" stores the weights as float16 instead. The result
+is a QuantizedPredictor whose `.predict(X, verbose=0)` matches Keras, so it
+can be passed anywhere the dashboard expects `model`.
+
+The dashboard picks the precision from SMARTMACH_PRECISION (float32 when
+unset). `python -m benchmarks.quantization` reports the accuracy delta
+against float32 and the throughput/memory of each mode.
+"""
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+PRECISION_ENV = "SMARTMACH_PRECISION"
+PRECISIONS = ("float32", "float16", "int8")
+# Batch sizes CompiledPredictor traces; larger batches run in chunks of the largest
+BUCKETS = (1, 8, 32, 128, 512, 2048)
+# Padding rows always accepted to save a call
+MIN_PADDING = 32
+
+
+def _interpreter_class():
+    # LiteRT replaces tf.lite.Interpreter in newer TensorFlow releases
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+def convert_model(model, precision="int8", batch_size=32):
+    """TFLite flatbuffer of a Keras model with weights quantized to `precision`.
+
+    The LSTM only converts with a static batch dimension, so the flatbuffer
+    takes exactly `batch_size` windows per call (QuantizedPredictor pads).
+    """
+    import tensorflow as tf
+    import keras
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+
+    input_shape = (batch_size,) + tuple(model.input_shape[1:])
+    archive = keras.export.ExportArchive()
+    archive.track(model)
+    archive.add_endpoint("serve", lambda x: model(x, training=False),
+                         input_signature=[tf.TensorSpec(input_shape, tf.float32)])
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        archive.write_out(export_dir, verbose=False)
+        converter = tf.lite.TFLiteConverter.from_saved_model(export_dir)
+        if precision != "float32":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if precision == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        return converter.convert()
+
+
+class QuantizedPredictor:
+    """Keras-compatible `predict` on top of a TFLite interpreter"""
+
+    def __init__(self, model_content, precision="int8", num_threads=None):
+        self.precision = precision
+        self.model_content = model_content
+        self._interpreter = _interpreter_class()(model_content=model_content, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self.batch_size = int(self._input['shape'][0])
+        self.input_shape = (None,) + tuple(int(d) for d in self._input['shape'][1:])
+        # One interpreter per predictor: Streamlit sessions run on separate threads
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_keras(cls, model, precision="int8", batch_size=32, num_threads=None):
+        return cls(convert_model(model, precision, batch_size), precision, num_threads)
+
+    @classmethod
+    def load(cls, path, precision="int8", num_threads=None):
+        with open(path, "rb") as f:
+            return cls(f.read(), precision, num_threads)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.model_content)
+
+    @property
+    def size_bytes(self):
+        return len(self.model_content)
+
+    def predict(self, X, verbose=0, batch_size=None):
+        """Predictions for windows shaped (n, seq_length, features), in fixed-size padded batches"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        expected = self.input_shape[1:]
+        if X.ndim != len(self.input_shape) or any(d is not None and d != x for d, x in zip(expected, X.shape[1:])):
+            raise ValueError(f"Expected windows shaped (n, {', '.join(map(str, expected))}), got {X.shape}")
+        n = len(X)
+        outputs = np.empty((n,) + tuple(self._output['shape'][1:]), dtype=np.float32)
+        batch = np.zeros((self.batch_size,) + X.shape[1:], dtype=np.float32)
+
+        with self._lock:
+            for start in range(0, n, self.batch_size):
+                rows = min(self.batch_size, n - start)
+                if rows == self.batch_size:
+                    chunk = X[start:start + rows]
+                else:
+                    batch[:rows] = X[start:start + rows]
+                    chunk = batch
+                self._interpreter.set_tensor(self._input['index'], chunk)
+                self._interpreter.invoke()
+                outputs[start:start + rows] = self._interpreter.get_tensor(self._output['index'])[:rows]
+        return outputs
+
+
+class CompiledPredictor:
+    """Keras-compatible `predict` through fixed-shape compiled functions.
+
+    Each bucket size gets its own tf.function with a fully static input
+    signature (XLA-compiled unless jit_compile=False or XLA is unavailable).
+    A batch is split into bucket-sized calls and the last one zero-padded,
+    so any batch size reuses one of len(buckets) traces.
+    """
+
+    precision = "float32"
+
+    def __init__(self, model, buckets=BUCKETS, jit_compile=True):
+        self.model = model
+        self.buckets = tuple(sorted(buckets))
+        self.input_shape = tuple(model.input_shape)
+        self.jit_compile = jit_compile
+        self._functions = {}
+        # Buckets whose function has traced and compiled successfully
+        self._compiled = set()
+        self._lock = threading.Lock()
+
+    def _build(self, bucket):
+        import tensorflow as tf
+        spec = tf.TensorSpec((bucket,) + self.input_shape[1:], tf.float32)
+        return tf.function(lambda x: self.model(x, training=False), input_signature=[spec],
+                           jit_compile=self.jit_compile)
+
+    def _function(self, bucket):
+        with self._lock:
+            if bucket not in self._functions:
+                self._functions[bucket] = self._build(bucket)
+            return self._functions[bucket]
+
+    def bucket_for(self, n):
+        """Bucket for the next call on `n` remaining windows.
+
+        The smallest bucket holding all of them if the padding is at most
+        max(n, MIN_PADDING) windows, otherwise the largest bucket that is
+        filled completely. Small calls are dominated by per-call overhead,
+        large ones by compute.
+        """
+        for bucket in self.buckets:
+            if n <= bucket:
+                if bucket - n <= max(n, MIN_PADDING):
+                    return bucket
+                break
+        return max([b for b in self.buckets if b <= n] or [self.buckets[0]])
+
+    def _call(self, bucket, X):
+        import tensorflow as tf
+        compiling = self.jit_compile and bucket not in self._compiled
+        try:
+            outputs = self._function(bucket)(X).numpy()
+        except (tf.errors.InvalidArgumentError, tf.errors.UnimplementedError):
+            # Only a bucket's first (tracing + XLA compiling) call can mean "no XLA for this
+            # platform/op set"; anything else, or any later error, is the caller's problem
+            if not compiling:
+                raise
+            with self._lock:
+                self.jit_compile = False
+                self._functions.clear()
+                self._compiled.clear()
+            outputs = self._function(bucket)(X).numpy()
+        self._compiled.add(bucket)
+        return outputs
+
+    def predict(self, X, verbose=0, batch_size=None):
+        """Predictions for windows shaped (n, seq_length, features), padded to bucket sizes"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        expected = self.input_shape[1:]
+        if X.ndim != len(self.input_shape) or any(d is not None and d != x for d, x in zip(expected, X.shape[1:])):
+            raise ValueError(f"Expected windows shaped (n, {', '.join(map(str, expected))}), got {X.shape}")
+        n = len(X)
+        outputs = []
+        start = 0
+        while start < n:
+            bucket = self.bucket_for(n - start)
+            rows = min(n - start, bucket)
+            chunk = X[start:start + rows]
+            if rows < bucket:
+                chunk = np.concatenate([chunk, np.zeros((bucket - rows,) + X.shape[1:], dtype=np.float32)])
+            outputs.append(self._call(bucket, chunk)[:rows])
+            start += rows
+        if not outputs:
+            return np.zeros((0,) + tuple(self.model.output_shape[1:]), dtype=np.float32)
+        return np.concatenate(outputs)
+
+    def warm(self):
+        """Trace (and compile) every bucket now rather than on first use
+
+        This is also where a missing XLA shows up, so the plain-graph
+        fallback is decided before any request is served.
+        """
+        for bucket in self.buckets:
+            self.predict(np.zeros((bucket,) + self.input_shape[1:], dtype=np.float32))
+
+    @property
+    def tracing_count(self):
+        """Traces so far across all buckets (stays at len(buckets) once warm)"""
+        return sum(f.experimental_get_tracing_count() for f in self._functions.values())
+
+
+def quantize_model(model, precision=None, batch_size=32, compiled=True):
+    """`model` at the requested precision (default: $SMARTMACH_PRECISION, else float32).
+
+    float32 returns a CompiledPredictor over the Keras model (or the model
+    itself with compiled=False).
+    """
+    precision = precision or os.environ.get(PRECISION_ENV) or "float32"
+    if precision not in PRECISIONS:
+        raise ValueError(f"{PRECISION_ENV} must be one of {PRECISIONS}, got {precision!r}")
+    if model is None:
+        return model
+    if precision == "float32":
+        return CompiledPredictor(model) if compiled else model
+    return QuantizedPredictor.from_keras(model, precision, batch_size)
@@ -0,0 +1,375 @@
+"""Prometheus-format metrics for the dashboard (stdlib only).
+
+Counters, gauges and latency histograms live in one process-wide registry
+and are updated by the model loader, engine/fleet prediction, the cost
+optimizer, root cause analysis, report generation, the result caches, the
+fleet watcher and the scoring API (api_server.py, which also serves them on
+/metrics).
+`start_metrics_server()` serves them as Prometheus text exposition from a
+daemon thread; app.py starts it when SMARTMACH_METRICS_PORT is set.
+
+    SMARTMACH_METRICS_PORT=9108 streamlit run app.py
+    curl http://127.0.0.1:9108/metrics
+"""
+import os
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT_ENV = "SMARTMACH_METRICS_PORT"
+METRICS_ADDR_ENV = "SMARTMACH_METRICS_ADDR"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ------------------------------- Metric types -------------------------------
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+
+    def labels(self, *values, **kwargs):
+        """Child metric for one label combination"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        with self._lock:
+            child = self._children.get(values)
+            if child is None:
+                child = self._children[values] = self._new_child()
+        return child
+
+    def _default(self):
+        # Unlabelled metrics update their single child directly
+        return self.labels()
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            lines.extend(child.samples(self.name, self.labelnames, values))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._value += amount
+
+    def samples(self, name, labelnames, values):
+        return [f"{name}_total{_format_labels(labelnames, values)} {_format_value(self._value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+        self._function = None
+
+    def set(self, value):
+        with self._lock:
+            self._value = float(value)
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """Read the value from `function()` at scrape time"""
+        self._function = function
+
+    def samples(self, name, labelnames, values):
+        value = self._function() if self._function else self._value
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(value)}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+    def set_function(self, function):
+        self._default().set_function(function)
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * len(buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self._buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self, name, labelnames, values):
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        lines, cumulative = [], 0
+        for bound, n in zip(self._buckets, counts):
+            cumulative += n
+            labels = _format_labels(labelnames, values, [("le", _format_value(bound))])
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, values)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, values)} {count}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+
+class Registry:
+    """Named collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def exposition(self):
+        """All metrics in Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+# ------------------------------- Application metrics -------------------------------
+
+REGISTRY = Registry()
+
+MODEL_LOADS = REGISTRY.counter(
+    "smartmach_model_loads", "Model load attempts", ["result"])
+MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "smartmach_model_load_seconds", "Time spent loading the RUL model")
+PREDICTION_SECONDS = REGISTRY.histogram(
+    "smartmach_prediction_seconds", "RUL prediction latency (window extraction, model.predict, health scoring)",
+    ["path"])
+ENGINES_SCORED = REGISTRY.counter(
+    "smartmach_engines_scored", "Engines scored by the RUL model", ["path"])
+ENGINES_REUSED = REGISTRY.counter(
+    "smartmach_engines_reused", "Engines whose previous score was reused because their data had not changed",
+    ["path"])
+COST_PREDICTION_SECONDS = REGISTRY.histogram(
+    "smartmach_cost_prediction_seconds", "Cost model latency per optimizer run", ["mode"])
+COST_SCENARIOS = REGISTRY.counter(
+    "smartmach_cost_scenarios", "Maintenance scenarios costed", ["mode"])
+ROOT_CAUSE_SECONDS = REGISTRY.histogram(
+    "smartmach_root_cause_seconds", "Root cause analysis latency (model, SHAP and charts)")
+REPORT_SECONDS = REGISTRY.histogram(
+    "smartmach_report_seconds", "Report generation latency", ["kind"])
+REPORT_FAILURES = REGISTRY.counter(
+    "smartmach_report_failures", "Report generation errors", ["kind"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "smartmach_cache_requests", "Result cache lookups", ["cache", "result"])
+QUEUE_DEPTH = REGISTRY.gauge(
+    "smartmach_queue_depth", "Work items submitted but not finished", ["queue"])
+FLEET_ALERTS = REGISTRY.counter(
+    "smartmach_fleet_alerts", "Alerts raised by the background fleet watcher", ["kind", "status"])
+WATCHER_RUNS = REGISTRY.counter(
+    "smartmach_watcher_runs", "Fleet watcher data checks", ["result"])
+API_REQUESTS = REGISTRY.counter(
+    "smartmach_api_requests", "Scoring API requests", ["route", "status"])
+API_REQUEST_SECONDS = REGISTRY.histogram(
+    "smartmach_api_request_seconds", "Scoring API request latency", ["route"])
+API_BATCH_ROWS = REGISTRY.histogram(
+    "smartmach_api_batch_rows", "Windows per micro-batched model call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096))
+RESIDENT_MEMORY = REGISTRY.gauge(
+    "smartmach_process_resident_memory_bytes", "Resident memory of the dashboard process")
+PEAK_RESIDENT_MEMORY = REGISTRY.gauge(
+    "smartmach_process_peak_resident_memory_bytes", "Peak resident memory of the dashboard process")
+
+
+def record_cache(cache, hit):
+    """Count one cache lookup as a hit or miss"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def resident_memory_bytes():
+    """Current resident memory of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return peak_resident_memory_bytes()
+
+
+def peak_resident_memory_bytes():
+    """Peak resident memory of this process so far"""
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+RESIDENT_MEMORY.set_function(resident_memory_bytes)
+PEAK_RESIDENT_MEMORY.set_function(peak_resident_memory_bytes)
+
+
+# ------------------------------- HTTP server -------------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.exposition().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the Streamlit log
+        pass
+
+
+_server = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, addr=None):
+    """Serve REGISTRY on http://addr:port/metrics from a daemon thread (once per process).
+
+    Defaults come from SMARTMACH_METRICS_PORT / SMARTMACH_METRICS_ADDR; returns
+    None (and starts nothing) when no port is configured, or when the port could
+    not be bound: that is warned about once and not retried on later reruns.
+    """
+    global _server, _server_failed
+    with _server_lock:
+        if _server is not None or _server_failed:
+            return _server
+
+        port = port if port is not None else os.environ.get(METRICS_PORT_ENV)
+        if port in (None, ""):
+            return None
+        addr = addr or os.environ.get(METRICS_ADDR_ENV, "127.0.0.1")
+
+        try:
+            _server = ThreadingHTTPServer((addr, int(port)), _MetricsHandler)
+        except OSError as e:
+            _server_failed = True
+            warnings.warn(f"Metrics server not started on {addr}:{port}: {e}", RuntimeWarning)
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
+
+        port = port if port is not None else os.environ.get(METRICS_PORT_ENV)
+        if port in (None, ""):
+            return None
+        addr = addr or os.environ.get(METRICS_ADDR_ENV, "127.0.0.1")
+
+        _server = ThreadingHTTPServer((addr, int(port)), _MetricsHandler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
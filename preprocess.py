@@ -1,7 +1,12 @@
+import hashlib
+import time
+import weakref
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 import streamlit as st
+from metrics import MODEL_LOADS, MODEL_LOAD_SECONDS
 
 # Register custom metrics at top level (outside functions)
 try:
@@ -28,8 +33,124 @@ def load_data():
         st.info("Please make sure data files exist in the data/ folder")
         return None, None
 
+def dataset_version(df):
+    """Short content fingerprint of a DataFrame, used to key cached results"""
+    if df is None:
+        return None
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:16]
+
+
+def session_cache(name, data_version):
+    """OrderedDict in st.session_state[name] holding only entries of `data_version`
+
+    Keys are tuples starting with the data version; entries of older
+    versions are dropped as soon as another version is asked for.
+    """
+    cache = st.session_state.get(name)
+    if not isinstance(cache, OrderedDict):
+        cache = st.session_state[name] = OrderedDict()
+    for key in [k for k in cache if k[0] != data_version]:
+        del cache[key]
+    return cache
+
+# ------------------------------- Compact representation -------------------------------
+ID_COLUMNS = ['unit_number', 'time_in_cycles', 'RUL']
+
+# id(frame) -> CompactDataset for frames built by CompactDataset.frame()
+_compact_frames = {}
+
+
+class CompactDataset:
+    """Sensor history as contiguous arrays.
+
+    Rows are grouped by engine. `features` is one C-contiguous float32
+    matrix in model column order (every column except unit_number,
+    time_in_cycles and RUL), so an engine's last window is a zero-copy slice.
+    Engine IDs, cycles and RUL are int32.
+    """
+
+    def __init__(self, unit_number, cycles, rul, features, feature_cols, columns=None):
+        self.unit_number = np.asarray(unit_number, dtype=np.int32)
+        self.cycles = np.asarray(cycles, dtype=np.int32)
+        self.rul = np.asarray(rul, dtype=np.int32)
+        self.features = np.ascontiguousarray(features, dtype=np.float32)
+        self.feature_cols = list(feature_cols)
+        self.columns = list(columns) if columns is not None else ID_COLUMNS + self.feature_cols
+
+        # Engine boundaries: rows ends[i] - counts[i] .. ends[i] belong to engine_ids[i]
+        change = np.flatnonzero(np.diff(self.unit_number)) + 1
+        starts = np.concatenate([[0], change]) if len(self.unit_number) else np.zeros(0, dtype=np.int64)
+        self.engine_ids = self.unit_number[starts].astype(np.int64)
+        self.ends = np.append(starts[1:], len(self.unit_number)).astype(np.int64)
+        self.counts = self.ends - starts
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a (scaled) DataFrame laid out like data/test_data.csv"""
+        feature_cols = [c for c in df.columns if c not in ID_COLUMNS]
+        order = slice(None)
+        if not df['unit_number'].is_monotonic_increasing:
+            order = np.argsort(df['unit_number'].values, kind='stable')
+        return cls(
+            df['unit_number'].values[order], df['time_in_cycles'].values[order], df['RUL'].values[order],
+            df[feature_cols].to_numpy(dtype=np.float32)[order], feature_cols, df.columns
+        )
+
+    @classmethod
+    def of(cls, df):
+        """The CompactDataset behind a frame returned by `frame()`, else None"""
+        return _compact_frames.get(id(df))
+
+    def __len__(self):
+        return len(self.unit_number)
+
+    @property
+    def nbytes(self):
+        return self.features.nbytes + self.unit_number.nbytes + self.cycles.nbytes + self.rul.nbytes
+
+    def frame(self):
+        """DataFrame view for the dashboard features; the float32 columns share `features`"""
+        df = pd.DataFrame(self.features, columns=self.feature_cols, copy=False)
+        id_values = {'unit_number': self.unit_number, 'time_in_cycles': self.cycles, 'RUL': self.rul}
+        for i, col in enumerate(self.columns):
+            if col in id_values:
+                df.insert(i, col, id_values[col])
+        _compact_frames[id(df)] = self
+        weakref.finalize(df, _compact_frames.pop, id(df), None)
+        return df
+
+    def engine_index(self, engine_id):
+        i = np.searchsorted(self.engine_ids, engine_id)
+        if i < len(self.engine_ids) and self.engine_ids[i] == engine_id:
+            return int(i)
+        return None
+
+    def window(self, engine_id, seq_length=50):
+        """(features view shaped (seq_length, features), actual RUL) of an engine's last cycles, or None"""
+        i = self.engine_index(engine_id)
+        if i is None or self.counts[i] < seq_length:
+            return None
+        end = self.ends[i]
+        return self.features[end - seq_length:end], int(self.rul[end - 1])
+
+    def last_windows(self, seq_length=50):
+        """Last `seq_length` cycles of every engine that has them, like extract_fleet_windows"""
+        eligible = self.counts >= seq_length
+        ends = self.ends[eligible]
+        rows = ends[:, None] - seq_length + np.arange(seq_length)
+        return self.engine_ids[eligible], self.rul[ends - 1].astype(np.int64), self.features[rows], self.feature_cols
+
+
+def compact_frame(df):
+    """float32/int32 copy of `df` backed by a CompactDataset (about half the memory)"""
+    if df is None:
+        return None
+    return CompactDataset.from_frame(df).frame()
+
 def load_model(model_path):
     """Load the trained LSTM model with custom objects"""
+    start = time.perf_counter()
     try:
         from tensorflow.keras.models import load_model as keras_load_model
         import tensorflow as tf
@@ -45,9 +166,12 @@ def load_model(model_path):
             
         custom_objects = {'mse': mse, 'mae': mae}
         model = keras_load_model(model_path, custom_objects=custom_objects)
+        MODEL_LOAD_SECONDS.observe(time.perf_counter() - start)
+        MODEL_LOADS.labels("success").inc()
         st.success("✅ TensorFlow model loaded successfully!")
         return model
     except Exception as e:
+        MODEL_LOADS.labels("failure").inc()
         st.error(f"❌ TensorFlow model loading failed: {str(e)}")
         st.info("Running in demo mode with simulated predictions")
         return None
@@ -0,0 +1,121 @@
+"""Sensor thresholds, display names and realistic value ranges shared by the app and tools"""
+import numpy as np
+
+# -----------------------------------------Sensor to Readable Name mapping------------
+sensor_thresholds = {
+    'sensor_2': (0.1, 0.9), 'sensor_3': (0.1, 0.8), 'sensor_4': (0.2, 0.7),
+    'sensor_6': (0.1, 0.85), 'sensor_7': (0.05, 0.8), 'sensor_8': (0.05, 0.8),
+    'sensor_9': (0.05, 0.8), 'sensor_11': (0.1, 0.9), 'sensor_12': (0.1, 0.85),
+    'sensor_13': (0.1, 0.9), 'sensor_14': (0.1, 0.9), 'sensor_15': (0.1, 0.9),
+    'sensor_17': (0.1, 0.85), 'sensor_20': (0.1, 0.9), 'sensor_21': (0.1, 0.9)
+}
+
+sensor_mapping = {
+    'sensor_2': 'Temperature', 'sensor_3': 'Pressure', 'sensor_4': 'RPM',
+    'sensor_6': 'Fuel Flow', 'sensor_7': 'Vibration X', 'sensor_8': 'Vibration Y',
+    'sensor_9': 'Vibration Z', 'sensor_11': 'Oil Temp', 'sensor_12': 'Oil Pressure',
+    'sensor_13': 'Exhaust Temp', 'sensor_14': 'Compressor Temp', 'sensor_15': 'Fan Speed',
+    'sensor_17': 'Throttle Position', 'sensor_20': 'Fuel Temp', 'sensor_21': 'Engine Load'
+}
+
+# Realistic value mapping for display
+realistic_value_mapper = {
+    'Temperature': {'unit': '°C', 'min': 20, 'max': 120},
+    'Pressure': {'unit': 'PSI', 'min': 0, 'max': 100},
+    'RPM': {'unit': 'RPM', 'min': 0, 'max': 3000},
+    'Fuel Flow': {'unit': 'L/min', 'min': 0, 'max': 50},
+    'Vibration X': {'unit': 'mm/s', 'min': 0, 'max': 10},
+    'Vibration Y': {'unit': 'mm/s', 'min': 0, 'max': 10},
+    'Vibration Z': {'unit': 'mm/s', 'min': 0, 'max': 10},
+    'Oil Temp': {'unit': '°C', 'min': 60, 'max': 120},
+    'Oil Pressure': {'unit': 'PSI', 'min': 20, 'max': 80},
+    'Exhaust Temp': {'unit': '°C', 'min': 300, 'max': 600},
+    'Compressor Temp': {'unit': '°C', 'min': 100, 'max': 300},
+    'Fan Speed': {'unit': 'RPM', 'min': 0, 'max': 2000},
+    'Throttle Position': {'unit': '%', 'min': 0, 'max': 100},
+    'Fuel Temp': {'unit': '°C', 'min': 15, 'max': 50},
+    'Engine Load': {'unit': '%', 'min': 0, 'max': 100}
+}
+# ---------------------------------Array-backed sensor registry -----------------------
+class SensorRegistry:
+    """Sensor thresholds, display names and realistic ranges as aligned arrays.
+
+    Position i in `keys`, `names`, `low`, `high`, `vmin`, `vmax` and `units`
+    describes one sensor (in `mapping` order); sensors without thresholds or
+    a realistic range hold NaN there. Lookups by column key or display name
+    are O(1) and to_realistic() converts whole arrays at once. The dicts the
+    registry was built from stay available as sensor_thresholds,
+    sensor_mapping and realistic_mapper.
+    """
+
+    def __init__(self, thresholds=sensor_thresholds, mapping=sensor_mapping, realistic_mapper=realistic_value_mapper):
+        self.sensor_thresholds = thresholds
+        self.sensor_mapping = mapping
+        self.realistic_mapper = realistic_mapper
+
+        self.keys = list(mapping)
+        self.names = [mapping[k] for k in self.keys]
+        self.key_index = {k: i for i, k in enumerate(self.keys)}
+        self.name_index = {n: i for i, n in enumerate(self.names)}
+
+        self.low = np.array([thresholds.get(k, (np.nan, np.nan))[0] for k in self.keys], dtype=np.float64)
+        self.high = np.array([thresholds.get(k, (np.nan, np.nan))[1] for k in self.keys], dtype=np.float64)
+        ranges = [realistic_mapper.get(n) for n in self.names]
+        self.vmin = np.array([r['min'] if r else np.nan for r in ranges], dtype=np.float64)
+        self.vmax = np.array([r['max'] if r else np.nan for r in ranges], dtype=np.float64)
+        self.units = [r['unit'] if r else "" for r in ranges]
+
+        self.monitored = ~np.isnan(self.low)
+        self.has_range = ~np.isnan(self.vmin)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def index(self, sensor):
+        """Position of a sensor given its column key or display name (KeyError if unknown)"""
+        i = self.key_index.get(sensor)
+        return self.name_index[sensor] if i is None else i
+
+    def key_for(self, name):
+        """Column key of a display name, or None"""
+        i = self.name_index.get(name)
+        return None if i is None else self.keys[i]
+
+    def thresholds(self, sensor):
+        """(low, high) scaled thresholds of one sensor"""
+        i = self.index(sensor)
+        return self.low[i], self.high[i]
+
+    def to_realistic(self, values, sensor, decimals=2):
+        """Scaled values (any shape) of one sensor in realistic units, as (array, unit).
+
+        Sensors without a realistic range are returned unchanged with unit "".
+        """
+        i = self.index(sensor)
+        values = np.asarray(values, dtype=np.float64)
+        if not self.has_range[i]:
+            return values, ""
+        realistic = values * (self.vmax[i] - self.vmin[i]) + self.vmin[i]
+        return (realistic if decimals is None else np.round(realistic, decimals)), self.units[i]
+
+    def to_realistic_matrix(self, values, indices=None, decimals=2):
+        """Scaled values shaped (..., sensors) in realistic units, sensors given by `indices` (default all)"""
+        indices = np.arange(len(self.keys)) if indices is None else np.asarray(indices)
+        values = np.asarray(values, dtype=np.float64)
+        vmin, vmax = self.vmin[indices], self.vmax[indices]
+        realistic = values * (vmax - vmin) + vmin
+        if decimals is not None:
+            realistic = np.round(realistic, decimals)
+        return np.where(self.has_range[indices], realistic, values)
+
+    def get_realistic_value(self, sensor_name, scaled_value):
+        """Convert one scaled value (0-1) to its realistic industrial value and unit"""
+        i = self.name_index.get(sensor_name)
+        if i is None or not self.has_range[i]:
+            return scaled_value, ""
+        realistic_value = scaled_value * (self.vmax[i] - self.vmin[i]) + self.vmin[i]
+        return round(float(realistic_value), 2), self.units[i]
+
+
+# Former name, kept for scripts that build the processor themselves
+DummyProcessor = SensorRegistry
@@ -0,0 +1,161 @@
+"""Synthetic C-MAPSS-style fleet generator for scale and load testing.
+
+Produces train (run-to-failure) and test (truncated) datasets with the same
+schema as data/train_data.csv. Sensor baselines, noise and end-of-life drift
+are taken from the bundled training data. Output is generated and written
+chunk by chunk, so multi-million-row datasets fit in laptop memory.
+
+Usage (from the repository root):
+    python synthetic_fleet.py --out data/synthetic --train-engines 5000 --test-engines 5000
+    python synthetic_fleet.py --out data/synthetic --test-engines 50000 --train-engines 0 --history 60
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+SENSORS = ['sensor_2', 'sensor_3', 'sensor_4', 'sensor_6', 'sensor_7', 'sensor_8', 'sensor_9',
+           'sensor_11', 'sensor_12', 'sensor_13', 'sensor_14', 'sensor_15', 'sensor_17',
+           'sensor_20', 'sensor_21']
+COLUMNS = ['unit_number', 'time_in_cycles'] + SENSORS + ['RUL', 'time_laps']
+
+# Per sensor: healthy baseline, end-of-life drift, cycle-to-cycle noise (std),
+# engine-to-engine offset (std) and output decimals, measured on data/train_data.csv
+SENSOR_PROFILES = {
+    'sensor_2':  (642.3808, 1.2892, 0.2967, 0.2437, 2),
+    'sensor_3':  (1586.8398, 15.4492, 3.8702, 2.4683, 2),
+    'sensor_4':  (1402.7583, 26.1684, 3.8959, 4.5006, 2),
+    'sensor_6':  (21.6095, 0.0005, 0.0020, 0.0008, 2),
+    'sensor_7':  (553.9506, -2.4558, 0.3962, 0.4838, 2),
+    'sensor_8':  (2388.0584, 0.1738, 0.0305, 0.0465, 2),
+    'sensor_9':  (9056.0069, 41.9851, 4.0696, 7.3275, 2),
+    'sensor_11': (47.3525, 0.7897, 0.0991, 0.1495, 2),
+    'sensor_12': (521.9099, -2.1007, 0.2954, 0.4145, 2),
+    'sensor_13': (2388.0557, 0.1778, 0.0287, 0.0469, 2),
+    'sensor_14': (8137.3729, 29.4936, 3.0162, 7.3040, 2),
+    'sensor_15': (8.4183, 0.1021, 0.0199, 0.0177, 4),
+    'sensor_17': (392.2605, 3.9795, 0.9032, 0.7102, 0),
+    'sensor_20': (38.9328, -0.4868, 0.0967, 0.0872, 2),
+    'sensor_21': (23.3601, -0.2901, 0.0606, 0.0522, 4),
+}
+
+# Failure mode -> (degradation curve exponent, drift weight per sensor).
+# Drift follows (cycle / life) ** exponent: ~3 matches the bundled data.
+FAN_SENSORS = {'sensor_2', 'sensor_8', 'sensor_13', 'sensor_15'}
+FAILURE_MODES = {
+    'hpc_degradation': (3.0, {s: 1.0 for s in SENSORS}),
+    'fan_degradation': (3.0, {s: 1.5 if s in FAN_SENSORS else 0.6 for s in SENSORS}),
+    'sudden_failure': (8.0, {s: 1.2 for s in SENSORS}),
+}
+
+
+# ------------------------------- Generation -------------------------------
+
+def generate_fleet(n_engines, split="train", mean_life=206, life_std=46, min_life=128, noise=1.0,
+                   failure_modes=None, history_length=None, min_cycles=31, chunk_engines=1000,
+                   start_unit=1, seed=None):
+    """Yield DataFrame chunks of a synthetic fleet.
+
+    split='train' runs every engine to failure (last RUL is 0); split='test'
+    stops each engine partway through its life, like data/test_data.csv.
+    `failure_modes` is a list of FAILURE_MODES names or a {name: probability}
+    dict. `history_length` keeps only each engine's most recent cycles.
+    """
+    if split not in ("train", "test"):
+        raise ValueError(f"split must be 'train' or 'test', got {split!r}")
+
+    if failure_modes is None:
+        failure_modes = ['hpc_degradation']
+    if not isinstance(failure_modes, dict):
+        failure_modes = {mode: 1.0 for mode in failure_modes}
+    modes = list(failure_modes)
+    mode_probs = np.array([failure_modes[m] for m in modes], dtype=float)
+    mode_probs /= mode_probs.sum()
+
+    exponents = np.array([FAILURE_MODES[m][0] for m in modes])
+    weights = np.array([[FAILURE_MODES[m][1][s] for s in SENSORS] for m in modes])
+    baseline, drift, noise_std, offset_std, decimals = (np.array(v) for v in zip(*SENSOR_PROFILES.values()))
+
+    rng = np.random.default_rng(seed)
+    for chunk_start in range(0, n_engines, chunk_engines):
+        n = min(chunk_engines, n_engines - chunk_start)
+        unit_ids = np.arange(start_unit + chunk_start, start_unit + chunk_start + n)
+
+        lives = np.maximum(min_life, np.rint(rng.normal(mean_life, life_std, n))).astype(np.int64)
+        if split == "train":
+            last_cycle = lives
+        else:
+            observed = np.rint(lives * rng.uniform(0.1, 0.95, n)).astype(np.int64)
+            last_cycle = np.clip(observed, min(min_cycles, min_life - 1), lives - 1)
+
+        first_cycle = np.ones(n, dtype=np.int64)
+        if history_length is not None:
+            first_cycle = np.maximum(1, last_cycle - history_length + 1)
+        counts = last_cycle - first_cycle + 1
+
+        # Row-level arrays for the whole chunk
+        row_engine = np.repeat(np.arange(n), counts)
+        row_offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cycles = first_cycle[row_engine] + row_offset
+        engine_modes = rng.choice(len(modes), size=n, p=mode_probs)
+
+        wear = (cycles / lives[row_engine]) ** exponents[engine_modes][row_engine]
+        engine_offsets = rng.normal(0.0, 1.0, (n, len(SENSORS))) * offset_std
+        values = (baseline
+                  + engine_offsets[row_engine]
+                  + wear[:, None] * drift * weights[engine_modes][row_engine]
+                  + rng.normal(0.0, 1.0, (len(cycles), len(SENSORS))) * noise_std * noise)
+
+        chunk = pd.DataFrame({'unit_number': unit_ids[row_engine], 'time_in_cycles': cycles})
+        for j, sensor in enumerate(SENSORS):
+            column = np.round(values[:, j], decimals[j])
+            chunk[sensor] = column.astype(np.int64) if decimals[j] == 0 else column
+        chunk['RUL'] = lives[row_engine] - cycles
+        chunk['time_laps'] = cycles
+        yield chunk
+
+
+def write_fleet(path, n_engines, split="train", **kwargs):
+    """Write a synthetic fleet to CSV one chunk at a time; returns the number of rows written"""
+    rows = 0
+    for i, chunk in enumerate(generate_fleet(n_engines, split, **kwargs)):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        rows += len(chunk)
+    return rows
+
+
+def write_dataset(out_dir, n_train=100, n_test=50, seed=None, **kwargs):
+    """Write train_data.csv and test_data.csv (same layout as data/) into `out_dir`"""
+    os.makedirs(out_dir, exist_ok=True)
+    seeds = np.random.SeedSequence(seed).spawn(2)
+    written = {}
+    for split, n_engines, split_seed in (("train", n_train, seeds[0]), ("test", n_test, seeds[1])):
+        if n_engines <= 0:
+            continue
+        path = os.path.join(out_dir, f"{split}_data.csv")
+        written[path] = write_fleet(path, n_engines, split, seed=split_seed, **kwargs)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="data/synthetic", help="output directory")
+    parser.add_argument("--train-engines", type=int, default=100)
+    parser.add_argument("--test-engines", type=int, default=50)
+    parser.add_argument("--mean-life", type=int, default=206, help="mean cycles to failure")
+    parser.add_argument("--life-std", type=int, default=46)
+    parser.add_argument("--history", type=int, default=None, help="keep only the last N cycles per engine")
+    parser.add_argument("--noise", type=float, default=1.0, help="sensor noise multiplier")
+    parser.add_argument("--failure-modes", nargs="+", default=['hpc_degradation'], choices=list(FAILURE_MODES))
+    parser.add_argument("--chunk-engines", type=int, default=1000, help="engines generated per write")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    written = write_dataset(
+        args.out, args.train_engines, args.test_engines, seed=args.seed,
+        mean_life=args.mean_life, life_std=args.life_std, noise=args.noise,
+        failure_modes=args.failure_modes, history_length=args.history, chunk_engines=args.chunk_engines
+    )
+    for path, rows in written.items():
+        print(f"{path}: {rows} rows")
@@ -0,0 +1,161 @@
+"""Lightweight nested timing spans for the dashboard.
+
+app.py starts one trace per rerun. Feature code wraps its stages in
+`span("name")`, and nested spans are recorded under their parent's path
+(e.g. "fleet_scoring/model.predict"). Without an active trace (fragment
+reruns, headless tools, worker threads) spans cost almost nothing and
+record nothing, unless the fragment body is wrapped in `traced_rerun`.
+
+Set SMARTMACH_TRACE_LOG=<path> to append each finished trace to a
+JSON-lines file for offline analysis.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+TRACE_LOG_ENV = "SMARTMACH_TRACE_LOG"
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class Trace:
+    """Span timings collected during one script run"""
+
+    def __init__(self, label=""):
+        self.label = label
+        self.started = time.perf_counter()
+        self.timestamp = datetime.now().isoformat(timespec='seconds')
+        self.elapsed = None
+        self.spans = {}          # path -> [calls, total seconds]
+        self._stack = []
+
+    def add(self, path, seconds):
+        entry = self.spans.setdefault(path, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def totals(self):
+        """Rows of (path, calls, total ms), in first-seen order"""
+        return [(path, calls, round(seconds * 1e3, 2)) for path, (calls, seconds) in self.spans.items()]
+
+    def to_dict(self):
+        return {
+            'timestamp': self.timestamp,
+            'label': self.label,
+            'total_ms': round((self.elapsed or 0.0) * 1e3, 2),
+            'spans': [{'name': path, 'calls': calls, 'total_ms': ms} for path, calls, ms in self.totals()],
+        }
+
+
+def start_trace(label=""):
+    """Begin collecting spans on this thread (one trace per rerun)"""
+    _local.trace = Trace(label)
+    return _local.trace
+
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+
+def end_trace():
+    """Stop the current trace, append it to the JSONL log if enabled and return it"""
+    trace = current_trace()
+    _local.trace = None
+    if trace is None:
+        return None
+
+    trace.elapsed = time.perf_counter() - trace.started
+    log_path = os.environ.get(TRACE_LOG_ENV)
+    if log_path:
+        line = json.dumps(trace.to_dict())
+        with _log_lock, open(log_path, "a") as f:
+            f.write(line + "\n")
+    return trace
+
+
+@contextmanager
+def span(name):
+    """Time a block as a child of the enclosing span"""
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+
+    trace._stack.append(name)
+    path = "/".join(trace._stack)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(path, time.perf_counter() - start)
+        trace._stack.pop()
+
+
+def traced(name):
+    """Decorator form of `span`"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_rerun(label, keep=5):
+    """Decorator for st.fragment bodies.
+
+    Inside a full rerun it is just a span. When the fragment reruns on its
+    own it gets a trace of its own, which is logged like any other and kept
+    in st.session_state['partial_traces'] for the Performance panel.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_trace() is not None:
+                with span(label):
+                    return func(*args, **kwargs)
+
+            import streamlit as st
+            start_trace(label)
+            try:
+                with span(label):
+                    return func(*args, **kwargs)
+            finally:
+                partial = st.session_state.setdefault('partial_traces', [])
+                partial.append(end_trace())
+                del partial[:-keep]
+        return wrapper
+    return decorator
+
+
+def show_trace(trace):
+    """Render span totals of a finished trace (used in the sidebar Performance expander)"""
+    import pandas as pd
+    import streamlit as st
+
+    if trace is None or not trace.spans:
+        st.caption("No timings recorded for this run")
+        return
+
+    total_ms = trace.elapsed * 1e3
+    st.metric("Last rerun", f"{total_ms:.0f} ms")
+    rows = pd.DataFrame(trace.totals(), columns=['Stage', 'Calls', 'Total ms'])
+    rows['Share'] = (rows['Total ms'] / total_ms * 100).round(1).astype(str) + "%"
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+
+    partial = st.session_state.get('partial_traces')
+    if partial:
+        st.caption("Recent partial reruns")
+        st.dataframe(
+            pd.DataFrame([(t.timestamp[11:], t.label, round(t.elapsed * 1e3, 1)) for t in reversed(partial)],
+                         columns=['Time', 'Section', 'Total ms']),
+            use_container_width=True, hide_index=True
+        )
+    if os.environ.get(TRACE_LOG_ENV):
+        st.caption(f"Logging to {os.environ[TRACE_LOG_ENV]}")
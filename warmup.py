@@ -0,0 +1,193 @@
+"""Startup warm-up: pay the cold costs before the first user does.
+
+When SMARTMACH_WARMUP is set, the first script run starts a Warmup on a
+daemon thread. It does every one-off step a user would otherwise wait for:
+
+    model        load model/model.h5
+    data         load, scale and compact the test data
+    precision    build the scoring model ($SMARTMACH_PRECISION)
+    trace        dummy batched predicts (every CompiledPredictor bucket),
+                 so TensorFlow traces and compiles the graphs
+    root_cause   unpickle model/rf.pkl and build its SHAP explainer
+    fleet        score the whole fleet (the All Engines snapshot)
+    cost_model   load model/cost_model.pkl and cost one engine's scenarios
+
+Everything is kept process-wide: sessions adopt the warmed model and data
+instead of loading their own, the All Engines view starts from the
+precomputed snapshot, and the RandomForest and cost model land in the
+st.cache_resource caches the features read from. Progress is shown in the
+sidebar System Status panel.
+
+Usage (from the repository root):
+    SMARTMACH_WARMUP=1 streamlit run app.py
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from preprocess import load_data, scale_data, load_model, dataset_version, compact_frame
+from sensor_config import SensorRegistry
+from history_store import open_history_store
+from inference import quantize_model
+from tracing import span
+
+WARMUP_ENV = "SMARTMACH_WARMUP"
+STEPS = [
+    ("model", "Load RUL model"),
+    ("data", "Load and scale data"),
+    ("precision", "Build scoring model"),
+    ("trace", "Trace model.predict"),
+    ("root_cause", "Load RandomForest + SHAP"),
+    ("fleet", "Precompute fleet health"),
+    ("cost_model", "Load cost model"),
+]
+
+
+class Warmup:
+    """Background loading of models and fleet scores, with per-step progress"""
+
+    def __init__(self, model_path="model/model.h5", seq_length=50, trace_batch_sizes=(1, 32)):
+        self.model_path = model_path
+        self.seq_length = seq_length
+        self.trace_batch_sizes = trace_batch_sizes
+
+        self.steps = {name: {'label': label, 'status': 'pending', 'seconds': None, 'error': None}
+                      for name, label in STEPS}
+        self._done = {name: threading.Event() for name, _ in STEPS}
+
+        self.model = None
+        self.scoring_model = None
+        self.train_df = None
+        self.test_df = None
+        self.data_version = None
+        self.fleet_snapshot = None
+        self.fleet_key = None
+        self.started = None
+        self.elapsed = None
+        self._thread = None
+
+    # ------------------------------- Progress -------------------------------
+
+    @property
+    def ready(self):
+        return self.elapsed is not None
+
+    def progress(self):
+        """(finished steps, total steps, label of the running step or None)"""
+        finished = sum(step['status'] not in ('pending', 'running') for step in self.steps.values())
+        running = next((step['label'] for step in self.steps.values() if step['status'] == 'running'), None)
+        return finished, len(self.steps), running
+
+    def wait(self, name, timeout=None):
+        """Block until step `name` finished; True if it succeeded"""
+        self._done[name].wait(timeout)
+        return self.steps[name]['status'] == 'done'
+
+    # ------------------------------- Steps -------------------------------
+
+    def _run_step(self, name, function, *requires):
+        step = self.steps[name]
+        if any(self.steps[r]['status'] != 'done' for r in requires):
+            step['status'] = 'skipped'
+        else:
+            step['status'] = 'running'
+            start = time.perf_counter()
+            try:
+                with span(f"warmup/{name}"):
+                    function()
+                step['status'] = 'done'
+            except Exception as e:
+                step['status'] = 'failed'
+                step['error'] = str(e)
+            step['seconds'] = round(time.perf_counter() - start, 2)
+        self._done[name].set()
+
+    def _load_model(self):
+        self.model = load_model(self.model_path)
+        if self.model is None:
+            raise RuntimeError(f"could not load {self.model_path}")
+
+    def _load_data(self):
+        train_df, test_df = scale_data(*load_data())
+        if test_df is None:
+            raise RuntimeError("could not load data/test_data.csv")
+        self.train_df, self.test_df = train_df, compact_frame(test_df)
+        self.data_version = dataset_version(self.test_df)
+
+    def _build_scoring_model(self):
+        # float32 fallback if quantization fails, as in app.py
+        self.scoring_model = self.model
+        self.scoring_model = quantize_model(self.model)
+
+    def _trace(self):
+        # Every feature scores through the scoring model
+        if hasattr(self.scoring_model, "warm"):
+            self.scoring_model.warm()
+            return
+        n_features = self.test_df.shape[1] - 3
+        for batch_size in self.trace_batch_sizes:
+            self.scoring_model.predict(np.zeros((batch_size, self.seq_length, n_features), dtype=np.float32),
+                                       verbose=0)
+
+    def _root_cause(self):
+        from feature.root_cause_analyzer import load_root_cause_model
+        model, explainer = load_root_cause_model()
+        X = self.test_df.drop(columns=['unit_number', 'time_in_cycles', 'RUL']).tail(1)
+        model.predict(X)
+        explainer.shap_values(X)
+
+    def _fleet(self):
+        from feature.health_monitor import rescore_fleet_health
+        processor = SensorRegistry()
+        # Same source and cache key as the All Engines view
+        history_store = open_history_store()
+        source, version = (history_store, history_store.version()) if history_store is not None \
+            else (self.test_df, self.data_version)
+        self.fleet_snapshot, _ = rescore_fleet_health(source, self.scoring_model, processor, self.seq_length)
+        self.fleet_key = (version, self.seq_length)
+
+    def _cost_model(self):
+        from feature.cost_optimizer import load_cost_model, build_scenario_matrix, predict_scenario_costs
+        from feature.single_eng import snapshot_cost_values
+        cost_model = load_cost_model()
+        if self.fleet_snapshot is not None and len(self.fleet_snapshot):
+            values = snapshot_cost_values(self.fleet_snapshot.take([0]))
+            predict_scenario_costs(cost_model, build_scenario_matrix(values), mode="warmup")
+
+    def run(self):
+        self.started = time.perf_counter()
+        self._run_step("model", self._load_model)
+        self._run_step("data", self._load_data)
+        self._run_step("precision", self._build_scoring_model, "model")
+        self._run_step("trace", self._trace, "model", "data")
+        self._run_step("root_cause", self._root_cause, "data")
+        self._run_step("fleet", self._fleet, "model", "data")
+        self._run_step("cost_model", self._cost_model)
+        self.elapsed = time.perf_counter() - self.started
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+        return self
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def start_warmup(enabled=None):
+    """Process-wide Warmup on a daemon thread (started once).
+
+    `enabled` defaults to $SMARTMACH_WARMUP; returns None when it is unset.
+    """
+    global _warmup
+    with _warmup_lock:
+        if _warmup is not None:
+            return _warmup
+        enabled = enabled if enabled is not None else os.environ.get(WARMUP_ENV, "").lower() not in ("", "0", "false")
+        if not enabled:
+            return None
+        _warmup = Warmup().start()
+        return _warmup